@@ -0,0 +1,88 @@
+"""
+Offline download throughput benchmark.
+
+Backfills synthetic 1m candles from `FakeBitvavo` into a temporary store,
+once per `--max-workers` value, with a fixed per-request latency standing
+in for the network round trip. The fake's rate limit budget is matched by
+the downloader's token bucket, so a run that would get banned against the
+real exchange fails here too.
+
+    uv run python benchmarks/download_throughput.py --days 30 --latency 0.05
+"""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Annotated
+
+import typer
+from loguru import logger
+from tabulate import tabulate
+
+from fart.core.fake_bitvavo import FakeBitvavo
+from fart.downloader import Downloader
+from fart.token_bucket import TokenBucket
+
+
+def main(
+    days: Annotated[int, typer.Option(help="Days of 1m candles to backfill.")] = 30,
+    latency: Annotated[
+        float, typer.Option(help="Seconds each candles request takes.")
+    ] = 0.05,
+    max_workers: Annotated[
+        list[int], typer.Option(help="Concurrency levels to compare.")
+    ] = [1, 2, 4, 8],
+    store_format: Annotated[str, typer.Option(help="'csv' or 'parquet'.")] = "csv",
+    rate_limit: Annotated[
+        int, typer.Option(help="Weight budget per minute (Bitvavo: 1000).")
+    ] = 1000,
+) -> None:
+    logger.remove()
+    start = datetime.now() - timedelta(days=days)
+    rows: list[tuple[int, int, int, float, float]] = []
+
+    for workers in max_workers:
+        client = FakeBitvavo(latency=latency, rate_limit=rate_limit)
+        with TemporaryDirectory() as tmp_dir:
+            downloader = Downloader(
+                assets_dir=Path(tmp_dir),
+                market="BTC-EUR",
+                interval="1m",
+                api_key=None,
+                api_secret=None,
+                store_format=store_format,
+                max_workers=workers,
+                token_bucket=TokenBucket(capacity=rate_limit),
+                client=client,  # pyright: ignore[reportArgumentType] -- Duck-typed stand-in
+            )
+            # Resume from `start` rather than from Bitvavo's launch date
+            downloader._determine_start_timestamp = (  # pyright: ignore[reportPrivateUsage] -- Benchmark window
+                lambda _: int(start.timestamp() * 1000)
+            )
+
+            started_at = perf_counter()
+            num_candles = downloader.download()
+            seconds = perf_counter() - started_at
+
+        rows.append(
+            (
+                workers,
+                client.calls["candles"],
+                num_candles,
+                seconds,
+                num_candles / seconds if seconds > 0 else 0.0,
+            )
+        )
+
+    print(
+        tabulate(
+            rows,
+            headers=["max_workers", "requests", "candles", "seconds", "candles/s"],
+            floatfmt=".1f",
+        )
+    )
+
+
+if __name__ == "__main__":
+    typer.run(main)
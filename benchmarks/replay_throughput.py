@@ -0,0 +1,82 @@
+"""
+Offline replay throughput benchmark.
+
+Pages synthetic 1m candles out of `FakeBitvavo` into a `CandleBuffer`, then
+replays them through the live `Broker` handlers against a
+`SimulatedExchange`, with a noisy look-ahead signal standing in for model
+predictions so that the broker trades often, and reports candles handled
+per second.
+
+    uv run python benchmarks/replay_throughput.py --days 365
+"""
+
+from time import perf_counter
+from typing import Annotated
+
+import numpy as np
+import typer
+from loguru import logger
+from tabulate import tabulate
+
+from fart.constants import CLOSE
+from fart.core.fake_bitvavo import FakeBitvavo
+from fart.core.replay import replay
+from fart.store.candle_buffer import CandleBuffer
+
+MINUTE = 60_000
+PAGE_SIZE = 1440
+
+
+def main(
+    days: Annotated[int, typer.Option(help="Days of 1m candles to replay.")] = 365,
+    threshold: Annotated[
+        float, typer.Option(help="Minimum absolute signal to trade on.")
+    ] = 0.001,
+    max_holding_period: Annotated[
+        int, typer.Option(help="Candles after which a position is closed.")
+    ] = 60,
+    stop_loss_pct: Annotated[
+        float, typer.Option(help="Adverse move that closes a position.")
+    ] = 0.01,
+) -> None:
+    logger.remove()
+    num_candles = days * PAGE_SIZE
+    client = FakeBitvavo(now=lambda: num_candles * MINUTE, rate_limit=num_candles)
+    candles = CandleBuffer()
+    for end in range(num_candles - 1, 0, -PAGE_SIZE):
+        page = client.candles("BTC-EUR", "1m", limit=PAGE_SIZE, end=end * MINUTE)
+        candles.extend(CandleBuffer.from_candles(page))  # pyright: ignore[reportArgumentType] -- A page, not an error, within budget
+    candles = candles.sorted()
+
+    closes = candles.array[CLOSE]
+    predictions = np.append(closes[1:] / closes[:-1] - 1, np.nan)
+    predictions += np.random.default_rng(0).normal(0, 0.001, len(predictions))
+
+    started_at = perf_counter()
+    _, trades = replay(
+        candles,
+        predictions,
+        threshold=threshold,
+        max_holding_period=max_holding_period,
+        stop_loss_pct=stop_loss_pct,
+    )
+    seconds = perf_counter() - started_at
+
+    print(
+        tabulate(
+            [
+                (
+                    len(candles),
+                    len(trades),
+                    seconds,
+                    len(candles) / seconds if seconds > 0 else 0.0,
+                )
+            ],
+            headers=["candles", "trades", "seconds", "candles/s"],
+            floatfmt=".1f",
+        )
+    )
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,116 @@
+"""
+Offline live-loop latency benchmark.
+
+Publishes synthetic open-candle updates from `FakeBitvavo`'s WebSocket to
+`Downloader.tail` and measures, per closed candle, the time from the
+update that closes it being pushed to that candle being durably appended
+to the store.
+
+    uv run python benchmarks/tail_latency.py --candles 1000 --updates-per-candle 5
+"""
+
+from datetime import datetime
+from pathlib import Path
+from statistics import quantiles
+from tempfile import TemporaryDirectory
+from threading import Event, Thread
+from time import perf_counter, sleep
+from typing import Annotated, Dict
+
+import typer
+from loguru import logger
+from tabulate import tabulate
+
+from fart.core.fake_bitvavo import FakeBitvavo
+from fart.downloader import Downloader
+from fart.store.candle_buffer import CandleBuffer
+
+MINUTE = 60_000
+
+
+def main(
+    candles: Annotated[int, typer.Option(help="Number of candles to stream.")] = 1000,
+    updates_per_candle: Annotated[
+        int, typer.Option(help="Open-candle updates pushed per candle.")
+    ] = 5,
+    pause: Annotated[
+        float,
+        typer.Option(help="Seconds between pushed updates (0 for a burst)."),
+    ] = 0.002,
+    store_format: Annotated[str, typer.Option(help="'csv' or 'parquet'.")] = "csv",
+) -> None:
+    logger.remove()
+    now = int(datetime.now().timestamp() * 1000) // MINUTE * MINUTE
+    start = now - (candles + 1) * MINUTE
+    client = FakeBitvavo(now=lambda: now)
+    socket = client.newWebsocket()
+    client.newWebsocket = lambda: socket  # pyright: ignore[reportAttributeAccessIssue] -- Hand out the socket to publish on
+
+    with TemporaryDirectory() as tmp_dir:
+        downloader = Downloader(
+            assets_dir=Path(tmp_dir),
+            market="BTC-EUR",
+            interval="1m",
+            api_key=None,
+            api_secret=None,
+            store_format=store_format,
+            client=client,  # pyright: ignore[reportArgumentType] -- Duck-typed stand-in
+        )
+        store = downloader._store  # pyright: ignore[reportPrivateUsage] -- Instrumented below
+        store.append(
+            CandleBuffer.from_candles(
+                client.candles("BTC-EUR", "1m", start=start, end=start)  # pyright: ignore[reportArgumentType] -- Known to be a list
+            )
+        )
+
+        pushed_at: Dict[int, float] = {}
+        latencies: list[float] = []
+        append = store.append
+
+        def timed_append(buffer: CandleBuffer) -> None:
+            append(buffer)
+            appended_at = perf_counter()
+            for timestamp in buffer.timestamps.tolist():
+                # Closed by the first update of the next candle
+                if timestamp + MINUTE in pushed_at:
+                    latencies.append(appended_at - pushed_at[timestamp + MINUTE])
+
+        store.append = timed_append  # pyright: ignore[reportAttributeAccessIssue] -- Instrumentation
+
+        updates = client.candle_updates(
+            "BTC-EUR", "1m", start + MINUTE, candles, updates_per_candle
+        )
+        stop = Event()
+
+        def publish() -> None:
+            socket.subscribed.wait()
+            for update in updates:
+                pushed_at.setdefault(update[0], perf_counter())
+                socket.publish("BTC-EUR", "1m", [update])
+                if pause > 0:
+                    sleep(pause)
+            stop.set()
+
+        publisher = Thread(target=publish)
+        started_at = perf_counter()
+        publisher.start()
+        num_candles = downloader.tail(stop)
+        seconds = perf_counter() - started_at
+        publisher.join()
+
+    percentiles = quantiles(latencies, n=100) if len(latencies) > 1 else [0.0] * 99
+    print(
+        tabulate(
+            [
+                ("updates", len(updates)),
+                ("candles appended", num_candles),
+                ("updates/s", f"{len(updates) / seconds:.0f}"),
+                ("p50 latency (ms)", f"{percentiles[49] * 1000:.3f}"),
+                ("p99 latency (ms)", f"{percentiles[98] * 1000:.3f}"),
+            ]
+        )
+    )
+
+
+if __name__ == "__main__":
+    typer.run(main)
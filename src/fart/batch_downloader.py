@@ -0,0 +1,178 @@
+from fnmatch import fnmatchcase
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Tuple
+
+from loguru import logger
+from python_bitvavo_api.bitvavo import Bitvavo
+from tabulate import tabulate
+
+from fart.downloader import Downloader
+from fart.token_bucket import TokenBucket
+
+# Rate limit weight of a single `markets` request, per the Bitvavo API
+# documentation
+MARKETS_WEIGHT = 1
+
+
+class BatchDownloader:
+    """
+    Downloads every combination of a set of markets and intervals in one
+    process, e.g. all EUR markets x {1m, 1h, 1d}.
+
+    All series share one Bitvavo client, one `markets` metadata lookup and
+    one `TokenBucket` -- so the rate limit budget is spent across the whole
+    job rather than assumed per series -- and each series is downloaded by
+    a regular `Downloader`, resuming from its own cache.
+
+    Parameters
+    ----------
+    - assets_dir (Path): Folder to save downloaded data in.
+    - markets (List[str]): Market names or shell-style glob patterns
+      matched against Bitvavo's market list (e.g. 'BTC-EUR', '*-EUR').
+    - intervals (List[str]): Intervals to download for every market (e.g.
+      '1m', '1h', '1d').
+    - api_key (str | None): The API key for the Bitvavo API.
+    - api_secret (str | None): The API secret for the Bitvavo API.
+    - store_format (str): Candle store format (see `get_candle_store`).
+    - max_workers (int): Number of concurrent candle requests per series.
+
+    """
+
+    def __init__(
+        self,
+        assets_dir: Path,
+        markets: List[str],
+        intervals: List[str],
+        api_key: str | None,
+        api_secret: str | None,
+        store_format: str = "csv",
+        max_workers: int = 1,
+    ) -> None:
+        self._data_dir = assets_dir
+        self._intervals = intervals
+        self._api_key = api_key
+        self._api_secret = api_secret
+        self._store_format = store_format
+        self._max_workers = max_workers
+        self._token_bucket = TokenBucket()
+        self._client = Bitvavo(
+            {
+                "APIKEY": api_key,
+                "APISECRET": api_secret,
+            }
+        )
+        self._token_bucket.acquire(MARKETS_WEIGHT)
+        self._market_metadata: List[Dict[str, Any]] = self._client.markets()
+        self._markets = self._resolve_markets(markets)
+        self._log_configuration()
+
+    @property
+    def series(self) -> List[Tuple[str, str]]:
+        return [
+            (market, interval)
+            for market in self._markets
+            for interval in self._intervals
+        ]
+
+    def download(self) -> List[Tuple[str, str, int, float]]:
+        """
+        Download every market/interval series in turn, reporting each
+        series' progress and throughput as it completes.
+
+        Returns
+        -------
+        - List[Tuple[str, str, int, float]]: One `(market, interval,
+          num_candles, seconds)` record per series.
+
+        """
+        return self._run(Downloader.download, "Download")
+
+    def repair(self) -> List[Tuple[str, str, int, float]]:
+        """
+        Fill the gaps in every market/interval series' cache in turn (see
+        `Downloader.repair`), reporting each series as it completes.
+
+        Returns
+        -------
+        - List[Tuple[str, str, int, float]]: One `(market, interval,
+          num_candles, seconds)` record per series, counting the candles
+          recovered.
+
+        """
+        return self._run(Downloader.repair, "Repair")
+
+    def _run(
+        self, action: Callable[[Downloader], int], name: str
+    ) -> List[Tuple[str, str, int, float]]:
+        results: List[Tuple[str, str, int, float]] = []
+
+        for market, interval in self.series:
+            downloader = Downloader(
+                assets_dir=self._data_dir,
+                market=market,
+                interval=interval,
+                api_key=self._api_key,
+                api_secret=self._api_secret,
+                store_format=self._store_format,
+                max_workers=self._max_workers,
+                token_bucket=self._token_bucket,
+                client=self._client,
+                markets=self._market_metadata,
+            )
+            started_at = perf_counter()
+            num_candles = action(downloader)
+            seconds = perf_counter() - started_at
+            logger.info(
+                f"{market} {interval}: {num_candles} candles in {seconds:.1f}s "
+                f"({self._throughput(num_candles, seconds):.0f} candles/s)"
+            )
+            results.append((market, interval, num_candles, seconds))
+
+        self._log_summary(results, name)
+
+        return results
+
+    def _resolve_markets(self, patterns: List[str]) -> List[str]:
+        available = [item["market"] for item in self._market_metadata]
+        markets: List[str] = []
+
+        for pattern in patterns:
+            matches = [market for market in available if fnmatchcase(market, pattern)]
+            if not matches:
+                raise ValueError(f"Market '{pattern}' not found in Bitvavo markets")
+            markets.extend(market for market in matches if market not in markets)
+
+        return markets
+
+    def _throughput(self, num_candles: int, seconds: float) -> float:
+        return num_candles / seconds if seconds > 0 else 0.0
+
+    def _log_configuration(self):
+        configuration = {
+            "data_dir": str(self._data_dir),
+            "markets": ", ".join(self._markets),
+            "intervals": ", ".join(self._intervals),
+            "store_format": self._store_format,
+            "max_workers": self._max_workers,
+        }
+        table = tabulate(configuration.items())
+        logger.info(f"\n\nF.A.R.T. Batch Downloader\n\n{table}\n")
+
+    def _log_summary(
+        self, results: List[Tuple[str, str, int, float]], name: str
+    ) -> None:
+        table = tabulate(
+            [
+                (
+                    market,
+                    interval,
+                    num_candles,
+                    f"{seconds:.1f}",
+                    f"{self._throughput(num_candles, seconds):.0f}",
+                )
+                for market, interval, num_candles, seconds in results
+            ],
+            headers=["market", "interval", "candles", "seconds", "candles/s"],
+        )
+        logger.info(f"\n\nF.A.R.T. Batch {name} Summary\n\n{table}\n")
@@ -7,7 +7,10 @@ import typer
 from dotenv import find_dotenv, load_dotenv
 from loguru import logger
 
+from fart.batch_downloader import BatchDownloader
 from fart.downloader import Downloader
+from fart.store.get_candle_store import get_candle_store
+from fart.store.resample_candle_store import resample_candle_store
 
 app = typer.Typer(no_args_is_help=True)
 
@@ -33,24 +36,175 @@ def download(
         ),
     ] = "assets",
     interval: Annotated[
+        list[str],
+        typer.Option(
+            help="Data interval (e.g., '1m', '5m', '15m', '30m', '1h', '2h', '4h', '6h', '8h', '12h', '1d', '1W', '1M'). Repeat or comma-separate to download several."
+        ),
+    ] = ["1d"],
+    market: Annotated[
+        list[str],
+        typer.Option(
+            help="Market to download data for (e.g., 'BTC-EUR', 'BTC-USDC'), or a glob pattern (e.g., '*-EUR'). Repeat or comma-separate to download several."
+        ),
+    ] = ["BTC-EUR"],
+    store_format: Annotated[
+        str,
+        typer.Option(
+            help="Candle store format ('csv' for one file per market/interval, 'parquet' for year-partitioned Parquet files)."
+        ),
+    ] = "csv",
+    max_workers: Annotated[
+        int,
+        typer.Option(
+            help="Number of candle requests to run concurrently, within Bitvavo's weight budget."
+        ),
+    ] = 1,
+) -> None:
+    batch_downloader = BatchDownloader(
+        api_key=getenv("BITVAVO_API_KEY"),
+        api_secret=getenv("BITVAVO_API_SECRET"),
+        assets_dir=Path(assets_dir),
+        intervals=_split_option_values(interval),
+        markets=_split_option_values(market),
+        store_format=store_format,
+        max_workers=max_workers,
+    )
+    batch_downloader.download()
+
+
+@app.command()
+def repair(
+    assets_dir: Annotated[
         str,
+        typer.Option(help="Folder containing the downloaded data."),
+    ] = "assets",
+    interval: Annotated[
+        list[str],
         typer.Option(
-            help="Data interval (e.g., '1m', '5m', '15m', '30m', '1h', '2h', '4h', '6h', '8h', '12h', '1d', '1W', '1M')."
+            help="Data interval to repair (e.g., '1m', '1h', '1d'). Repeat or comma-separate to repair several."
         ),
-    ] = "1d",
+    ] = ["1d"],
+    market: Annotated[
+        list[str],
+        typer.Option(
+            help="Market to repair (e.g., 'BTC-EUR'), or a glob pattern (e.g., '*-EUR'). Repeat or comma-separate to repair several."
+        ),
+    ] = ["BTC-EUR"],
+    store_format: Annotated[
+        str,
+        typer.Option(
+            help="Candle store format ('csv' for one file per market/interval, 'parquet' for year-partitioned Parquet files)."
+        ),
+    ] = "csv",
+    max_workers: Annotated[
+        int,
+        typer.Option(
+            help="Number of candle requests to run concurrently, within Bitvavo's weight budget."
+        ),
+    ] = 1,
+) -> None:
+    batch_downloader = BatchDownloader(
+        api_key=getenv("BITVAVO_API_KEY"),
+        api_secret=getenv("BITVAVO_API_SECRET"),
+        assets_dir=Path(assets_dir),
+        intervals=_split_option_values(interval),
+        markets=_split_option_values(market),
+        store_format=store_format,
+        max_workers=max_workers,
+    )
+    batch_downloader.repair()
+
+
+@app.command()
+def tail(
+    assets_dir: Annotated[
+        str,
+        typer.Option(help="Folder to save downloaded data."),
+    ] = "assets",
+    interval: Annotated[
+        str,
+        typer.Option(help="Data interval to tail (e.g., '1m', '1h', '1d')."),
+    ] = "1m",
     market: Annotated[
         str,
-        typer.Option(help="Market to download data for (e.g., 'BTC-EUR', 'BTC-USDC')."),
+        typer.Option(help="Market to tail (e.g., 'BTC-EUR')."),
     ] = "BTC-EUR",
+    store_format: Annotated[
+        str,
+        typer.Option(
+            help="Candle store format ('csv' for one file per market/interval, 'parquet' for year-partitioned Parquet files)."
+        ),
+    ] = "csv",
+    max_workers: Annotated[
+        int,
+        typer.Option(
+            help="Number of candle requests to run concurrently when catching up over REST."
+        ),
+    ] = 1,
 ) -> None:
     downloader = Downloader(
         api_key=getenv("BITVAVO_API_KEY"),
         api_secret=getenv("BITVAVO_API_SECRET"),
         assets_dir=Path(assets_dir),
-        interval=interval,
         market=market,
+        interval=interval,
+        store_format=store_format,
+        max_workers=max_workers,
     )
-    downloader.download()
+    num_candles = downloader.tail()
+    logger.info(f"{market} {interval}: {num_candles} candles appended while tailing")
+
+
+@app.command()
+def resample(
+    assets_dir: Annotated[
+        str,
+        typer.Option(help="Folder containing the downloaded data."),
+    ] = "assets",
+    source_interval: Annotated[
+        str,
+        typer.Option(help="Interval of the cached candles to resample (e.g., '1m')."),
+    ] = "1m",
+    interval: Annotated[
+        list[str],
+        typer.Option(
+            help="Coarser interval to derive (e.g., '5m', '1h', '1d'). Repeat or comma-separate to derive several."
+        ),
+    ] = ["1h"],
+    market: Annotated[
+        list[str],
+        typer.Option(
+            help="Market to resample (e.g., 'BTC-EUR'). Repeat or comma-separate to resample several."
+        ),
+    ] = ["BTC-EUR"],
+    store_format: Annotated[
+        str,
+        typer.Option(
+            help="Candle store format ('csv' for one file per market/interval, 'parquet' for year-partitioned Parquet files)."
+        ),
+    ] = "csv",
+) -> None:
+    for market_ in _split_option_values(market):
+        source = get_candle_store(
+            Path(assets_dir), market_, source_interval, store_format
+        )
+        for interval_ in _split_option_values(interval):
+            target = get_candle_store(
+                Path(assets_dir), market_, interval_, store_format
+            )
+            num_candles = resample_candle_store(
+                source, target, source_interval, interval_
+            )
+            logger.info(
+                f"{market_} {source_interval} -> {interval_}: "
+                f"{num_candles} candles appended to {target.path}"
+            )
+
+
+def _split_option_values(values: list[str]) -> list[str]:
+    return [
+        value.strip() for item in values for value in item.split(",") if value.strip()
+    ]
 
 
 if __name__ == "__main__":
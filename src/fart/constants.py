@@ -19,6 +19,7 @@ BBANDS_UPPER = "Bollinger Bands: Upper"
 CHANGE = "Change"
 CLOSE = "Close"
 DATETIME = "Datetime"
+EMA = "Exponential Moving Average"
 EMA_FAST = "Exponential Moving Average: Fast"
 EMA_SLOW = "Exponential Moving Average: Slow"
 EUR = "EUR"
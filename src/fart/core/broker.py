@@ -0,0 +1,293 @@
+import math
+from typing import Callable, List, NamedTuple, Optional, Protocol, Tuple
+
+from loguru import logger
+
+from fart.store.candle_buffer import Candle
+
+# States of the trade execution flow (see "Planned Trade Execution Flow" in
+# the README)
+LISTENING = "listening"
+PAUSING = "pausing"
+TERMINATING = "terminating"
+PREDICTING_TRADE_SIGNAL = "predicting_trade_signal"
+SIZING_POSITION = "sizing_position"
+PLACING_ORDER = "placing_order"
+MONITORING_POSITION = "monitoring_position"
+HANDLING_PARTIAL_FILL = "handling_partial_fill"
+HANDLING_FAILURE = "handling_failure"
+HALTED = "halted"
+
+BUY = "buy"
+SELL = "sell"
+
+FILLED = "filled"
+PARTIAL_FILL = "partial_fill"
+EXCHANGE_ERROR = "exchange_error"
+
+
+class Fill(NamedTuple):
+    """
+    Outcome of a market order.
+
+    Attributes
+    ----------
+    - status (str): `FILLED`, `PARTIAL_FILL` or `EXCHANGE_ERROR`.
+    - base_amount (float): Base currency bought or sold (0 on error).
+    - quote_amount (float): Quote currency spent on a buy, or received
+      from a sell, fees included (0 on error).
+
+    """
+
+    status: str
+    base_amount: float
+    quote_amount: float
+
+
+class Trade(NamedTuple):
+    """A closed position: its entry and exit candle timestamps and net return."""
+
+    entry_timestamp: int
+    exit_timestamp: int
+    net_return: float
+
+
+class OrderGateway(Protocol):
+    """
+    Structural interface for where a `Broker` places its orders -- the
+    exchange when live, or a `SimulatedExchange` when replaying.
+    """
+
+    def place_market_order(self, market: str, side: str, amount: float) -> Fill:
+        """
+        Place a market order: spend `amount` quote currency on a `BUY`, or
+        sell `amount` base currency on a `SELL`.
+        """
+        ...
+
+
+class Broker:
+    """
+    Event-driven trade execution state machine. Every closed candle is
+    handed to `on_candle`, which runs it through predicting the trade
+    signal, the kill switch, position sizing, order placement and
+    drawdown monitoring, and leaves the broker back in `LISTENING` (or
+    `HALTED`). The same handlers serve the live loop and a replay (see
+    `fart.core.replay`); only the `OrderGateway` and the source of
+    candles differ.
+
+    Positions follow `calculate_trade_returns`'s rules: opened while flat
+    once the signal clears `threshold`, and closed once it drops below
+    `-threshold`, after `max_holding_period` candles, or when the close
+    has fallen `stop_loss_pct` below the entry price. The kill switch
+    trips when equity falls more than `max_drawdown_pct` below its peak:
+    the position is closed and the broker halts until `operator_resume`.
+
+    Parameters
+    ----------
+    - gateway (OrderGateway): Where orders are placed.
+    - predict (Callable[[Candle], float]): Trade signal of a closed
+      candle, i.e. the predicted magnitude of the next one; `NaN` means
+      no signal.
+    - market (str): Market to trade (e.g. 'BTC-EUR').
+    - initial_capital (float): Starting quote currency balance.
+    - threshold (float): Minimum absolute signal to open/close on.
+    - max_holding_period (Optional[int]): Candles after which a position
+      is closed regardless of signal.
+    - stop_loss_pct (Optional[float]): Adverse move since entry, as a
+      positive fraction, that closes a position.
+    - position_size_pct (float): Fraction of the quote balance to spend
+      per position, in (0, 1].
+    - max_drawdown_pct (Optional[float]): Drawdown from peak equity, as a
+      positive fraction, that engages the kill switch.
+
+    """
+
+    def __init__(
+        self,
+        gateway: OrderGateway,
+        predict: Callable[[Candle], float],
+        market: str = "BTC-EUR",
+        initial_capital: float = 500,
+        threshold: float = 0.005,
+        max_holding_period: Optional[int] = None,
+        stop_loss_pct: Optional[float] = None,
+        position_size_pct: float = 1.0,
+        max_drawdown_pct: Optional[float] = None,
+    ) -> None:
+        self._gateway = gateway
+        self._predict = predict
+        self._market = market
+        self._threshold = threshold
+        self._max_holding_period = max_holding_period
+        self._stop_loss_pct = stop_loss_pct
+        self._position_size_pct = position_size_pct
+        self._max_drawdown_pct = max_drawdown_pct
+
+        self.state = LISTENING
+        self.cash = float(initial_capital)
+        self.position = 0.0
+        self.equity: List[Tuple[int, float]] = []
+        self.trades: List[Trade] = []
+        self._peak_equity = float(initial_capital)
+        # Open position: entry candle, entry price, quote spent, quote
+        # received so far (a partially filled sell leaves it open), and the
+        # candles held
+        self._entry_timestamp: Optional[int] = None
+        self._entry_price = 0.0
+        self._entry_cost = 0.0
+        self._exit_proceeds = 0.0
+        self._holding_period = 0
+
+    def on_candle(self, candle: Candle) -> None:
+        """Handle a closed candle (RECEIVE_CANDLE_DATA)."""
+        if self.state != LISTENING:
+            # Paused, halted or terminating: still mark equity to market
+            self._mark(candle)
+            return
+
+        self.state = PREDICTING_TRADE_SIGNAL
+        signal = self._predict(candle)
+        close = candle[4]
+        is_open = self._entry_timestamp is not None
+        if is_open:
+            self._holding_period += 1
+
+        # EVALUATE_PREDICTION: no new orders once the kill switch engages
+        if self._is_drawdown_breached(self._equity(close)):
+            self._halt(candle)
+            return
+
+        if math.isnan(signal):  # No signal
+            pass
+        elif is_open:
+            if (
+                signal < -self._threshold
+                or (
+                    self._max_holding_period is not None
+                    and self._holding_period >= self._max_holding_period
+                )
+                or (
+                    self._stop_loss_pct is not None
+                    and close / self._entry_price - 1 <= -self._stop_loss_pct
+                )
+            ):
+                self._place_order(candle, SELL, self.position)
+        elif signal > self._threshold:
+            self.state = SIZING_POSITION
+            self._place_order(candle, BUY, self.cash * self._position_size_pct)
+
+        # UPDATE_DRAWDOWN
+        self.state = MONITORING_POSITION
+        equity = self._mark(candle)
+        if self._is_drawdown_breached(equity):
+            self._halt(candle)
+            return
+        self.state = LISTENING
+
+    def pause(self) -> None:
+        """PAUSE_PROGRAM: ignore candles until `resume`."""
+        if self.state == LISTENING:
+            self.state = PAUSING
+
+    def resume(self) -> None:
+        """RESUME_PROGRAM after `pause`."""
+        if self.state == PAUSING:
+            self.state = LISTENING
+
+    def operator_resume(self) -> None:
+        """
+        OPERATOR_RESUME after the kill switch halted the broker; drawdown
+        is measured from the current equity on.
+        """
+        if self.state == HALTED:
+            self._peak_equity = self.equity[-1][1] if self.equity else self.cash
+            self.state = LISTENING
+
+    def liquidate(self, candle: Candle) -> None:
+        """
+        Close any open position at `candle`'s close, e.g. at the end of a
+        replay or before terminating.
+        """
+        if self._entry_timestamp is None:
+            return
+
+        state = self.state
+        self._place_order(candle, SELL, self.position)
+        self._mark(candle)
+        self.state = state
+
+    def terminate(self) -> None:
+        """TERMINATE_PROGRAM: stop handling candles for good."""
+        self.state = TERMINATING
+
+    def _place_order(self, candle: Candle, side: str, amount: float) -> None:
+        self.state = PLACING_ORDER
+        fill = self._gateway.place_market_order(self._market, side, amount)
+
+        if fill.status == EXCHANGE_ERROR:
+            # LOG_AND_ALERT; the rules are evaluated again next candle
+            self.state = HANDLING_FAILURE
+            logger.error(f"{side} order of {amount} on {self._market} failed")
+            return
+
+        if fill.status == PARTIAL_FILL:
+            # RECONCILE_FILL by booking what was actually filled; a
+            # partially sold position stays open with the remainder
+            self.state = HANDLING_PARTIAL_FILL
+            logger.warning(
+                f"{side} order of {amount} on {self._market} partially filled"
+            )
+
+        if side == BUY:
+            self.cash -= fill.quote_amount
+            self.position += fill.base_amount
+            self._entry_timestamp = candle[0]
+            self._entry_price = candle[4]
+            self._entry_cost = fill.quote_amount
+            self._exit_proceeds = 0.0
+            self._holding_period = 0
+            return
+
+        self.cash += fill.quote_amount
+        self.position -= fill.base_amount
+        self._exit_proceeds += fill.quote_amount
+        if self._entry_timestamp is not None and fill.status == FILLED:
+            self.trades.append(
+                Trade(
+                    self._entry_timestamp,
+                    candle[0],
+                    self._exit_proceeds / self._entry_cost - 1,
+                )
+            )
+            self._entry_timestamp = None
+            self.position = 0.0
+
+    def _halt(self, candle: Candle) -> None:
+        # KILL_SWITCH_ENGAGED / MAX_DRAWDOWN_BREACH: flatten and halt
+        logger.warning(
+            f"Kill switch engaged on {self._market}: equity fell more than "
+            f"{self._max_drawdown_pct:.2%} below its peak {self._peak_equity:.2f}"
+        )
+        if self._entry_timestamp is not None:
+            self._place_order(candle, SELL, self.position)
+        self._mark(candle)
+        self.state = HALTED
+
+    def _is_drawdown_breached(self, equity: float) -> bool:
+        self._peak_equity = max(self._peak_equity, equity)
+        return self._max_drawdown_pct is not None and equity < self._peak_equity * (
+            1 - self._max_drawdown_pct
+        )
+
+    def _mark(self, candle: Candle) -> float:
+        # Record equity at `candle`'s close, once per candle
+        equity = self._equity(candle[4])
+        if self.equity and self.equity[-1][0] == candle[0]:
+            self.equity[-1] = (candle[0], equity)
+        else:
+            self.equity.append((candle[0], equity))
+        return equity
+
+    def _equity(self, close: float) -> float:
+        return self.cash + self.position * close
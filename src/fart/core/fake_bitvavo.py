@@ -0,0 +1,341 @@
+from datetime import datetime
+from threading import Event, Lock
+from time import monotonic, sleep
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Tuple
+
+import numpy as np
+
+from fart.utils import interval_to_milliseconds
+
+# Rate limit weight of each endpoint, per the Bitvavo API documentation
+ENDPOINT_WEIGHTS = {
+    "markets": 1,
+    "candles": 1,
+    "tickerPrice": 1,
+    "balance": 5,
+    "trades": 5,
+}
+
+# Max number of candles Bitvavo returns per `candles` request
+CANDLES_LIMIT = 1440
+
+
+class FakeBitvavo:
+    """
+    In-process, offline stand-in for `python_bitvavo_api.bitvavo.Bitvavo`.
+
+    Serves deterministic synthetic OHLCV for any market/interval -- the
+    same timestamp always gets the same candle, however it is requested --
+    through the `markets`, `candles`, `balance`, `tickerPrice` and
+    `trades` endpoints and the WebSocket candle subscription. Every REST
+    call sleeps for `latency` and spends its endpoint's weight from a
+    per-window budget, which `getRemainingLimit` reports; a call over
+    budget gets Bitvavo's rate limit error object back instead of data.
+    This makes download throughput and live-loop latency measurable on a
+    machine without network access (see `benchmarks/`).
+
+    Parameters
+    ----------
+    - markets (Iterable[str]): Markets to list (e.g. 'BTC-EUR').
+    - balances (Mapping[str, float] | None): Available amount per symbol.
+    - latency (float): Seconds each REST call takes.
+    - rate_limit (int): Weight budget per `rate_limit_period`.
+    - rate_limit_period (float): Seconds after which the budget resets.
+    - seed (int): Seed of the synthetic price series.
+    - now (Callable[[], int] | None): Current time in milliseconds; no
+      candle after it is served. Defaults to the wall clock.
+    - clock (Callable[[], float]): Monotonic clock for rate limit windows.
+    - sleep (Callable[[float], None]): Used to wait out `latency`.
+
+    """
+
+    def __init__(
+        self,
+        markets: Iterable[str] = ("BTC-EUR",),
+        balances: Mapping[str, float] | None = None,
+        latency: float = 0.0,
+        rate_limit: int = 1000,
+        rate_limit_period: float = 60.0,
+        seed: int = 0,
+        now: Callable[[], int] | None = None,
+        clock: Callable[[], float] = monotonic,
+        sleep: Callable[[float], None] = sleep,
+    ) -> None:
+        self._markets = list(markets)
+        self._balances = dict(balances) if balances is not None else {"EUR": 1000.0}
+        self._latency = latency
+        self._rate_limit = rate_limit
+        self._rate_limit_period = rate_limit_period
+        self._seed = seed
+        self._now = (
+            now if now is not None else lambda: int(datetime.now().timestamp() * 1000)
+        )
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = Lock()
+        self._remaining = rate_limit
+        self._window_start = clock()
+        self._trades: Dict[str, List[Dict[str, Any]]] = {}
+        self.calls: Dict[str, int] = {endpoint: 0 for endpoint in ENDPOINT_WEIGHTS}
+
+    def markets(
+        self, options: Mapping[str, Any] | None = None
+    ) -> List[Dict[str, Any]] | Dict[str, Any]:
+        error = self._call("markets")
+        if error is not None:
+            return error
+
+        return [
+            {
+                "market": market,
+                "status": "trading",
+                "base": market.split("-")[0],
+                "quote": market.split("-")[-1],
+            }
+            for market in self._markets
+        ]
+
+    def candles(
+        self,
+        symbol: str,
+        interval: str,
+        options: Mapping[str, Any] | None = None,
+        limit: int | None = None,
+        start: int | datetime | None = None,
+        end: int | datetime | None = None,
+    ) -> List[List[Any]] | Dict[str, Any]:
+        error = self._call("candles")
+        if error is not None:
+            return error
+
+        # Like Bitvavo: both bounds inclusive, newest candle first, and at
+        # most `limit` of the latest candles in the range
+        step = interval_to_milliseconds(interval)
+        end_timestamp = min(
+            self._to_milliseconds(end) if end is not None else self._now(),
+            self._now(),
+        )
+        limit = min(limit if limit is not None else CANDLES_LIMIT, CANDLES_LIMIT)
+        last = end_timestamp // step
+        first = last - limit + 1
+        if start is not None:
+            first = max(first, -(-self._to_milliseconds(start) // step))
+        if first > last:
+            return []
+
+        timestamps, opens, highs, lows, closes, volumes = self._generate(
+            symbol, step, np.arange(last, first - 1, -1, dtype=np.int64)
+        )
+        return [
+            [
+                int(timestamp),
+                f"{o:.8g}",
+                f"{h:.8g}",
+                f"{lo:.8g}",
+                f"{c:.8g}",
+                f"{v:.8g}",
+            ]
+            for timestamp, o, h, lo, c, v in zip(
+                timestamps, opens, highs, lows, closes, volumes
+            )
+        ]
+
+    def balance(
+        self, options: Mapping[str, Any] | None = None
+    ) -> List[Dict[str, Any]] | Dict[str, Any]:
+        error = self._call("balance")
+        if error is not None:
+            return error
+
+        return [
+            {"symbol": symbol, "available": f"{amount:.8g}", "inOrder": "0"}
+            for symbol, amount in self._balances.items()
+        ]
+
+    def tickerPrice(
+        self, options: Mapping[str, Any] | None = None
+    ) -> List[Dict[str, Any]] | Dict[str, Any]:
+        error = self._call("tickerPrice")
+        if error is not None:
+            return error
+
+        if options is not None and "market" in options:
+            return {
+                "market": options["market"],
+                "price": self._price(options["market"]),
+            }
+        return [
+            {"market": market, "price": self._price(market)} for market in self._markets
+        ]
+
+    def trades(
+        self, market: str, options: Mapping[str, Any] | None = None
+    ) -> List[Dict[str, Any]] | Dict[str, Any]:
+        error = self._call("trades")
+        if error is not None:
+            return error
+
+        return list(self._trades.get(market, []))
+
+    def getRemainingLimit(self) -> int:
+        with self._lock:
+            self._reset_expired_window()
+            return self._remaining
+
+    def newWebsocket(self) -> "FakeBitvavoWebsocket":
+        return FakeBitvavoWebsocket()
+
+    def candle_updates(
+        self,
+        market: str,
+        interval: str,
+        start: int,
+        num_candles: int,
+        updates_per_candle: int = 1,
+    ) -> List[List[Any]]:
+        """
+        Open-candle updates as the WebSocket would push them for
+        `num_candles` candles from `start`: `updates_per_candle` partial
+        updates per candle, the last of which is the final candle.
+        """
+        step = interval_to_milliseconds(interval)
+        first = -(-start // step)
+        timestamps, opens, highs, lows, closes, volumes = self._generate(
+            market, step, np.arange(first, first + num_candles, dtype=np.int64)
+        )
+
+        updates: List[List[Any]] = []
+        for timestamp, o, h, lo, c, v in zip(
+            timestamps, opens, highs, lows, closes, volumes
+        ):
+            for i in range(1, updates_per_candle + 1):
+                fraction = i / updates_per_candle
+                close = o + (c - o) * fraction
+                updates.append(
+                    [
+                        int(timestamp),
+                        f"{o:.8g}",
+                        f"{max(o, close) if i < updates_per_candle else h:.8g}",
+                        f"{min(o, close) if i < updates_per_candle else lo:.8g}",
+                        f"{close:.8g}",
+                        f"{v * fraction:.8g}",
+                    ]
+                )
+        return updates
+
+    def _call(self, endpoint: str) -> Dict[str, Any] | None:
+        with self._lock:
+            self.calls[endpoint] += 1
+            self._reset_expired_window()
+            weight = ENDPOINT_WEIGHTS[endpoint]
+            if weight > self._remaining:
+                return {
+                    "errorCode": 105,
+                    "error": "Your account has been temporarily banned.",
+                }
+            self._remaining -= weight
+
+        if self._latency > 0:
+            self._sleep(self._latency)
+        return None
+
+    def _reset_expired_window(self) -> None:
+        if self._clock() - self._window_start >= self._rate_limit_period:
+            self._window_start = self._clock()
+            self._remaining = self._rate_limit
+
+    def _price(self, market: str) -> str:
+        # Close of the latest 1m candle
+        index = np.array([self._now() // 60_000], dtype=np.int64)
+        return f"{self._generate(market, 60_000, index)[4][0]:.8g}"
+
+    def _generate(
+        self, market: str, step: int, indices: np.ndarray
+    ) -> Tuple[np.ndarray, ...]:
+        # Every candle is a pure function of (seed, market, interval, index),
+        # so overlapping requests agree and no history has to be kept
+        salt = np.uint64(
+            (self._seed * 1_000_003 + sum(map(ord, f"{market}/{step}"))) & 0xFFFFFFFF
+        )
+        noise = [self._noise(indices, salt + np.uint64(k)) for k in range(4)]
+        # Slow cycles plus per-candle noise, around a market-specific level
+        level = 100.0 * (1 + int(salt) % 1000)
+        phase = indices.astype(np.float64)
+        close = level * np.exp(
+            0.2 * np.sin(phase / 5000.0)
+            + 0.05 * np.sin(phase / 300.0)
+            + 0.005 * noise[0]
+        )
+        open_ = level * np.exp(
+            0.2 * np.sin((phase - 1) / 5000.0)
+            + 0.05 * np.sin((phase - 1) / 300.0)
+            + 0.005 * self._noise(indices - 1, salt)
+        )
+        high = np.maximum(open_, close) * (1 + 0.002 * np.abs(noise[1]))
+        low = np.minimum(open_, close) * (1 - 0.002 * np.abs(noise[2]))
+        volume = 10.0 * (1.5 + noise[3])
+
+        return indices * step, open_, high, low, close, volume
+
+    def _noise(self, indices: np.ndarray, salt: np.uint64) -> np.ndarray:
+        # SplitMix64 finalizer, mapped to [-1, 1)
+        with np.errstate(over="ignore"):
+            x = indices.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15) + salt
+            x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+            x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+            x = x ^ (x >> np.uint64(31))
+        return (x >> np.uint64(11)).astype(np.float64) / float(1 << 52) - 1.0
+
+    def _to_milliseconds(self, timestamp: int | datetime) -> int:
+        if isinstance(timestamp, datetime):
+            return int(timestamp.timestamp() * 1000)
+        return timestamp
+
+
+class FakeBitvavoWebsocket:
+    """
+    WebSocket of a `FakeBitvavo`. Nothing is pushed on its own: call
+    `publish` (e.g. with `FakeBitvavo.candle_updates`) or `publish_error`
+    to deliver events to the subscribed callbacks, on the calling thread.
+    """
+
+    def __init__(self) -> None:
+        self._callbacks: Dict[Tuple[str, str], Callable[[Dict[str, Any]], None]] = {}
+        self._error_callback: Callable[[Any], None] | None = None
+        # Set on the first subscription, so a publisher on another thread
+        # can wait for the consumer to be listening
+        self.subscribed = Event()
+        self.closed = False
+
+    def subscriptionCandles(
+        self, market: str, interval: str, callback: Callable[[Dict[str, Any]], None]
+    ) -> None:
+        self._callbacks[(market, interval)] = callback
+        self.subscribed.set()
+
+    def setErrorCallback(self, callback: Callable[[Any], None]) -> None:
+        self._error_callback = callback
+
+    def closeSocket(self) -> None:
+        self.closed = True
+
+    def publish(self, market: str, interval: str, candles: List[List[Any]]) -> None:
+        callback = self._callbacks.get((market, interval))
+        if callback is None:
+            return
+
+        for candle in candles:
+            if self.closed:
+                return
+            callback(
+                {
+                    "event": "candle",
+                    "market": market,
+                    "interval": interval,
+                    "candle": [candle],
+                }
+            )
+
+    def publish_error(self, error: Dict[str, Any]) -> None:
+        if self._error_callback is not None:
+            self._error_callback(error)
@@ -0,0 +1,127 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+import numpy.typing as npt
+import polars as pl
+
+from fart.constants import BALANCE, TIMESTAMP
+from fart.core.broker import (
+    BUY,
+    EXCHANGE_ERROR,
+    FILLED,
+    Broker,
+    Fill,
+    Trade,
+)
+from fart.store.candle_buffer import Candle, CandleBuffer
+
+
+class SimulatedExchange:
+    """
+    `OrderGateway` that fills market orders at the close of the candle
+    being replayed, less `cost_pct` and `slippage_pct` per order (the same
+    costs `calculate_trade_returns` charges per leg).
+
+    Parameters
+    ----------
+    - cost_pct (float): Trading fee per order, as a fraction.
+    - slippage_pct (float): Additional haircut per order, as a fraction.
+
+    """
+
+    def __init__(self, cost_pct: float = 0.0025, slippage_pct: float = 0.0) -> None:
+        self._fill_factor = 1 - cost_pct - slippage_pct
+        self._price = float("nan")
+
+    def set_candle(self, candle: Candle) -> None:
+        """Make `candle`'s close the price orders fill at."""
+        self._price = candle[4]
+
+    def place_market_order(self, market: str, side: str, amount: float) -> Fill:
+        if not amount > 0 or self._price != self._price:
+            return Fill(EXCHANGE_ERROR, 0.0, 0.0)
+
+        if side == BUY:
+            return Fill(FILLED, amount * self._fill_factor / self._price, amount)
+        return Fill(FILLED, amount, amount * self._price * self._fill_factor)
+
+
+def replay(
+    candles: CandleBuffer,
+    predictions: npt.ArrayLike,
+    market: str = "BTC-EUR",
+    initial_capital: float = 500,
+    cost_pct: float = 0.0025,
+    slippage_pct: float = 0.0,
+    threshold: Optional[float] = None,
+    max_holding_period: Optional[int] = None,
+    stop_loss_pct: Optional[float] = None,
+    position_size_pct: float = 1.0,
+    max_drawdown_pct: Optional[float] = None,
+) -> Tuple[pl.DataFrame, List[Trade]]:
+    """
+    Paper-trade cached candles: feed them, in order and as fast as they
+    can be handled, through a `Broker`'s live handlers against a
+    `SimulatedExchange`, so a backtest exercises the exact code path of
+    the live loop. A position still open after the last candle is closed
+    at its close, as in `calculate_trade_returns`.
+
+    Parameters
+    ----------
+    - candles (CandleBuffer): Candles to replay, in timestamp order (e.g.
+      `CandleStore.load()`).
+    - predictions (npt.ArrayLike): Trade signal per candle, available at
+      its close, i.e. the predicted magnitude of the next candle (see
+      `align_predicted_signal`); `NaN` means no signal.
+    - market (str): Market traded.
+    - initial_capital (float): Starting quote currency balance.
+    - cost_pct (float): See `SimulatedExchange`.
+    - slippage_pct (float): See `SimulatedExchange`.
+    - threshold (Optional[float]): See `Broker`. Defaults to the
+      round-trip cost, as in `calculate_trade_returns`.
+    - max_holding_period (Optional[int]): See `Broker`.
+    - stop_loss_pct (Optional[float]): See `Broker`.
+    - position_size_pct (float): See `Broker`.
+    - max_drawdown_pct (Optional[float]): See `Broker`.
+
+    Returns
+    -------
+    - Tuple[pl.DataFrame, List[Trade]]: Equity (`Balance`) at every
+      candle's close, by `Timestamp`, and the closed trades.
+
+    """
+    signals = np.asarray(predictions, dtype=np.float64)
+    if len(signals) != len(candles):
+        raise ValueError(
+            f"predictions must be the same length as candles "
+            f"({len(signals)} != {len(candles)})."
+        )
+
+    exchange = SimulatedExchange(cost_pct=cost_pct, slippage_pct=slippage_pct)
+    # The broker only predicts candles it is listening for, so look each
+    # one's signal up by its position in the replay rather than in turn
+    signal_values = signals.tolist()
+    position = 0
+    broker = Broker(
+        gateway=exchange,
+        predict=lambda candle: signal_values[position],
+        market=market,
+        initial_capital=initial_capital,
+        threshold=(2 * (cost_pct + slippage_pct) if threshold is None else threshold),
+        max_holding_period=max_holding_period,
+        stop_loss_pct=stop_loss_pct,
+        position_size_pct=position_size_pct,
+        max_drawdown_pct=max_drawdown_pct,
+    )
+
+    candle: Optional[Candle] = None
+    for position, candle in enumerate(candles.tolist()):
+        exchange.set_candle(candle)
+        broker.on_candle(candle)
+    if candle is not None:
+        broker.liquidate(candle)
+
+    equity = pl.DataFrame(
+        broker.equity, schema={TIMESTAMP: pl.Int64, BALANCE: pl.Float64}, orient="row"
+    )
+    return equity, broker.trades
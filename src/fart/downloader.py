@@ -1,17 +1,27 @@
-from csv import DictReader
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Tuple
+from queue import Empty, Queue
+from threading import Event
+from typing import Any, Deque, Dict, Iterator, List, Tuple
 
+import numpy as np
 from loguru import logger
 from python_bitvavo_api.bitvavo import Bitvavo
 from tabulate import tabulate
 from tqdm import tqdm
 
-from fart.constants import CLOSE, HIGH, LOW, OPEN, TIMESTAMP, VOLUME
-from fart.utils import get_data_filepath
+from fart.constants import TIMESTAMP
+from fart.features.find_candle_gaps import find_candle_gaps
+from fart.store.candle_buffer import Candle, CandleBuffer
+from fart.store.get_candle_store import get_candle_store
+from fart.token_bucket import TokenBucket
+from fart.utils import interval_to_milliseconds
 
-Candle = Tuple[int, float, float, float, float, float]
+# Rate limit weight of a single `candles` request, per the Bitvavo API
+# documentation
+CANDLES_WEIGHT = 1
 
 
 class Downloader:
@@ -22,123 +32,351 @@ class Downloader:
         interval: str,
         api_key: str | None,
         api_secret: str | None,
+        store_format: str = "csv",
+        max_workers: int = 1,
+        token_bucket: TokenBucket | None = None,
+        client: Bitvavo | None = None,
+        markets: List[Dict[str, Any]] | None = None,
     ):
         self._data_dir = assets_dir
         self._market = market
         self._interval = interval
-        self._client = Bitvavo(
-            {
-                "APIKEY": api_key,
-                "APISECRET": api_secret,
-            }
+        self._store_format = store_format
+        self._max_workers = max_workers
+        self._token_bucket = token_bucket if token_bucket is not None else TokenBucket()
+        # A batch of downloads shares one client and one market metadata
+        # lookup (see `BatchDownloader`), instead of paying for both again
+        # per market/interval
+        self._client = (
+            client
+            if client is not None
+            else Bitvavo(
+                {
+                    "APIKEY": api_key,
+                    "APISECRET": api_secret,
+                }
+            )
         )
-        self._validate_market()
-        self._determine_filepath()
+        self._validate_market(markets)
+        self._determine_store()
         self._log_configuration()
 
-    def download(self) -> None:
-        filepath = self._filepath
-        candle_data = self._load_cached_candle_data(filepath)
-        start_timestamp = self._determine_start_timestamp(candle_data)
+    def download(self) -> int:
+        # Only the last cached candle's timestamp is needed to resume, so
+        # the store is read from its tail rather than loaded in full
+        start_timestamp = self._determine_start_timestamp(self._store.last_timestamp())
         timestamp_list = self._calculate_timestamp_list(
             start_timestamp, interval=self._interval
         )
 
-        for start, end in tqdm(timestamp_list, desc="Downloading"):
-            candles: List[Candle] = self._client.candles(
-                self._market,
-                self._interval,
-                start=self._convert_timestamp(start),
-                end=self._convert_timestamp(end),
+        num_candles = 0
+        for candles in tqdm(
+            self._fetch_candles(timestamp_list),
+            desc=f"Downloading {self._market} {self._interval}",
+            total=len(timestamp_list),
+        ):
+            # Append after each batch to avoid data loss, without rewriting
+            # the candles already persisted by earlier batches
+            self._store.append(candles)
+            num_candles += len(candles)
+
+        return num_candles
+
+    def repair(self) -> int:
+        # Index the holes in the middle of the cached series (e.g. exchange
+        # outages or partial batches, which resuming from the tail never
+        # revisits) and request only the candles missing there
+        if self._store.last_timestamp() is None:
+            return 0
+
+        gaps = find_candle_gaps(
+            self._store.scan().select(TIMESTAMP).collect(), self._interval
+        )
+        timestamp_list = [
+            window
+            for start, end in self._coalesce_gaps(gaps)
+            for window in self._calculate_timestamp_list(
+                start, interval=self._interval, end_timestamp=end
+            )
+        ]
+
+        num_missing = sum(
+            (end - start) // interval_to_milliseconds(self._interval)
+            for start, end in gaps
+        )
+        gap_starts = np.array([start for start, _ in gaps], dtype=np.int64)
+        gap_ends = np.array([end for _, end in gaps], dtype=np.int64)
+        repaired = CandleBuffer()
+        for candles in tqdm(
+            self._fetch_range_candles(timestamp_list),
+            desc=f"Repairing {self._market} {self._interval}",
+            total=len(timestamp_list),
+        ):
+            # A window shared by several gaps also returns the cached
+            # candles between them; keep only the missing ones
+            timestamps = candles.timestamps
+            gap_indices = np.searchsorted(gap_starts, timestamps, side="right") - 1
+            repaired.extend(
+                candles.select(
+                    (gap_indices >= 0)
+                    & (timestamps < gap_ends[np.maximum(gap_indices, 0)])
+                )
             )
-            candles = self._process_candles(candles)
-            candle_data.extend(candles)
-            # Save after each batch to avoid data loss
-            self._save_candle_data(candle_data, filepath)
 
-    def _validate_market(self):
-        markets = self._client.markets()
+        # Merged in once, rather than per window: the CSV store rewrites
+        # its file from the first inserted candle on with every insert
+        self._store.insert(repaired)
+        num_candles = len(repaired)
+
+        # Candles the exchange has no data for (e.g. when trading was
+        # halted) stay missing; they can't be recovered by re-requesting
+        logger.info(
+            f"Repaired {self._market} {self._interval}: {len(gaps)} gaps, "
+            f"{num_candles}/{num_missing} missing candles recovered"
+        )
+
+        return num_candles
+
+    def tail(self, stop: Event | None = None) -> int:
+        """
+        Keep the store current from the WebSocket candle subscription,
+        appending each candle once it has closed, until interrupted (or
+        until `stop` is set and the received candles are persisted).
+
+        Bitvavo pushes the open candle on every trade, so a candle is
+        closed as soon as an update for the next one arrives. Updates
+        older than the last persisted candle are dropped, and whenever
+        updates were missed -- on startup, or after the client reconnects
+        -- the range in between is caught up over REST first.
+
+        Parameters
+        ----------
+        - stop (Event | None): Event to end tailing with, e.g. from another
+          thread.
+
+        Returns
+        -------
+        - int: Number of candles appended to the store.
+
+        """
+        stop = stop if stop is not None else Event()
+        updates: Queue[Candle] = Queue()
+
+        def on_candle(event: Dict[str, Any]) -> None:
+            # Runs on the WebSocket thread; persisting (and any REST
+            # catch-up) happens on the calling thread instead, so a slow
+            # write can't stall the stream
+            for candle in event.get("candle", []):
+                updates.put(CandleBuffer.parse(candle))
+
+        self._last_timestamp = self._store.last_timestamp()
+        self._open_candle: Candle | None = None
+        socket = self._client.newWebsocket()
+        socket.setErrorCallback(self._log_websocket_error)
+        socket.subscriptionCandles(self._market, self._interval, on_candle)
+
+        num_candles = 0
+        try:
+            while not (stop.is_set() and updates.empty()):
+                try:
+                    candle = updates.get(timeout=0.5)
+                except Empty:
+                    continue
+                num_candles += self._process_live_candle(candle)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            socket.closeSocket()
+
+        return num_candles
+
+    def _process_live_candle(self, candle: Candle) -> int:
+        timestamp = candle[0]
+        interval = interval_to_milliseconds(self._interval)
+        open_candle = self._open_candle
+
+        if open_candle is not None and timestamp < open_candle[0]:
+            # Stale update, delivered after a newer candle
+            return 0
+
+        if open_candle is not None and timestamp == open_candle[0]:
+            self._open_candle = candle
+            return 0
+
+        num_candles = 0
+        if open_candle is not None and timestamp == open_candle[0] + interval:
+            # The open candle's last update is final once the next candle
+            # starts
+            num_candles += self._append_closed_candles(
+                CandleBuffer.from_candles([open_candle])
+            )
+        else:
+            # Updates were missed (no candle seen yet, or a reconnect in
+            # between), so the open candle's last update may not be final
+            # either: re-fetch everything up to this candle over REST
+            start = (
+                open_candle[0]
+                if open_candle is not None
+                else self._determine_start_timestamp(self._last_timestamp)
+            )
+            num_candles += self._catch_up(start, timestamp)
+
+        self._open_candle = candle
+
+        return num_candles
+
+    def _catch_up(self, start_timestamp: int, end_timestamp: int) -> int:
+        if start_timestamp >= end_timestamp:
+            return 0
+
+        timestamp_list = self._calculate_timestamp_list(
+            start_timestamp, interval=self._interval, end_timestamp=end_timestamp
+        )
+        num_candles = 0
+        for candles in self._fetch_range_candles(timestamp_list):
+            num_candles += self._append_closed_candles(candles)
+
+        logger.info(f"Caught up {self._market} {self._interval}: {num_candles} candles")
+
+        return num_candles
+
+    def _append_closed_candles(self, candles: CandleBuffer) -> int:
+        # Deduplicate on timestamp against the store's tail, so a candle
+        # caught up over REST is never appended again from the stream
+        if self._last_timestamp is not None:
+            candles = candles.select(candles.timestamps > self._last_timestamp)
+        if not len(candles):
+            return 0
+
+        self._store.append(candles)
+        self._last_timestamp = candles[-1][0]
+
+        return len(candles)
+
+    def _log_websocket_error(self, error: Any) -> None:
+        logger.error(f"WebSocket error for {self._market} {self._interval}: {error}")
+
+    def _fetch_range_candles(
+        self, timestamp_list: List[Tuple[int, int]]
+    ) -> Iterator[CandleBuffer]:
+        # Bitvavo's `end` bound is inclusive, so drop each window's last
+        # candle when it belongs to the next window (or lies past the end
+        # of the range, e.g. the cached candle right after a gap)
+        for (start, end), candles in zip(
+            timestamp_list, self._fetch_candles(timestamp_list)
+        ):
+            timestamps = candles.timestamps
+            yield candles.select((timestamps >= start) & (timestamps < end))
+
+    def _fetch_candles(
+        self, timestamp_list: List[Tuple[int, int]]
+    ) -> Iterator[CandleBuffer]:
+        # Fetch up to `max_workers` windows concurrently, but yield them in
+        # chronological order: a window that completes early waits in
+        # `pending` until every window before it has been yielded, so the
+        # store is still only ever appended to in order. Submission is
+        # bounded to twice the pool size, so a slow window can't cause the
+        # whole backfill to pile up in memory behind it.
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            pending: Deque[Future[CandleBuffer]] = deque()
+
+            for start, end in timestamp_list:
+                pending.append(executor.submit(self._fetch_window, start, end))
+                if len(pending) >= 2 * self._max_workers:
+                    yield pending.popleft().result()
+
+            while pending:
+                yield pending.popleft().result()
+
+    def _fetch_window(self, start: int, end: int) -> CandleBuffer:
+        self._token_bucket.acquire(CANDLES_WEIGHT)
+        candles = self._client.candles(
+            self._market,
+            self._interval,
+            start=self._convert_timestamp(start),
+            end=self._convert_timestamp(end),
+        )
+
+        # Bitvavo returns an error object instead of a list of candles on
+        # failure (e.g. when rate limited)
+        if isinstance(candles, dict):
+            raise RuntimeError(f"Failed to fetch candles: {candles}")
+
+        return self._process_candles(candles)
+
+    def _validate_market(self, markets: List[Dict[str, Any]] | None = None):
+        if markets is None:
+            markets = self._client.markets()
 
         if not any(item["market"] == self._market for item in markets):
             raise ValueError(f"Market '{self._market}' not found in Bitvavo markets")
 
-    def _determine_filepath(self):
+    def _determine_store(self):
         self._data_dir.mkdir(parents=True, exist_ok=True)
-        self._filepath = get_data_filepath(
+        self._store = get_candle_store(
             self._data_dir,
             self._market,
             self._interval,
+            self._store_format,
         )
+        self._filepath = self._store.path
 
     def _log_configuration(self):
         configuration = {
             "data_dir": str(self._data_dir),
             "market": self._market,
             "interval": self._interval,
+            "store_format": self._store_format,
+            "max_workers": self._max_workers,
             "filepath": str(self._filepath),
         }
         table = tabulate(configuration.items())
         logger.info(f"\n\nF.A.R.T. Downloader\n\n{table}\n")
 
-    def _load_cached_candle_data(self, filepath: Path) -> List[Candle]:
-        if not filepath.exists():
-            return []
-
-        with open(filepath, "r", newline="", encoding="utf-8") as file:
-            csv_reader = DictReader(file)
-            data: List[Candle] = []
-
-            for row in csv_reader:
-                data.append(
-                    (
-                        int(row[TIMESTAMP]),
-                        float(row[OPEN]),
-                        float(row[HIGH]),
-                        float(row[LOW]),
-                        float(row[CLOSE]),
-                        float(row[VOLUME]),
-                    )
-                )
-            return data
-
-    def _determine_start_timestamp(self, data: List[Candle]) -> int:
-        # Return the timestamp one interval past the last candle in the
-        # data (so the already-cached candle isn't re-fetched and appended
-        # as a duplicate), or the Bitvavo launch timestamp if no data is
+    def _determine_start_timestamp(self, last_timestamp: int | None) -> int:
+        # Return the timestamp one interval past the last cached candle (so
+        # the already-cached candle isn't re-fetched and appended as a
+        # duplicate), or the Bitvavo launch timestamp if no data is
         # available. The Bitvavo exchange launched on March 9, 2019.
         bitvavo_launch_timestamp = 1552089600000  # 2019/03/09
-        if not data:
+        if last_timestamp is None:
             return bitvavo_launch_timestamp
-        return data[-1][0] + self._interval_to_milliseconds(self._interval)
+        return last_timestamp + interval_to_milliseconds(self._interval)
 
-    def _interval_to_milliseconds(self, interval: str) -> int:
-        if interval.endswith("m"):
-            return int(interval[:-1]) * 60_000
-        elif interval.endswith("h"):
-            return int(interval[:-1]) * 3_600_000
-        elif interval.endswith("d"):
-            return int(interval[:-1]) * 86_400_000
-        elif interval.endswith("W"):
-            return int(interval[:-1]) * 604_800_000
-        elif interval.endswith("M"):
-            return int(interval[:-1]) * 30 * 86_400_000
-        else:
-            raise ValueError(f"Invalid interval: {interval}")
+    def _coalesce_gaps(
+        self,
+        gaps: List[Tuple[int, int]],
+        epochs: int = 1440,  # Max limit per request set by Bitvavo
+    ) -> List[Tuple[int, int]]:
+        # Merge gaps close enough together to be fetched by one request of
+        # at most `epochs` candles, so a run of small gaps costs a single
+        # request rather than one each
+        interval_ms = interval_to_milliseconds(self._interval)
+        ranges: List[Tuple[int, int]] = []
+        for start, end in gaps:
+            if ranges and (end - ranges[-1][0]) // interval_ms <= epochs:
+                ranges[-1] = (ranges[-1][0], end)
+            else:
+                ranges.append((start, end))
+        return ranges
 
     def _calculate_timestamp_list(
         self,
         start_timestamp: int,
         interval: str = "1d",
         epochs: int = 1440,  # Max limit per request set by Bitvavo
+        end_timestamp: int | None = None,
     ) -> List[Tuple[int, int]]:
         timestamps = [start_timestamp]
-        end_timestamp = int(datetime.now().timestamp() * 1000)
+        if end_timestamp is None:
+            end_timestamp = int(datetime.now().timestamp() * 1000)
 
         while start_timestamp < end_timestamp:
             next_timestamp = self._calculate_timestamp(
                 timestamp=start_timestamp,
                 epochs=epochs,
                 interval=interval,
+                end_timestamp=end_timestamp,
             )
             timestamps.append(next_timestamp)
             start_timestamp = next_timestamp
@@ -150,6 +388,7 @@ class Downloader:
         timestamp: int,
         interval: str = "1d",
         epochs: int = 1440,  # Max limit per request set by Bitvavo
+        end_timestamp: int | None = None,
     ) -> int:
         # Convert milliseconds to seconds, then to datetime
         dt_ = datetime.fromtimestamp(timestamp / 1000)
@@ -168,8 +407,13 @@ class Downloader:
         else:
             raise ValueError(f"Invalid interval: {interval}")
 
-        # Add epochs
-        dt = min(dt_ + delta, datetime.now())
+        # Add epochs, capped at the end of the range (now, by default)
+        end = (
+            datetime.now()
+            if end_timestamp is None
+            else datetime.fromtimestamp(end_timestamp / 1000)
+        )
+        dt = min(dt_ + delta, end)
 
         # Convert back to milliseconds
         return int(dt.timestamp() * 1000)
@@ -181,13 +425,8 @@ class Downloader:
         # `candles` method.
         return datetime.fromtimestamp(timestamp / 1000)
 
-    def _process_candles(self, candles: List[Candle]) -> List[Candle]:
-        return sorted(candles, key=lambda candle: candle[0])
-
-    def _save_candle_data(self, candle_data: List[Candle], filepath: Path) -> None:
-        with open(filepath, "w", newline="", encoding="utf-8") as file:
-            file.write(f"{TIMESTAMP},{OPEN},{HIGH},{LOW},{CLOSE},{VOLUME}\n")
-            for candle in candle_data:
-                file.write(
-                    f"{candle[0]},{candle[1]},{candle[2]},{candle[3]},{candle[4]},{candle[5]}\n"
-                )
+    def _process_candles(self, candles: List[List[Any]]) -> CandleBuffer:
+        # Parse Bitvavo's string-valued candles straight into a compact
+        # typed buffer, in chronological order (Bitvavo returns them newest
+        # first)
+        return CandleBuffer.from_candles(candles).sorted()
@@ -0,0 +1,364 @@
+from itertools import product
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+import numpy.typing as npt
+import polars as pl
+
+from fart.features.calculate_trade_returns import (
+    _calculate_growth_prefix,  # pyright: ignore[reportPrivateUsage] -- Shared backtest internals
+    _calculate_net_returns,  # pyright: ignore[reportPrivateUsage] -- Shared backtest internals
+)
+
+SERIES = "Series"
+THRESHOLD = "Threshold"
+STOP_LOSS_PCT = "Stop Loss Pct"
+MAX_HOLDING_PERIOD = "Max Holding Period"
+COST_PCT = "Cost Pct"
+SLIPPAGE_PCT = "Slippage Pct"
+NET_RETURN = "Net Return"
+NUM_TRADES = "Trades"
+HIT_RATE = "Hit Rate"
+MAX_DRAWDOWN = "Max Drawdown"
+
+# Number of stop-loss candidates scanned directly before falling back to
+# a search over per-block minima
+BLOCK_SIZE = 64
+
+
+def backtest_parameter_grid(
+    magnitudes: npt.ArrayLike,
+    thresholds: Sequence[float],
+    predicted_magnitudes: Optional[npt.ArrayLike | Mapping[str, npt.ArrayLike]] = None,
+    stop_loss_pcts: Sequence[Optional[float]] = (None,),
+    max_holding_periods: Sequence[Optional[int]] = (None,),
+    cost_pcts: Sequence[float] = (0.0025,),
+    slippage_pcts: Sequence[float] = (0.0,),
+) -> pl.DataFrame:
+    """
+    Backtest every combination of a parameter grid with
+    `calculate_trade_returns`'s strategy, in one batched pass per
+    prediction series instead of one call per combination.
+
+    All combinations advance trade by trade in lockstep: the next entry,
+    close signal and holding period's end are binary searches vectorized
+    across the grid, and the stop-loss is found from a shared prefix of
+    log growth (see `_calculate_growth_prefix`). Costs and slippage don't
+    move trade boundaries, so each set of trades is priced for every
+    cost/slippage pair at once. The trades match `calculate_trade_returns`
+    up to floating-point ties at the stop-loss level; magnitudes are
+    assumed to be actual price changes, i.e. above -1.
+
+    Parameters
+    ----------
+    - magnitudes (npt.ArrayLike): Signed percent-change magnitudes, one per
+      candle (see `calculate_trade_returns`).
+    - thresholds (Sequence[float]): Entry/exit signal thresholds to try.
+    - predicted_magnitudes (Optional[npt.ArrayLike | Mapping[str,
+      npt.ArrayLike]]): Signal to decide entry/exit on, or several by name
+      (e.g. one per model). Defaults to `magnitudes` itself.
+    - stop_loss_pcts (Sequence[Optional[float]]): Stop-losses to try
+      (`None` for no stop-loss).
+    - max_holding_periods (Sequence[Optional[int]]): Holding period caps to
+      try (`None` for no cap).
+    - cost_pcts (Sequence[float]): Per-leg trading costs to try.
+    - slippage_pcts (Sequence[float]): Per-leg slippages to try.
+
+    Returns
+    -------
+    - pl.DataFrame: One row per series and combination, with the
+      parameters and the compounded `Net Return`, number of `Trades`,
+      `Hit Rate` (fraction of trades with a positive net return, `NaN`
+      without trades) and `Max Drawdown` (largest peak-to-trough fraction
+      of the compounded capital) of its trades.
+
+    """
+    values = np.asarray(magnitudes, dtype=np.float64)
+    if predicted_magnitudes is None:
+        signals = {"magnitudes": values}
+    elif isinstance(predicted_magnitudes, Mapping):
+        signals = {
+            name: np.asarray(signal, dtype=np.float64)
+            for name, signal in predicted_magnitudes.items()
+        }
+    else:
+        signals = {
+            "predicted_magnitudes": np.asarray(predicted_magnitudes, dtype=np.float64)
+        }
+
+    for name, signal_values in signals.items():
+        if signal_values.shape != values.shape:
+            raise ValueError(
+                f"Predicted magnitudes '{name}' must be the same length as "
+                f"magnitudes ({len(signal_values)} != {len(values)})."
+            )
+
+    configs = list(product(thresholds, stop_loss_pcts, max_holding_periods))
+    costs = list(product(cost_pcts, slippage_pcts))
+    cost_factors = np.array(
+        [(1 - cost_pct - slippage_pct) ** 2 for cost_pct, slippage_pct in costs]
+    )
+
+    frames: List[pl.DataFrame] = []
+    for name, signal_values in signals.items():
+        metrics = _backtest_signal(values, signal_values, configs, cost_factors)
+        num_rows = len(configs) * len(costs)
+        frames.append(
+            pl.DataFrame(
+                {
+                    SERIES: [name] * num_rows,
+                    THRESHOLD: np.repeat([c[0] for c in configs], len(costs)),
+                    STOP_LOSS_PCT: pl.Series(
+                        [c[1] for c in configs for _ in costs], dtype=pl.Float64
+                    ),
+                    MAX_HOLDING_PERIOD: pl.Series(
+                        [c[2] for c in configs for _ in costs], dtype=pl.Int64
+                    ),
+                    COST_PCT: np.tile([c[0] for c in costs], len(configs)),
+                    SLIPPAGE_PCT: np.tile([c[1] for c in costs], len(configs)),
+                    **{column: array.ravel() for column, array in metrics.items()},
+                }
+            )
+        )
+
+    return pl.concat(frames)
+
+
+def _backtest_signal(
+    values: npt.NDArray[np.float64],
+    signal_values: npt.NDArray[np.float64],
+    configs: List[tuple[float, Optional[float], Optional[int]]],
+    cost_factors: npt.NDArray[np.float64],
+    spans: Optional[npt.NDArray[np.int64]] = None,
+) -> Dict[str, npt.NDArray[Any]]:
+    # `spans` optionally confines each config to its own `[first, last]`
+    # candles (rows), e.g. one of several series laid end to end; a trade
+    # still open at `last` is closed there, as at the end of the data
+    num_configs = len(configs)
+    if spans is None:
+        spans = np.tile(
+            np.array([0, len(values) - 1], dtype=np.int64), (num_configs, 1)
+        )
+    last_indices = spans[:, 1]
+
+    is_valid = ~np.isnan(signal_values)
+    valid_indices = np.flatnonzero(is_valid)
+    # Log growth since the first candle, moved only by candles with a valid
+    # signal -- the stop-loss's running return since entry is the
+    # difference of two entries
+    log_growth = np.cumsum(
+        np.log1p(np.where(is_valid & ~np.isnan(values), values, 0.0))
+    )
+    # Padded by a block of +inf, so block scans never run off the end
+    valid_log_growth = np.concatenate(
+        [log_growth[valid_indices], np.full(BLOCK_SIZE, np.inf)]
+    )
+    block_minima = _build_block_minima(valid_log_growth[:-BLOCK_SIZE])
+    growth_prefix = _calculate_growth_prefix(values)
+
+    # The entry (and close) candidates of every distinct threshold, laid
+    # end to end with each threshold's block shifted past the previous one,
+    # so a single binary search serves configs of all thresholds at once
+    unique_thresholds, threshold_ids = np.unique(
+        [config[0] for config in configs], return_inverse=True
+    )
+    offset = len(values) + 1
+    entry_candidates = _concatenate_shifted(
+        [
+            np.flatnonzero(is_valid & (signal_values > threshold))
+            for threshold in unique_thresholds
+        ],
+        offset,
+    )
+    close_candidates = _concatenate_shifted(
+        [
+            np.flatnonzero(is_valid & (signal_values < -threshold))
+            for threshold in unique_thresholds
+        ],
+        offset,
+    )
+    shifts = threshold_ids.astype(np.int64) * offset
+    holding_periods = np.array(
+        [-1 if config[2] is None else max(config[2], 0) for config in configs]
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Running return <= -stop_loss_pct, in log growth; NaN disables it
+        stop_levels = np.log1p(
+            -np.array(
+                [np.nan if config[1] is None else config[1] for config in configs]
+            )
+        )
+
+    # Per-config (rows) and per-cost (columns) metrics of finished configs
+    shape = (num_configs, len(cost_factors))
+    num_trades = np.zeros(num_configs)
+    num_wins = np.zeros(shape)
+    log_equity = np.zeros(shape)
+    max_drawdown = np.zeros(shape)
+
+    # Configs still trading, where each resumes looking for an entry, and
+    # their running metrics, row-aligned with `ids`; all shrink as configs
+    # run out of entries, so the rounds after the busiest configs' last
+    # trades get cheaper
+    ids = np.arange(num_configs)
+    starts = spans[:, 0].copy()
+    trades = np.zeros(num_configs)
+    wins = np.zeros(shape)
+    equity = np.zeros(shape)
+    peak_equity = np.zeros(shape)
+    drawdown = np.zeros(shape)
+    while len(ids):
+        entries = _search_next(entry_candidates, starts + shifts[ids], -1)
+        has_entry = (entries >= 0) & (entries <= shifts[ids] + last_indices[ids])
+        if not has_entry.all():
+            done = ids[~has_entry]
+            num_trades[done] = trades[~has_entry]
+            num_wins[done] = wins[~has_entry]
+            log_equity[done] = equity[~has_entry]
+            max_drawdown[done] = drawdown[~has_entry]
+            ids, entries = ids[has_entry], entries[has_entry]
+            trades, wins = trades[has_entry], wins[has_entry]
+            equity, peak_equity = equity[has_entry], peak_equity[has_entry]
+            drawdown = drawdown[has_entry]
+        entries -= shifts[ids]
+        if not len(ids):
+            break
+
+        exits = _search_next(close_candidates, entries + 1 + shifts[ids], -1)
+        exits = np.where(
+            (exits >= 0) & (exits <= shifts[ids] + last_indices[ids]),
+            exits - shifts[ids],
+            last_indices[ids],
+        )
+
+        is_held = holding_periods[ids] >= 0
+        if is_held.any():
+            exits[is_held] = np.minimum(
+                exits[is_held],
+                _search_next(
+                    valid_indices,
+                    np.maximum(entries + holding_periods[ids], entries + 1)[is_held],
+                    len(values) - 1,
+                ),
+            )
+
+        is_stopped = ~np.isnan(stop_levels[ids])
+        if is_stopped.any():
+            hits = _find_first_at_or_below(
+                valid_log_growth,
+                block_minima,
+                np.searchsorted(valid_indices, entries[is_stopped], side="right"),
+                np.searchsorted(valid_indices, exits[is_stopped], side="right") - 1,
+                log_growth[entries[is_stopped]] + stop_levels[ids[is_stopped]],
+            )
+            exits[is_stopped] = np.where(
+                hits >= 0, valid_indices[np.maximum(hits, 0)], exits[is_stopped]
+            )
+
+        # Price this round's trade of every trading config at every cost
+        net_returns = (
+            _calculate_net_returns(growth_prefix, entries, exits, 1.0)[:, None] + 1
+        ) * cost_factors[None, :] - 1
+        trades += 1
+        wins += net_returns > 0
+        equity += np.log1p(net_returns)
+        np.maximum(peak_equity, equity, out=peak_equity)
+        np.maximum(drawdown, -np.expm1(equity - peak_equity), out=drawdown)
+
+        starts = exits + 1
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        hit_rate = num_wins / num_trades[:, None]
+
+    return {
+        NET_RETURN: np.expm1(log_equity),
+        NUM_TRADES: np.repeat(num_trades.astype(np.int64)[:, None], shape[1], axis=1),
+        HIT_RATE: hit_rate,
+        MAX_DRAWDOWN: max_drawdown,
+    }
+
+
+def _concatenate_shifted(
+    arrays: List[npt.NDArray[np.int64]], offset: int
+) -> npt.NDArray[np.int64]:
+    return np.concatenate(
+        [array + i * offset for i, array in enumerate(arrays)] + [np.empty(0, np.int64)]
+    ).astype(np.int64)
+
+
+def _search_next(
+    indices: npt.NDArray[np.int64],
+    positions: npt.NDArray[np.int64],
+    default: int,
+) -> npt.NDArray[np.int64]:
+    # First of the sorted `indices` at or after each position, or `default`
+    k = np.searchsorted(indices, positions)
+    if not len(indices):
+        return np.full(len(positions), default, dtype=np.int64)
+    return np.where(k < len(indices), indices[np.minimum(k, len(indices) - 1)], default)
+
+
+def _build_block_minima(
+    values: npt.NDArray[np.float64],
+) -> List[npt.NDArray[np.float64]]:
+    # Sparse table over the minima of consecutive `BLOCK_SIZE` blocks:
+    # level `j` holds the minimum of the `2 ** j` blocks starting at each
+    # block
+    num_blocks = -(-len(values) // BLOCK_SIZE)
+    padded = np.full(num_blocks * BLOCK_SIZE, np.inf)
+    padded[: len(values)] = values
+    levels = [padded.reshape(num_blocks, BLOCK_SIZE).min(axis=1)]
+    while 2 ** len(levels) <= num_blocks:
+        half = 2 ** (len(levels) - 1)
+        levels.append(np.minimum(levels[-1][:-half], levels[-1][half:]))
+    return levels
+
+
+def _find_first_at_or_below(
+    padded: npt.NDArray[np.float64],
+    block_minima: List[npt.NDArray[np.float64]],
+    lows: npt.NDArray[np.int64],
+    highs: npt.NDArray[np.int64],
+    levels: npt.NDArray[np.float64],
+) -> npt.NDArray[np.int64]:
+    # Vectorized per query: the first position `p` in `[low, high]` with
+    # `padded[p] <= level`, or -1. The first `BLOCK_SIZE` positions are
+    # scanned directly, then the first block after them whose minimum is at
+    # or below the level is found by binary lifting over `block_minima`,
+    # and scanned in turn. Only queries missing the first scan are lifted.
+    hits = _scan_block(padded, lows, highs, levels)
+
+    num_blocks = len(block_minima[0])
+    blocks = (lows + BLOCK_SIZE) // BLOCK_SIZE
+    (misses,) = np.nonzero((hits < 0) & (blocks * BLOCK_SIZE <= highs))
+    if not len(misses):
+        return hits
+
+    blocks, miss_levels = blocks[misses], levels[misses]
+    for level in range(len(block_minima) - 1, -1, -1):
+        table = block_minima[level]
+        can_skip = (blocks + 2**level <= num_blocks) & (
+            table[np.minimum(blocks, len(table) - 1)] > miss_levels
+        )
+        blocks = np.where(can_skip, blocks + 2**level, blocks)
+
+    is_found = (blocks < num_blocks) & (blocks * BLOCK_SIZE <= highs[misses])
+    misses = misses[is_found]
+    hits[misses] = _scan_block(
+        padded, blocks[is_found] * BLOCK_SIZE, highs[misses], levels[misses]
+    )
+
+    return hits
+
+
+def _scan_block(
+    padded: npt.NDArray[np.float64],
+    starts: npt.NDArray[np.int64],
+    highs: npt.NDArray[np.int64],
+    levels: npt.NDArray[np.float64],
+) -> npt.NDArray[np.int64]:
+    # First position in `[start, min(high, start + BLOCK_SIZE - 1)]` with a
+    # value at or below the level, or -1
+    positions = starts[:, None] + np.arange(BLOCK_SIZE)[None, :]
+    is_hit = (padded[positions] <= levels[:, None]) & (positions <= highs[:, None])
+    return np.where(is_hit.any(axis=1), starts + np.argmax(is_hit, axis=1), -1)
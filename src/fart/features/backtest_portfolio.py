@@ -0,0 +1,204 @@
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import numpy.typing as npt
+import polars as pl
+
+from fart.constants import PROFIT_LOSS
+
+MARKET = "Market"
+NUM_TRADES = "Trades"
+HIT_RATE = "Hit Rate"
+PORTFOLIO = "Portfolio"
+
+
+def backtest_portfolio(
+    magnitudes: npt.ArrayLike,
+    predicted_magnitudes: Optional[npt.ArrayLike] = None,
+    markets: Optional[Sequence[str]] = None,
+    initial_capital: float = 500,
+    cost_pct: float = 0.0025,
+    slippage_pct: float = 0.0,
+    threshold: Optional[float] = None,
+    max_holding_period: Optional[int] = None,
+    stop_loss_pct: Optional[float] = None,
+) -> Tuple[pl.DataFrame, pl.DataFrame]:
+    """
+    Backtest `calculate_trade_returns`'s long-only strategy on many markets
+    at once, out of one shared pool of capital.
+
+    Every market (column) follows the same entry/exit rules as
+    `calculate_trade_returns` on its own column. The markets compete for
+    the cash, though: a market entering a position is allocated an equal
+    share of the cash among the markets that are flat at that moment, so
+    capital freed by one market's exit is available to any other. The
+    loop runs over time only; each step is vectorized across markets.
+
+    Parameters
+    ----------
+    - magnitudes (npt.ArrayLike): Signed percent-change magnitudes, shape
+      (time, market), rows aligned on the same candle timestamps. A `NaN`
+      (e.g. before a market was listed) counts as no price change.
+    - predicted_magnitudes (Optional[npt.ArrayLike]): Signal to decide
+      entry/exit on, same shape as `magnitudes`. Defaults to `magnitudes`
+      itself. A `NaN` is treated as no signal for that market and candle.
+    - markets (Optional[Sequence[str]]): Name of each column. Defaults to
+      the column indices.
+    - initial_capital (float): Starting cash shared by all markets.
+    - cost_pct (float): See `calculate_trade_returns`.
+    - slippage_pct (float): See `calculate_trade_returns`.
+    - threshold (Optional[float]): See `calculate_trade_returns`.
+    - max_holding_period (Optional[int]): See `calculate_trade_returns`.
+    - stop_loss_pct (Optional[float]): See `calculate_trade_returns`.
+
+    Returns
+    -------
+    - Tuple[pl.DataFrame, pl.DataFrame]: `(equity, summary)`. `equity`
+      has one row per candle: each market's running profit/loss (realized
+      plus open positions marked to market) and the `Portfolio` equity.
+      Positions still open at the last candle are closed there, as in
+      `calculate_trade_returns`. `summary` has one row per market with
+      its number of trades, total profit/loss and hit rate.
+
+    """
+    values = _as_columns(magnitudes)
+    signal_values = (
+        _as_columns(predicted_magnitudes)
+        if predicted_magnitudes is not None
+        else values
+    )
+    if signal_values.shape != values.shape:
+        raise ValueError(
+            f"predicted_magnitudes must be the same shape as magnitudes "
+            f"({signal_values.shape} != {values.shape})."
+        )
+    num_candles, num_markets = values.shape
+    names = (
+        list(markets) if markets is not None else [str(i) for i in range(num_markets)]
+    )
+    if len(names) != num_markets:
+        raise ValueError(f"Expected {num_markets} market names, got {len(names)}.")
+
+    if threshold is None:
+        threshold = 2 * (cost_pct + slippage_pct)
+    leg_factor = 1 - cost_pct - slippage_pct
+    growth = 1 + np.nan_to_num(values, nan=0.0)
+
+    cash = float(initial_capital)
+    is_open = np.zeros(num_markets, dtype=bool)
+    entry_indices = np.zeros(num_markets, dtype=np.int64)
+    # Per open position: its mark-to-market value, the cash it took, and
+    # the running return the stop-loss watches
+    position_values = np.zeros(num_markets)
+    cost_bases = np.zeros(num_markets)
+    running_growth = np.ones(num_markets)
+    realized = np.zeros(num_markets)
+    num_trades = np.zeros(num_markets, dtype=np.int64)
+    num_wins = np.zeros(num_markets, dtype=np.int64)
+    profit_loss = np.empty((num_candles, num_markets))
+
+    for i in range(num_candles):
+        signal = signal_values[i]
+        is_valid = ~np.isnan(signal)
+
+        # Positions opened before this candle move with it; the stop-loss,
+        # like `calculate_trade_returns`, only looks at candles with a
+        # signal
+        position_values[is_open] *= growth[i, is_open]
+        is_watched = is_open & is_valid
+        running_growth[is_watched] *= growth[i, is_watched]
+
+        is_closing = is_watched & (signal < -threshold)
+        if max_holding_period is not None:
+            is_closing |= is_watched & (i - entry_indices >= max_holding_period)
+        if stop_loss_pct is not None:
+            is_closing |= is_watched & (running_growth - 1 <= -stop_loss_pct)
+        if i == num_candles - 1:
+            is_closing |= is_open
+        if is_closing.any():
+            cash = _close_positions(
+                is_closing,
+                cash,
+                leg_factor,
+                is_open,
+                position_values,
+                cost_bases,
+                realized,
+                num_trades,
+                num_wins,
+            )
+
+        # A market can't re-enter on the candle it exited on
+        is_entering = ~is_open & ~is_closing & is_valid & (signal > threshold)
+        if is_entering.any():
+            num_flat = num_markets - int(is_open.sum()) - int(is_closing.sum())
+            allocations = np.where(is_entering, cash / num_flat, 0.0)
+            cash -= float(allocations.sum())
+            is_open |= is_entering
+            entry_indices[is_entering] = i
+            cost_bases[is_entering] = allocations[is_entering]
+            position_values[is_entering] = allocations[is_entering] * leg_factor
+            running_growth[is_entering] = 1.0
+            if i == num_candles - 1:
+                cash = _close_positions(
+                    is_entering,
+                    cash,
+                    leg_factor,
+                    is_open,
+                    position_values,
+                    cost_bases,
+                    realized,
+                    num_trades,
+                    num_wins,
+                )
+
+        profit_loss[i] = realized + np.where(is_open, position_values - cost_bases, 0.0)
+
+    equity = pl.DataFrame(
+        {
+            **{name: profit_loss[:, j] for j, name in enumerate(names)},
+            PORTFOLIO: initial_capital + profit_loss.sum(axis=1),
+        }
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        hit_rate = num_wins / num_trades
+    summary = pl.DataFrame(
+        {
+            MARKET: names,
+            NUM_TRADES: num_trades,
+            PROFIT_LOSS: realized,
+            HIT_RATE: hit_rate,
+        }
+    )
+
+    return equity, summary
+
+
+def _as_columns(array: npt.ArrayLike) -> npt.NDArray[np.float64]:
+    # A single market's 1-D series as a one-column (time, market) array
+    values = np.asarray(array, dtype=np.float64)
+    return values[:, None] if values.ndim == 1 else values
+
+
+def _close_positions(
+    is_closing: npt.NDArray[np.bool_],
+    cash: float,
+    leg_factor: float,
+    is_open: npt.NDArray[np.bool_],
+    position_values: npt.NDArray[np.float64],
+    cost_bases: npt.NDArray[np.float64],
+    realized: npt.NDArray[np.float64],
+    num_trades: npt.NDArray[np.int64],
+    num_wins: npt.NDArray[np.int64],
+) -> float:
+    # Sell the `is_closing` positions, updating the per-market state in
+    # place, and return the cash after the proceeds
+    proceeds = position_values[is_closing] * leg_factor
+    profits = proceeds - cost_bases[is_closing]
+    realized[is_closing] += profits
+    num_trades[is_closing] += 1
+    num_wins[is_closing] += profits > 0
+    is_open[is_closing] = False
+    position_values[is_closing] = 0.0
+    cost_bases[is_closing] = 0.0
+    return cash + float(proceeds.sum())
@@ -0,0 +1,242 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import numpy.typing as npt
+import polars as pl
+from talib import BBANDS as calculate_bbands
+from talib import EMA as calculate_ema
+from talib import RSI as calculate_rsi
+
+from fart.constants import (
+    BBANDS_LOWER,
+    BBANDS_MIDDLE,
+    BBANDS_UPPER,
+    CLOSE,
+    EMA,
+    EMA_FAST,
+    EMA_SLOW,
+    MACD,
+    MACD_HISTOGRAM,
+    MACD_SIGNAL,
+    RSI,
+)
+from fart.features.technical_indicators_config import TechnicalIndicatorsConfig
+
+Columns = Dict[str, npt.NDArray[np.float64]]
+
+# Intermediate series of the MACD lines, left out of the result
+_ALIGNED_FAST_EMA = "Aligned Fast EMA"
+
+
+def calculate_indicator_sweep(
+    df: pl.DataFrame,
+    configs: Sequence[TechnicalIndicatorsConfig],
+    by: Optional[str] = None,
+    max_workers: Optional[int] = None,
+) -> pl.DataFrame:
+    """
+    Calculate the technical indicators of many `TechnicalIndicatorsConfig`
+    variants at once, as one wide feature matrix.
+
+    Each distinct series is computed once, however many configs use it:
+    an EMA period shared by several configs (or by an EMA and a MACD slow
+    line), a MACD line shared by several signal periods, or Bollinger
+    Bands/RSI periods repeated across configs. Columns are named after
+    the indicator and its parameters (e.g. `Exponential Moving Average
+    (21)`) rather than the config; `indicator_sweep_columns` maps a
+    config's `calculate_technical_indicators` columns onto them. The
+    values are the same as `calculate_technical_indicators` gives for each
+    config.
+
+    The TA-Lib calls run on a thread pool, across indicators and markets
+    (TA-Lib releases the GIL while computing).
+
+    Parameters
+    ----------
+    - df (pl.DataFrame): A DataFrame containing close price data, in
+      timestamp order.
+    - configs (Sequence[TechnicalIndicatorsConfig]): Indicator variants.
+    - by (Optional[str]): Column identifying the market of each row, when
+      `df` holds several; each market's indicators only see its own rows
+      (in order). Defaults to one market.
+    - max_workers (Optional[int]): Threads. Defaults to
+      `ThreadPoolExecutor`'s default.
+
+    Returns
+    -------
+    - pl.DataFrame: `df` with every distinct indicator column added.
+
+    """
+    if not configs:
+        raise ValueError("Expected at least one config.")
+
+    closes = df[CLOSE].cast(pl.Float64).to_numpy()
+    if by is None:
+        groups = [np.arange(len(df))]
+    else:
+        groups = [
+            np.asarray(indices, dtype=np.int64)
+            for indices in df.with_row_index()
+            .group_by(by, maintain_order=True)
+            .agg(pl.col("index"))["index"]
+            .to_list()
+        ]
+
+    bbands = sorted(
+        {(c.bbands.period, float(c.bbands.standard_deviation)) for c in configs}
+    )
+    macds = sorted({_macd_periods(c) for c in configs})
+    ema_periods = sorted(
+        {c.ema.fast_period for c in configs}
+        | {c.ema.slow_period for c in configs}
+        | {slow_period for _, slow_period, _ in macds}
+    )
+    macd_lines = sorted({(fast, slow) for fast, slow, _ in macds})
+    rsi_periods = sorted({c.rsi.period for c in configs})
+
+    columns: Columns = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Everything computed straight from the closes first, then the
+        # MACD lines and signals on top of the EMAs
+        tasks: List[Tuple[int, Callable[[], Columns]]] = []
+        for group, indices in enumerate(groups):
+            group_closes = np.ascontiguousarray(closes[indices])
+            tasks += [
+                (group, partial(_bbands, group_closes, period, deviation))
+                for period, deviation in bbands
+            ]
+            tasks += [
+                (group, partial(_ema, group_closes, period)) for period in ema_periods
+            ]
+            tasks += [
+                (group, partial(_aligned_fast_ema, group_closes, fast, slow))
+                for fast, slow in macd_lines
+            ]
+            tasks += [
+                (group, partial(_rsi, group_closes, period)) for period in rsi_periods
+            ]
+        group_columns = _run(executor, tasks, groups, columns)
+
+        tasks = [
+            (group, partial(_macd, group_columns[group], fast, slow, signal))
+            for group in range(len(groups))
+            for fast, slow, signal in macds
+        ]
+        _run(executor, tasks, groups, columns)
+
+    return df.with_columns(
+        pl.Series(name, values)
+        for name, values in columns.items()
+        if not name.startswith(_ALIGNED_FAST_EMA)
+    )
+
+
+def indicator_sweep_columns(config: TechnicalIndicatorsConfig) -> Dict[str, str]:
+    """
+    Map the indicator columns `calculate_technical_indicators` names for
+    `config` to the matching columns of `calculate_indicator_sweep`.
+    """
+    bbands = (config.bbands.period, float(config.bbands.standard_deviation))
+    macd = _macd_periods(config)
+    return {
+        BBANDS_UPPER: _name(BBANDS_UPPER, *bbands),
+        BBANDS_MIDDLE: _name(BBANDS_MIDDLE, bbands[0]),
+        BBANDS_LOWER: _name(BBANDS_LOWER, *bbands),
+        EMA_FAST: _name(EMA, config.ema.fast_period),
+        EMA_SLOW: _name(EMA, config.ema.slow_period),
+        MACD: _name(MACD, *macd),
+        MACD_SIGNAL: _name(MACD_SIGNAL, *macd),
+        MACD_HISTOGRAM: _name(MACD_HISTOGRAM, *macd),
+        RSI: _name(RSI, config.rsi.period),
+    }
+
+
+def _macd_periods(config: TechnicalIndicatorsConfig) -> Tuple[int, int, int]:
+    # TA-Lib swaps fast and slow periods given the wrong way around
+    fast_period, slow_period = sorted(
+        (config.macd.fast_period, config.macd.slow_period)
+    )
+    return fast_period, slow_period, config.macd.signal_period
+
+
+def _name(indicator: str, *parameters: float) -> str:
+    return f"{indicator} ({', '.join(f'{p:g}' for p in parameters)})"
+
+
+def _run(
+    executor: ThreadPoolExecutor,
+    tasks: List[Tuple[int, Callable[[], Columns]]],
+    groups: List[npt.NDArray[np.int64]],
+    columns: Columns,
+) -> List[Columns]:
+    # Run `tasks`, each on one of `groups`' rows, gather their columns
+    # into the full-length `columns` and return each group's own columns
+    num_rows = sum(len(indices) for indices in groups)
+    futures = [(group, executor.submit(task)) for group, task in tasks]
+    group_columns: List[Columns] = [{} for _ in groups]
+    for group, future in futures:
+        for name, values in future.result().items():
+            group_columns[group][name] = values
+            if len(groups) == 1:
+                columns[name] = values
+                continue
+            if name not in columns:
+                # Every row belongs to exactly one group
+                columns[name] = np.empty(num_rows)
+            columns[name][groups[group]] = values
+    return group_columns
+
+
+def _bbands(closes: npt.NDArray[np.float64], period: int, deviation: float) -> Columns:
+    upper, middle, lower = calculate_bbands(
+        closes, timeperiod=period, nbdevup=deviation, nbdevdn=deviation
+    )
+    return {
+        _name(BBANDS_UPPER, period, deviation): upper,
+        _name(BBANDS_MIDDLE, period): middle,
+        _name(BBANDS_LOWER, period, deviation): lower,
+    }
+
+
+def _ema(closes: npt.NDArray[np.float64], period: int) -> Columns:
+    return {_name(EMA, period): calculate_ema(closes, timeperiod=period)}
+
+
+def _aligned_fast_ema(
+    closes: npt.NDArray[np.float64], fast_period: int, slow_period: int
+) -> Columns:
+    # TA-Lib's MACD seeds its fast EMA on the closes leading up to the slow
+    # EMA's first value, so both start on the same candle
+    values = np.full(len(closes), np.nan)
+    offset = slow_period - fast_period
+    if len(closes) > offset:
+        values[offset:] = calculate_ema(closes[offset:], timeperiod=fast_period)
+    return {_name(_ALIGNED_FAST_EMA, fast_period, slow_period): values}
+
+
+def _macd(
+    columns: Columns, fast_period: int, slow_period: int, signal_period: int
+) -> Columns:
+    line = (
+        columns[_name(_ALIGNED_FAST_EMA, fast_period, slow_period)]
+        - columns[_name(EMA, slow_period)]
+    )
+    signal = np.full(len(line), np.nan)
+    if len(line) >= slow_period:
+        signal[slow_period - 1 :] = calculate_ema(
+            line[slow_period - 1 :], timeperiod=signal_period
+        )
+    # Like TA-Lib, no MACD value until its signal has one
+    macd = np.where(np.isnan(signal), np.nan, line)
+    periods = (fast_period, slow_period, signal_period)
+    return {
+        _name(MACD, *periods): macd,
+        _name(MACD_SIGNAL, *periods): signal,
+        _name(MACD_HISTOGRAM, *periods): macd - signal,
+    }
+
+
+def _rsi(closes: npt.NDArray[np.float64], period: int) -> Columns:
+    return {_name(RSI, period): calculate_rsi(closes, timeperiod=period)}
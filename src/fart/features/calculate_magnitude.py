@@ -1,9 +1,10 @@
 import polars as pl
 
 from fart.constants import CLOSE, MAGNITUDE
+from fart.features.frame_type import FrameT
 
 
-def calculate_magnitude(df: pl.DataFrame) -> pl.DataFrame:
+def calculate_magnitude(df: FrameT) -> FrameT:
     """
     Calculate the magnitude of Close price movements as the signed percent
     change between consecutive candles. Sign carries direction (positive =
@@ -11,11 +12,11 @@ def calculate_magnitude(df: pl.DataFrame) -> pl.DataFrame:
 
     Parameters
     ----------
-    - df (pl.DataFrame): A DataFrame containing Close price data.
+    - df (FrameT): A DataFrame or LazyFrame containing Close price data.
 
     Returns
     -------
-    - pl.DataFrame: `df` with a `Magnitude` column added.
+    - FrameT: `df` with a `Magnitude` column added.
 
     """
     return df.with_columns(pl.col(CLOSE).pct_change().alias(MAGNITUDE))
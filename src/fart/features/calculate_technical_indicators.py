@@ -1,4 +1,7 @@
 # External imports
+from functools import partial
+from typing import Optional
+
 import polars as pl
 from talib import BBANDS as calculate_bbands
 from talib import EMA as calculate_ema
@@ -18,21 +21,45 @@ from fart.constants import (
     MACD_SIGNAL,
     RSI,
 )
+from fart.features.frame_type import FrameT
 from fart.features.technical_indicators_config import TechnicalIndicatorsConfig
 
+# Temporary struct column the indicators are computed into
+_INDICATORS = "Indicators"
+_INDICATORS_DTYPE = pl.Struct(
+    {
+        name: pl.Float64
+        for name in (
+            BBANDS_UPPER,
+            BBANDS_MIDDLE,
+            BBANDS_LOWER,
+            EMA_FAST,
+            EMA_SLOW,
+            MACD,
+            MACD_SIGNAL,
+            MACD_HISTOGRAM,
+            RSI,
+        )
+    }
+)
+
 
-def calculate_technical_indicators(df: pl.DataFrame) -> pl.DataFrame:
+def calculate_technical_indicators(
+    df: FrameT, config: Optional[TechnicalIndicatorsConfig] = None
+) -> FrameT:
     """
     Calculate technical indicators for a given DataFrame.
 
     Parameters
     ----------
-    - data_frame (pl.DataFrame): A DataFrame containing close price data.
+    - data_frame (FrameT): A DataFrame or LazyFrame containing close price
+      data.
+    - config (Optional[TechnicalIndicatorsConfig]): Indicator periods.
+      Defaults to `TechnicalIndicatorsConfig()`, as listed below.
 
     Returns
     -------
-    - pl.DataFrame: A DataFrame containing the data with the calculated
-      indicators:
+    - FrameT: `df` with the calculated indicators:
         - Bollinger Bands (Upper, Middle, Lower):
             - Period: 20
             - Standard deviation: 2
@@ -62,8 +89,24 @@ def calculate_technical_indicators(df: pl.DataFrame) -> pl.DataFrame:
     └───────┴─────┴─────────────────────────┘
 
     """
-    config = TechnicalIndicatorsConfig()
-    close_prices = df[CLOSE].to_numpy()
+    config = config if config is not None else TechnicalIndicatorsConfig()
+
+    # TA-Lib works on the whole close series at once, so the indicators are
+    # computed by a single batch expression, which also runs in a lazy query
+    return df.with_columns(
+        pl.col(CLOSE)
+        .map_batches(
+            partial(_calculate_indicators, config=config),
+            return_dtype=_INDICATORS_DTYPE,
+        )
+        .alias(_INDICATORS)
+    ).unnest(_INDICATORS)
+
+
+def _calculate_indicators(
+    close: pl.Series, config: TechnicalIndicatorsConfig
+) -> pl.Series:
+    close_prices = close.cast(pl.Float64).to_numpy()
 
     # Bollinger Bands
     bbands_upper, bbands_middle, bbands_lower = calculate_bbands(
@@ -88,17 +131,16 @@ def calculate_technical_indicators(df: pl.DataFrame) -> pl.DataFrame:
     # Relative Strength Index
     rsi = calculate_rsi(close_prices, timeperiod=config.rsi.period)
 
-    # Return DataFrame with calculated indicators
-    return df.with_columns(
-        [
-            pl.Series(BBANDS_UPPER, bbands_upper),
-            pl.Series(BBANDS_MIDDLE, bbands_middle),
-            pl.Series(BBANDS_LOWER, bbands_lower),
-            pl.Series(EMA_FAST, ema_fast),
-            pl.Series(EMA_SLOW, ema_slow),
-            pl.Series(MACD, macd),
-            pl.Series(MACD_SIGNAL, macd_signal),
-            pl.Series(MACD_HISTOGRAM, macd_histogram),
-            pl.Series(RSI, rsi),
-        ]
-    )
+    return pl.DataFrame(
+        {
+            BBANDS_UPPER: bbands_upper,
+            BBANDS_MIDDLE: bbands_middle,
+            BBANDS_LOWER: bbands_lower,
+            EMA_FAST: ema_fast,
+            EMA_SLOW: ema_slow,
+            MACD: macd,
+            MACD_SIGNAL: macd_signal,
+            MACD_HISTOGRAM: macd_histogram,
+            RSI: rsi,
+        }
+    ).to_struct(_INDICATORS)
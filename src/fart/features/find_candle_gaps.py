@@ -0,0 +1,48 @@
+from typing import List, Tuple
+
+import polars as pl
+
+from fart.constants import TIMESTAMP
+from fart.utils import interval_to_duration
+
+EXPECTED_TIMESTAMP = "Expected Timestamp"
+
+
+def find_candle_gaps(df: pl.DataFrame, interval: str) -> List[Tuple[int, int]]:
+    """
+    Index the holes in a candle series: every range of timestamps between
+    its first and last candle for which no candle exists (e.g. from an
+    exchange outage or a partially fetched batch). Unlike
+    `fill_missing_candles`, the cadence isn't inferred but taken from
+    `interval`, and only the missing ranges are returned rather than a
+    reindexed frame -- so a repair only has to request those ranges.
+
+    Parameters
+    ----------
+    - df (pl.DataFrame): Candle data with a `Timestamp` column, in any
+      order and possibly with duplicate timestamps. Only `Timestamp` is
+      read.
+    - interval (str): Interval of the candles (e.g. '1m', '1h', '1d').
+
+    Returns
+    -------
+    - List[Tuple[int, int]]: `(start, end)` per gap, in chronological
+      order -- `start` is the first missing candle's timestamp, and `end`
+      the timestamp of the next candle present (exclusive).
+
+    """
+    timestamps = df.lazy().select(TIMESTAMP).unique().sort(TIMESTAMP)
+    gaps = (
+        timestamps.with_columns(
+            pl.from_epoch(TIMESTAMP, time_unit="ms")
+            .dt.replace_time_zone("UTC")
+            .dt.offset_by(interval_to_duration(interval))
+            .dt.epoch(time_unit="ms")
+            .shift(1)
+            .alias(EXPECTED_TIMESTAMP)
+        )
+        .filter(pl.col(TIMESTAMP) > pl.col(EXPECTED_TIMESTAMP))
+        .collect()
+    )
+
+    return list(zip(gaps[EXPECTED_TIMESTAMP].to_list(), gaps[TIMESTAMP].to_list()))
@@ -0,0 +1,7 @@
+from typing import TypeVar
+
+import polars as pl
+
+# A feature step given a DataFrame returns a DataFrame, and given a
+# LazyFrame extends its query plan, so steps compose into one lazy query
+FrameT = TypeVar("FrameT", pl.DataFrame, pl.LazyFrame)
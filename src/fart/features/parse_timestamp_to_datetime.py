@@ -1,25 +1,26 @@
 import polars as pl
 
 from fart.constants import DATETIME, TIMESTAMP
+from fart.features.frame_type import FrameT
 
 
-def parse_timestamp_to_datetime(df: pl.DataFrame) -> pl.DataFrame:
+def parse_timestamp_to_datetime(df: FrameT) -> FrameT:
     """
     Parse the timestamp column to a datetime column in the given Polars DataFrame.
 
     Parameters
     ----------
-    - df (pl.DataFrame): Polars DataFrame containing timestamp data.
+    - df (FrameT): Polars DataFrame or LazyFrame containing timestamp data.
 
     Returns
     -------
-    - pl.DataFrame: Polars DataFrame with the timestamp column parsed to a datetime
+    - FrameT: `df` with the timestamp column parsed to a datetime
     column.
 
     """
 
     return df.with_columns(
         [
-            pl.from_epoch(df[TIMESTAMP], time_unit="ms").alias(DATETIME),
+            pl.from_epoch(pl.col(TIMESTAMP), time_unit="ms").alias(DATETIME),
         ]
     )
@@ -0,0 +1,81 @@
+import polars as pl
+
+from fart.constants import CLOSE, DATETIME, HIGH, LOW, OPEN, TIMESTAMP, VOLUME
+from fart.features.sort_and_deduplicate import sort_and_deduplicate
+from fart.utils import interval_to_duration, interval_to_milliseconds
+
+WINDOW_END = "Window End"
+
+
+def resample_candles(
+    df: pl.DataFrame, source_interval: str, interval: str
+) -> pl.DataFrame:
+    """
+    Aggregate candles of `source_interval` into coarser `interval` candles
+    (e.g. 1m into 1h), so every interval of a market can be derived from
+    its finest cached series instead of being downloaded separately.
+
+    Each coarse candle takes the first Open, highest High, lowest Low, last
+    Close and summed Volume of the fine candles in its window, and is
+    timestamped with the window's start (matching Bitvavo's convention).
+    Windows are aligned on UTC calendar boundaries -- weeks start on
+    Monday, months on the 1st. The trailing window is dropped unless the
+    fine candles cover it through to its end, so a still-forming coarse
+    candle is never emitted (and later appended to a store) as if it were
+    closed.
+
+    Parameters
+    ----------
+    - df (pl.DataFrame): Candle data with `Timestamp`, `Open`, `High`,
+      `Low`, `Close` and `Volume` columns, in `source_interval` candles.
+    - source_interval (str): Interval of the candles in `df` (e.g. '1m').
+    - interval (str): Coarser interval to resample to (e.g. '1h', '1d').
+      For intervals up to weeks, it must be a whole multiple of
+      `source_interval`.
+
+    Returns
+    -------
+    - pl.DataFrame: `interval` candles with the same columns as `df`.
+
+    """
+    source_milliseconds = interval_to_milliseconds(source_interval)
+    milliseconds = interval_to_milliseconds(interval)
+    if milliseconds <= source_milliseconds or (
+        not interval.endswith("M") and milliseconds % source_milliseconds != 0
+    ):
+        raise ValueError(
+            f"Cannot resample {source_interval} candles to {interval}: the "
+            f"interval must be a coarser multiple of the source interval."
+        )
+
+    duration = interval_to_duration(interval)
+    df = sort_and_deduplicate(df).with_columns(
+        pl.from_epoch(TIMESTAMP, time_unit="ms")
+        .dt.replace_time_zone("UTC")
+        .alias(DATETIME)
+    )
+    if df.is_empty():
+        return df.select(TIMESTAMP, OPEN, HIGH, LOW, CLOSE, VOLUME)
+
+    last_timestamp = df[TIMESTAMP][-1]
+    resampled = (
+        df.group_by_dynamic(DATETIME, every=duration, closed="left", label="left")
+        .agg(
+            pl.col(OPEN).first(),
+            pl.col(HIGH).max(),
+            pl.col(LOW).min(),
+            pl.col(CLOSE).last(),
+            pl.col(VOLUME).sum(),
+        )
+        .with_columns(
+            pl.col(DATETIME).dt.epoch(time_unit="ms").alias(TIMESTAMP),
+            pl.col(DATETIME)
+            .dt.offset_by(duration)
+            .dt.epoch(time_unit="ms")
+            .alias(WINDOW_END),
+        )
+    )
+
+    return resampled.filter(
+        pl.col(WINDOW_END) <= last_timestamp + source_milliseconds
+    ).select(TIMESTAMP, OPEN, HIGH, LOW, CLOSE, VOLUME)
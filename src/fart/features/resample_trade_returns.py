@@ -0,0 +1,271 @@
+import atexit
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import numpy.typing as npt
+import polars as pl
+
+from fart.features.backtest_parameter_grid import (
+    MAX_DRAWDOWN,
+    NET_RETURN,
+    _backtest_signal,  # pyright: ignore[reportPrivateUsage] -- Shared backtest internals
+)
+from fart.features.calculate_trade_returns import calculate_trade_returns
+
+RESAMPLING_METHODS = ("block", "trades")
+
+METRIC = "Metric"
+OBSERVED = "Observed"
+MEAN = "Mean"
+LOWER = "Lower"
+UPPER = "Upper"
+
+# Resamples per pool task. Fixed rather than derived from the number of
+# workers, so the same seed gives the same resamples on any machine.
+CHUNK_SIZE = 64
+
+# Memory a worker may spend backtesting replays at once, and roughly what
+# each replayed candle costs `_backtest_signal` (its gathered inputs,
+# indices, log growth and candidate arrays). A chunk's replays run in
+# batches within it, sized from the series length alone, so a long series
+# doesn't hold every replay of a chunk in memory together.
+REPLAY_MEMORY_BUDGET = 256 * 2**20
+BYTES_PER_REPLAYED_CANDLE = 128
+
+# Inputs of the resampling worker processes, attached once per process
+_worker_inputs: Dict[str, Any] = {}
+
+
+def resample_trade_returns(
+    magnitudes: npt.ArrayLike,
+    predicted_magnitudes: Optional[npt.ArrayLike] = None,
+    method: str = "block",
+    num_resamples: int = 1000,
+    block_size: Optional[int] = None,
+    confidence: float = 0.95,
+    seed: int = 0,
+    max_workers: Optional[int] = None,
+    cost_pct: float = 0.0025,
+    slippage_pct: float = 0.0,
+    threshold: Optional[float] = None,
+    max_holding_period: Optional[int] = None,
+    stop_loss_pct: Optional[float] = None,
+) -> pl.DataFrame:
+    """
+    Confidence intervals for a `calculate_trade_returns` backtest's net
+    return and max drawdown, from thousands of resampled replays instead
+    of the single equity path one run gives.
+
+    - 'block': moving-block bootstrap of the candles. Each replay
+      rebuilds a series of the same length from randomly drawn runs of
+      `block_size` consecutive (magnitude, prediction) pairs -- keeping
+      short-range autocorrelation intact -- and backtests it again. The
+      replays of a batch run in lockstep on `backtest_parameter_grid`'s
+      engine, so they match `calculate_trade_returns` up to
+      floating-point ties at the stop-loss level. Candles without a
+      magnitude (e.g. the leading NaN) are left out of the blocks; a
+      series without any raises a `ValueError`.
+    - 'trades': Monte Carlo over the trades of the one actual backtest,
+      each replay drawing as many trades with replacement, in random
+      order.
+
+    Replays run in chunks across a process pool. The inputs are placed in
+    shared memory once and attached by each worker on start-up, so tasks
+    only carry a seed rather than a pickled copy of the series.
+
+    Parameters
+    ----------
+    - magnitudes (npt.ArrayLike): Signed percent-change magnitudes, one per
+      candle (see `calculate_trade_returns`).
+    - predicted_magnitudes (Optional[npt.ArrayLike]): Entry/exit signal,
+      same length as `magnitudes`. Defaults to `magnitudes` itself.
+    - method (str): 'block' or 'trades', see above.
+    - num_resamples (int): Number of replays.
+    - block_size (Optional[int]): Candles per block of the 'block'
+      method. Defaults to the cube root of the series length, a common
+      rule of thumb.
+    - confidence (float): Coverage of the percentile intervals, in (0, 1).
+    - seed (int): Seed of the resampling; a given seed always draws the
+      same replays, whatever `max_workers` is.
+    - max_workers (Optional[int]): Worker processes. Defaults to the
+      number of cores; 1 runs every replay in this process.
+    - cost_pct (float): See `calculate_trade_returns`.
+    - slippage_pct (float): See `calculate_trade_returns`.
+    - threshold (Optional[float]): See `calculate_trade_returns`.
+    - max_holding_period (Optional[int]): See `calculate_trade_returns`.
+    - stop_loss_pct (Optional[float]): See `calculate_trade_returns`.
+
+    Returns
+    -------
+    - pl.DataFrame: One row per metric (`Net Return`, `Max Drawdown`) with
+      its value on the actual series and the mean and `confidence`
+      interval bounds over the replays.
+
+    """
+    values = np.asarray(magnitudes, dtype=np.float64)
+    signal_values = (
+        np.asarray(predicted_magnitudes, dtype=np.float64)
+        if predicted_magnitudes is not None
+        else values
+    )
+    if method not in RESAMPLING_METHODS:
+        raise ValueError(
+            f"Unknown method '{method}' (expected one of "
+            f"{', '.join(RESAMPLING_METHODS)})."
+        )
+    if not 0 < confidence < 1:
+        raise ValueError(f"confidence must be in (0, 1), got {confidence}.")
+
+    returns, _ = calculate_trade_returns(
+        values,
+        signal_values,
+        cost_pct=cost_pct,
+        slippage_pct=slippage_pct,
+        threshold=threshold,
+        max_holding_period=max_holding_period,
+        stop_loss_pct=stop_loss_pct,
+    )
+    observed = _summarize_returns(np.asarray(returns)[None, :])
+
+    if method == "block":
+        # A candle without a price change (e.g. the leading NaN) would turn
+        # every replayed trade across it into NaN
+        is_valid = ~np.isnan(values)
+        inputs = np.stack([values[is_valid], signal_values[is_valid]])
+        if not inputs.shape[1]:
+            raise ValueError("Expected at least one candle with a magnitude.")
+        block_size = (
+            max(round(len(values) ** (1 / 3)), 1) if block_size is None else block_size
+        )
+    else:
+        inputs = np.asarray(returns, dtype=np.float64)[None, :]
+
+    seeds = np.random.SeedSequence(seed).spawn(-(-num_resamples // CHUNK_SIZE))
+    chunk_sizes = [
+        min(CHUNK_SIZE, num_resamples - i * CHUNK_SIZE) for i in range(len(seeds))
+    ]
+    resample_chunk = partial(
+        _resample_chunk,
+        method=method,
+        block_size=block_size,
+        config=(
+            2 * (cost_pct + slippage_pct) if threshold is None else threshold,
+            stop_loss_pct,
+            max_holding_period,
+        ),
+        cost_factor=(1 - cost_pct - slippage_pct) ** 2,
+    )
+
+    if max_workers == 1:
+        _worker_inputs["inputs"] = inputs
+        try:
+            chunks = [resample_chunk(s, n) for s, n in zip(seeds, chunk_sizes)]
+        finally:
+            _worker_inputs.clear()
+    else:
+        shared_memory = SharedMemory(create=True, size=max(inputs.nbytes, 1))
+        try:
+            np.ndarray(inputs.shape, inputs.dtype, buffer=shared_memory.buf)[:] = inputs
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                # Spawned rather than forked, like walk-forward's workers: a
+                # fork would copy the parent's torch/Polars thread pools in
+                # whatever state they happen to be in
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_attach_worker_inputs,
+                initargs=(shared_memory.name, inputs.shape),
+            ) as executor:
+                chunks = list(executor.map(resample_chunk, seeds, chunk_sizes))
+        finally:
+            shared_memory.close()
+            shared_memory.unlink()
+
+    samples = np.concatenate([np.empty((0, 2))] + chunks)
+    tail = (1 - confidence) / 2 * 100
+
+    return pl.DataFrame(
+        {
+            METRIC: [NET_RETURN, MAX_DRAWDOWN],
+            OBSERVED: observed[0].tolist(),
+            MEAN: samples.mean(axis=0).tolist(),
+            LOWER: np.percentile(samples, tail, axis=0).tolist(),
+            UPPER: np.percentile(samples, 100 - tail, axis=0).tolist(),
+        }
+    )
+
+
+def _attach_worker_inputs(name: str, shape: Tuple[int, ...]) -> None:
+    # Runs once per worker process: map the parent's inputs without copying,
+    # and unmap them when the worker exits (the parent unlinks them)
+    shared_memory = SharedMemory(name=name)
+    atexit.register(shared_memory.close)
+    _worker_inputs["shared_memory"] = shared_memory
+    _worker_inputs["inputs"] = np.ndarray(shape, np.float64, buffer=shared_memory.buf)
+
+
+def _resample_chunk(
+    seed: np.random.SeedSequence,
+    num_resamples: int,
+    method: str,
+    block_size: Optional[int],
+    config: Tuple[float, Optional[float], Optional[int]],
+    cost_factor: float,
+) -> npt.NDArray[np.float64]:
+    # Net return and max drawdown (columns) of `num_resamples` replays (rows)
+    inputs: npt.NDArray[np.float64] = _worker_inputs["inputs"]
+    rng = np.random.default_rng(seed)
+    length = inputs.shape[1]
+
+    if method == "trades":
+        if not length:
+            return np.zeros((num_resamples, 2))
+        return _summarize_returns(
+            inputs[0][rng.integers(0, length, size=(num_resamples, length))]
+        )
+
+    size = min(block_size or 1, length)
+    num_blocks = -(-length // size)
+    batch_size = max(1, REPLAY_MEMORY_BUDGET // (length * BYTES_PER_REPLAYED_CANDLE))
+    batches: List[npt.NDArray[np.float64]] = []
+    for first in range(0, num_resamples, batch_size):
+        # Drawn batch by batch, the starts are the same as drawn at once
+        num_replays = min(batch_size, num_resamples - first)
+        starts = rng.integers(0, length - size + 1, size=(num_replays, num_blocks))
+        indices = (starts[:, :, None] + np.arange(size)).reshape(num_replays, -1)
+        indices = indices[:, :length].ravel()
+
+        # The batch's replays laid end to end and backtested in lockstep,
+        # each confined to its own stretch, by the parameter grid's engine
+        metrics = _backtest_signal(
+            inputs[0][indices],
+            inputs[1][indices],
+            [config] * num_replays,
+            np.array([cost_factor]),
+            spans=np.stack(
+                [
+                    np.arange(num_replays) * length,
+                    np.arange(1, num_replays + 1) * length - 1,
+                ],
+                axis=1,
+            ),
+        )
+        batches.append(
+            np.stack([metrics[NET_RETURN][:, 0], metrics[MAX_DRAWDOWN][:, 0]], axis=1)
+        )
+    return np.concatenate(batches)
+
+
+def _summarize_returns(returns: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    # Net return and max drawdown (columns) of each row's sequence of
+    # trade returns, compounded from a starting equity of 1
+    equity = np.cumprod(
+        np.concatenate([np.ones((len(returns), 1)), 1 + returns], axis=1), axis=1
+    )
+    drawdown = 1 - equity / np.maximum.accumulate(equity, axis=1)
+    return np.stack([equity[:, -1] - 1, drawdown.max(axis=1)], axis=1).astype(
+        np.float64
+    )
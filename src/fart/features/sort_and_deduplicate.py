@@ -1,9 +1,8 @@
-import polars as pl
-
 from fart.constants import TIMESTAMP
+from fart.features.frame_type import FrameT
 
 
-def sort_and_deduplicate(df: pl.DataFrame) -> pl.DataFrame:
+def sort_and_deduplicate(df: FrameT) -> FrameT:
     """
     Sort data by Timestamp and drop duplicate timestamps, keeping the first
     occurrence. Real candle data can be out of order or contain duplicate
@@ -13,15 +12,15 @@ def sort_and_deduplicate(df: pl.DataFrame) -> pl.DataFrame:
 
     Parameters
     ----------
-    - df (pl.DataFrame): Data with a `Timestamp` column.
+    - df (FrameT): A DataFrame or LazyFrame with a `Timestamp` column.
 
     Returns
     -------
-    - pl.DataFrame: `df` sorted by `Timestamp` with duplicate timestamps
+    - FrameT: `df` sorted by `Timestamp` with duplicate timestamps
     removed.
 
     """
-    if TIMESTAMP not in df.columns:
+    if TIMESTAMP not in df.collect_schema().names():
         return df
 
     return df.sort(TIMESTAMP).unique(
@@ -0,0 +1,277 @@
+from collections import deque
+from math import isnan, nan, sqrt
+from typing import Any, Deque, Dict, Optional
+
+from fart.constants import (
+    BBANDS_LOWER,
+    BBANDS_MIDDLE,
+    BBANDS_UPPER,
+    EMA_FAST,
+    EMA_SLOW,
+    MACD,
+    MACD_HISTOGRAM,
+    MACD_SIGNAL,
+    RSI,
+)
+from fart.features.technical_indicators_config import TechnicalIndicatorsConfig
+
+
+class StreamingTechnicalIndicators:
+    """
+    Incremental counterpart of `calculate_technical_indicators` for the
+    live loop: `update` takes the close of each new candle and returns the
+    latest value of every indicator in (amortized) constant time, instead of
+    recomputing the whole close history.
+
+    Every indicator follows TA-Lib's own recurrences (running SMA sums,
+    SMA-seeded EMAs, MACD's fast EMA aligned on the slow one, Wilder's RSI
+    smoothing), so fed the same closes from the start it gives the same
+    values as the batch path, up to the last bits of rounding (how those
+    round depends on how TA-Lib was compiled, e.g. with fused
+    multiply-adds). Indicators still warming up are `NaN`, as in TA-Lib.
+    `snapshot`/`restore` carry the warm state across restarts.
+
+    Parameters
+    ----------
+    - config (Optional[TechnicalIndicatorsConfig]): Indicator periods.
+      Defaults to `TechnicalIndicatorsConfig()`.
+
+    """
+
+    def __init__(self, config: Optional[TechnicalIndicatorsConfig] = None) -> None:
+        self.config = config if config is not None else TechnicalIndicatorsConfig()
+
+        fast_period = self.config.macd.fast_period
+        slow_period = self.config.macd.slow_period
+        if slow_period < fast_period:
+            # TA-Lib swaps them too
+            fast_period, slow_period = slow_period, fast_period
+
+        self._bbands = _RollingMoments(self.config.bbands.period)
+        self._ema_fast = _Ema(self.config.ema.fast_period)
+        self._ema_slow = _Ema(self.config.ema.slow_period)
+        # TA-Lib seeds MACD's fast EMA on the closes leading up to the
+        # slow EMA's first value, so both start on the same candle
+        self._macd_fast = _Ema(fast_period, skip=slow_period - fast_period)
+        self._macd_slow = _Ema(slow_period)
+        self._macd_signal = _Ema(self.config.macd.signal_period)
+        self._rsi = _Rsi(self.config.rsi.period)
+
+    def update(self, close: float) -> Dict[str, float]:
+        """
+        Add the close of the next candle.
+
+        Parameters
+        ----------
+        - close (float): Close price of the candle.
+
+        Returns
+        -------
+        - Dict[str, float]: Value of each indicator column of
+          `calculate_technical_indicators` at this candle.
+
+        """
+        middle, standard_deviation = self._bbands.update(close)
+        band_width = standard_deviation * self.config.bbands.standard_deviation
+
+        macd_fast = self._macd_fast.update(close)
+        macd_slow = self._macd_slow.update(close)
+        macd = macd_fast - macd_slow
+        macd_signal = nan if isnan(macd) else self._macd_signal.update(macd)
+        if isnan(macd_signal):
+            macd = nan
+
+        return {
+            BBANDS_UPPER: middle + band_width,
+            BBANDS_MIDDLE: middle,
+            BBANDS_LOWER: middle - band_width,
+            EMA_FAST: self._ema_fast.update(close),
+            EMA_SLOW: self._ema_slow.update(close),
+            MACD: macd,
+            MACD_SIGNAL: macd_signal,
+            MACD_HISTOGRAM: macd - macd_signal,
+            RSI: self._rsi.update(close),
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Capture the config and warm state as plain, JSON-serializable
+        values (e.g. to persist alongside the candle store).
+        """
+        return {
+            "config": self.config.model_dump(),
+            "bbands": self._bbands.snapshot(),
+            "ema_fast": self._ema_fast.snapshot(),
+            "ema_slow": self._ema_slow.snapshot(),
+            "macd_fast": self._macd_fast.snapshot(),
+            "macd_slow": self._macd_slow.snapshot(),
+            "macd_signal": self._macd_signal.snapshot(),
+            "rsi": self._rsi.snapshot(),
+        }
+
+    @classmethod
+    def restore(cls, snapshot: Dict[str, Any]) -> "StreamingTechnicalIndicators":
+        """Rebuild an engine, warm, from a `snapshot`."""
+        indicators = cls(TechnicalIndicatorsConfig.model_validate(snapshot["config"]))
+        indicators._bbands.restore(snapshot["bbands"])
+        indicators._ema_fast.restore(snapshot["ema_fast"])
+        indicators._ema_slow.restore(snapshot["ema_slow"])
+        indicators._macd_fast.restore(snapshot["macd_fast"])
+        indicators._macd_slow.restore(snapshot["macd_slow"])
+        indicators._macd_signal.restore(snapshot["macd_signal"])
+        indicators._rsi.restore(snapshot["rsi"])
+        return indicators
+
+
+class _RollingMoments:
+    # Simple moving average over the last `period` values, from a running
+    # sum (TA_INT_SMA), and the population standard deviation around it,
+    # from Welford's sum of squared deviations updated as values enter and
+    # leave the window. Unlike a running sum of squares it doesn't lose
+    # small variances to cancellation against large prices; the rounding
+    # it does accumulate is cleared by resumming the window once every
+    # `period` updates (amortized constant time), and a window of one
+    # repeated value has a deviation of exactly 0, as in TA-Lib.
+
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self.window: Deque[float] = deque(maxlen=period)
+        self.total = 0.0
+        self.mean = 0.0
+        self.squared_deviations = 0.0
+        self.run_length = 0
+        self.updates = 0
+
+    def update(self, value: float) -> tuple[float, float]:
+        self.run_length = (
+            self.run_length + 1 if self.window and value == self.window[-1] else 1
+        )
+        if len(self.window) < self.period:
+            delta = value - self.mean
+            self.mean += delta / (len(self.window) + 1)
+            self.squared_deviations += delta * (value - self.mean)
+        else:
+            removed = self.window[0]
+            previous_mean = self.mean
+            self.mean += (value - removed) / self.period
+            self.squared_deviations += (value - removed) * (
+                value - self.mean + removed - previous_mean
+            )
+        self.window.append(value)
+        self.total += value
+        if len(self.window) < self.period:
+            return nan, nan
+
+        self.updates += 1
+        if self.updates % self.period == 0:
+            self.mean = sum(self.window) / self.period
+            self.squared_deviations = sum(
+                (v - self.mean) * (v - self.mean) for v in self.window
+            )
+
+        # The sum holds the last `period - 1` values between updates
+        mean = self.total / self.period
+        self.total -= self.window[0]
+        if self.run_length >= self.period:
+            return mean, 0.0
+        return mean, sqrt(max(self.squared_deviations, 0.0) / self.period)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "window": list(self.window),
+            "total": self.total,
+            "mean": self.mean,
+            "squared_deviations": self.squared_deviations,
+            "run_length": self.run_length,
+            "updates": self.updates,
+        }
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        self.window.extend(state["window"])
+        self.total = state["total"]
+        self.mean = state["mean"]
+        self.squared_deviations = state["squared_deviations"]
+        self.run_length = state["run_length"]
+        self.updates = state["updates"]
+
+
+class _Ema:
+    # Exponential moving average seeded with the simple average of its
+    # first `period` values, after ignoring the first `skip` (TA_INT_EMA)
+
+    def __init__(self, period: int, skip: int = 0) -> None:
+        self.period = period
+        self.smoothing = 2.0 / (period + 1)
+        self.skip = skip
+        self.count = 0
+        self.value = 0.0
+
+    def update(self, value: float) -> float:
+        self.count += 1
+        if self.count <= self.skip:
+            return nan
+        if self.count < self.skip + self.period:
+            self.value += value
+            return nan
+        if self.count == self.skip + self.period:
+            self.value = (self.value + value) / self.period
+        else:
+            self.value = (value - self.value) * self.smoothing + self.value
+        return self.value
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"count": self.count, "value": self.value}
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        self.count = state["count"]
+        self.value = state["value"]
+
+
+class _Rsi:
+    # Wilder's relative strength index: average gain and loss over the
+    # first `period` changes, then smoothed by 1/`period` (TA_RSI)
+
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self.inverse_period = 1.0 / period
+        self.count = 0
+        self.previous = nan
+        self.gain = 0.0
+        self.loss = 0.0
+
+    def update(self, value: float) -> float:
+        change = value - self.previous
+        self.previous = value
+        self.count += 1
+        if self.count == 1:
+            return nan
+
+        if self.count > self.period + 1:
+            self.gain *= self.period - 1
+            self.loss *= self.period - 1
+        if change < 0:
+            self.loss -= change
+        else:
+            self.gain += change
+        if self.count <= self.period:
+            return nan
+        self.gain *= self.inverse_period
+        self.loss *= self.inverse_period
+
+        total = self.gain + self.loss
+        return 100 * (self.gain / total) if total > 0 else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            # `None` rather than `NaN` before the first value, for strict JSON
+            "previous": None if self.count == 0 else self.previous,
+            "gain": self.gain,
+            "loss": self.loss,
+        }
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        self.count = state["count"]
+        self.previous = nan if state["previous"] is None else state["previous"]
+        self.gain = state["gain"]
+        self.loss = state["loss"]
@@ -2,14 +2,21 @@ import numpy as np
 import torch
 from sklearn.metrics import mean_absolute_error, root_mean_squared_error  # pyright: ignore[reportMissingTypeStubs, reportUnknownVariableType] -- sklearn ships no type stubs (sklearn/metrics/__init__.py)
 from torch import nn
+from torch.utils.data import BatchSampler, SequentialSampler
+
+from fart.model.train_model import (
+    _as_dataset,  # pyright: ignore[reportPrivateUsage] -- Shared minibatch gathering
+)
+from fart.model.window_dataset import WindowDataset
 
 
 def evaluate_model(
     model: nn.Module,
-    x_train: np.ndarray,
-    y_train: np.ndarray,
-    x_test: np.ndarray,
-    y_test: np.ndarray,
+    x_train: np.ndarray | WindowDataset,
+    y_train: np.ndarray | None,
+    x_test: np.ndarray | WindowDataset,
+    y_test: np.ndarray | None,
+    batch_size: int = 1024,
 ) -> tuple[
     np.ndarray,
     np.ndarray,
@@ -20,14 +27,35 @@ def evaluate_model(
     float,
     float,
 ]:
+    """
+    Predict the training and test windows with `model` and score the
+    predictions against their targets.
+
+    Windows are gathered and predicted a minibatch at a time, as in
+    training, so they are never materialized all at once.
+
+    Parameters
+    ----------
+    - model (nn.Module): Trained model.
+    - x_train (np.ndarray | WindowDataset): Training windows, or a
+      `WindowDataset` of windows and targets.
+    - y_train (Optional[np.ndarray]): Training targets, paired with
+      `x_train`. `None` when `x_train` is a `WindowDataset`.
+    - x_test (np.ndarray | WindowDataset): Test windows, as `x_train`.
+    - y_test (Optional[np.ndarray]): Test targets, as `y_train`.
+    - batch_size (int): Number of windows predicted at once.
+
+    Returns
+    -------
+    - Tuple[np.ndarray, np.ndarray, float, float, float, float, float, float]:
+      Training and test predictions, in window order, then directional
+      accuracy, RMSE and MAE on the training and test windows.
+
+    """
     model.eval()
     with torch.no_grad():
-        y_train_pred = (
-            model(torch.tensor(x_train, dtype=torch.float32)).numpy().reshape(-1)
-        )
-        y_test_pred = (
-            model(torch.tensor(x_test, dtype=torch.float32)).numpy().reshape(-1)
-        )
+        y_train_pred, y_train = _predict(model, x_train, y_train, batch_size)
+        y_test_pred, y_test = _predict(model, x_test, y_test, batch_size)
 
     accuracy_train = calculate_accuracy(y_train_pred, y_train)
     accuracy_test = calculate_accuracy(y_test_pred, y_test)
@@ -48,6 +76,25 @@ def evaluate_model(
     )
 
 
+def _predict(
+    model: nn.Module,
+    x: np.ndarray | WindowDataset,
+    y: np.ndarray | None,
+    batch_size: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    # Predictions and targets of every window, in order
+    dataset = _as_dataset(x=x, y=y)
+    predictions = [np.empty(0, dtype=np.float32)]
+    targets = [np.empty(0, dtype=np.float32)]
+    for indices in BatchSampler(
+        SequentialSampler(dataset), batch_size=batch_size, drop_last=False
+    ):
+        x_batch, y_batch = dataset[indices]
+        predictions.append(model(x_batch).numpy().reshape(-1))
+        targets.append(y_batch.numpy())
+    return np.concatenate(predictions), np.concatenate(targets)
+
+
 def calculate_accuracy(
     predicted_returns: np.ndarray,
     real_returns: np.ndarray,
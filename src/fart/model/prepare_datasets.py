@@ -1,10 +1,14 @@
+from functools import partial
 from pathlib import Path
 
 import numpy as np
 import polars as pl
 
+from fart.constants import TIMESTAMP
 from fart.features.calculate_magnitude import calculate_magnitude
 from fart.features.sort_and_deduplicate import sort_and_deduplicate
+from fart.store.feature_cache import FeatureCache
+from fart.store.scan_candle_data import scan_candle_data
 
 
 def prepare_datasets(
@@ -13,6 +17,7 @@ def prepare_datasets(
     num_lags: int,
     train_size: float = 0.6,
     val_size: float = 0.2,
+    cache_dir: Path | None = None,
 ) -> tuple[
     np.ndarray,
     np.ndarray,
@@ -23,13 +28,23 @@ def prepare_datasets(
 ]:
     """
     Prepares the data for training, validation, and testing by loading the
-    data from a CSV file, sorting and deduplicating it by timestamp,
-    calculating the magnitude of the target column, and splitting it into
-    training, validation, and test sets.
+    data from a candle store (CSV file or Parquet directory), sorting and
+    deduplicating it by timestamp, calculating the magnitude of the target
+    column, and splitting it into training, validation, and test sets.
+
+    The feature steps run as one lazy query over the store, so only the
+    columns the target depends on are read (e.g. `Timestamp` and `Close`
+    for `Magnitude`) and no intermediate frame is materialized. Rows are
+    dropped only where the timestamp or target is null or NaN; a null in
+    any other column (e.g. a missing `Volume`) no longer drops its row,
+    since that column isn't read at all. With a
+    `cache_dir`, the target series is cached there (see `FeatureCache`), so
+    a repeat call on unchanged candles skips the pipeline altogether.
 
     Parameters
     ----------
-    - data_filepath (Path): Path to the CSV file containing the data.
+    - data_filepath (Path): Path to the CSV file or Parquet store directory
+      containing the data (see `scan_candle_data`).
     - target (str): The name of the target column in the DataFrame.
     - num_lags (int): Number of past values per input window.
     - train_size (float): The proportion of windows to include in the
@@ -37,11 +52,13 @@ def prepare_datasets(
     - val_size (float): The proportion of windows to include in the
       validation split. The remainder (`1 - train_size - val_size`)
       becomes the test split.
+    - cache_dir (Path | None): Directory of the feature cache (e.g.
+      `artifacts/features`). Defaults to no caching.
 
     Returns
     -------
     - Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
-      A tuple containing:
+      A tuple of views of `data` containing:
         - x_train (np.ndarray): Training windows, shape (n_train, num_lags), float32.
         - y_train (np.ndarray): Training targets, shape (n_train,), float32.
         - x_val (np.ndarray): Validation windows, shape (n_val, num_lags), float32.
@@ -50,10 +67,16 @@ def prepare_datasets(
         - y_test (np.ndarray): Test targets, shape (n_test,), float32.
 
     """
-    df = pl.read_csv(data_filepath)
-    df = sort_and_deduplicate(df)
-    df = calculate_magnitude(df)
-    df = df.fill_nan(None).drop_nulls()
+    if cache_dir is not None:
+        # A Magnitude depends on the previous candle only
+        df = FeatureCache(cache_dir).get(
+            data_filepath,
+            partial(_calculate_target, target=target),
+            config={"target": target},
+            lookback=1,
+        )
+    else:
+        df = _calculate_target(scan_candle_data(data_filepath), target).collect()
 
     data = df[target].to_numpy().astype(np.float32)
 
@@ -62,6 +85,15 @@ def prepare_datasets(
     )
 
 
+def _calculate_target(candles: pl.LazyFrame, target: str) -> pl.LazyFrame:
+    return (
+        candles.pipe(sort_and_deduplicate)
+        .pipe(calculate_magnitude)
+        .select(TIMESTAMP, pl.col(target).fill_nan(None))
+        .drop_nulls()
+    )
+
+
 def train_test_split(
     data: np.ndarray,
     num_lags: int,
@@ -74,6 +106,12 @@ def train_test_split(
     the windows into training, validation, and test sets by row order (no
     shuffling, since this is time series data).
 
+    The windows are a read-only strided view of `data` (window `i` is
+    `data[i : i + num_lags]`), and so are the splits, so building them
+    takes constant time and memory whatever `num_lags`. Consumers copy
+    only the rows they need at a time (e.g. `init_dataloader`, per
+    minibatch).
+
     Parameters
     ----------
     - data (np.ndarray): A numpy array containing the target values, in
@@ -88,7 +126,7 @@ def train_test_split(
     Returns
     -------
     - Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
-      A tuple containing:
+      A tuple of views of `data` containing:
         - x_train (np.ndarray): Training windows, shape (n_train, num_lags), float32.
         - y_train (np.ndarray): Training targets, shape (n_train,), float32.
         - x_val (np.ndarray): Validation windows, shape (n_val, num_lags), float32.
@@ -105,7 +143,8 @@ def train_test_split(
             f"{num_lags + 1} rows for num_lags={num_lags}, got {len(data)}."
         )
 
-    x = np.stack([data[i : i + num_lags] for i in range(num_windows)])
+    # The last value only ever is a target
+    x = np.lib.stride_tricks.sliding_window_view(data[:-1], num_lags)
     y = data[num_lags : num_lags + num_windows]
 
     train_end = int(train_size * num_windows)
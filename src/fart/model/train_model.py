@@ -1,21 +1,33 @@
-from typing import cast
+import math
+from typing import Iterable, Iterator
 
 import numpy as np
 import torch
 import torch.nn as nn
-from torch.utils.data import DataLoader, TensorDataset
+from torch.utils.data import (
+    BatchSampler,
+    DataLoader,
+    Dataset,
+    RandomSampler,
+    SequentialSampler,
+)
 from tqdm import tqdm
 
+from fart.model.window_dataset import WindowDataset
+
 
 def train_model(
     model: nn.Module,
-    x_train: np.ndarray,
-    y_train: np.ndarray,
+    x_train: np.ndarray | WindowDataset,
+    y_train: np.ndarray | None,
     batch_size: int,
     learning_rate: float,
     num_epochs: int,
-    x_val: np.ndarray | None = None,
+    x_val: np.ndarray | WindowDataset | None = None,
     y_val: np.ndarray | None = None,
+    optimizer: torch.optim.Optimizer | None = None,
+    in_memory: bool = False,
+    reuse_buffers: bool = False,
 ) -> tuple[nn.Module, list[dict[str, float]]]:
     """
     Fit `model` on `x_train`/`y_train` for `num_epochs`, in place.
@@ -29,16 +41,33 @@ def train_model(
     Parameters
     ----------
     - model (nn.Module): Untrained model to fit, updated in place.
-    - x_train (np.ndarray): Training windows, shape (n_train, num_lags).
-    - y_train (np.ndarray): Training targets, shape (n_train,).
+    - x_train (np.ndarray | WindowDataset): Training windows, shape
+      (n_train, num_lags), or a `WindowDataset` gathering them from the
+      raw series per minibatch.
+    - y_train (Optional[np.ndarray]): Training targets, shape (n_train,).
+      `None` when `x_train` is a `WindowDataset`, which holds them.
     - batch_size (int): Minibatch size.
     - learning_rate (float): Adam optimizer learning rate.
     - num_epochs (int): Number of training epochs.
-    - x_val (Optional[np.ndarray]): Held-out validation windows, same
-      shape convention as `x_train`. Pass alongside `y_val` to get a
-      per-epoch train-vs-validation loss history.
+    - x_val (Optional[np.ndarray | WindowDataset]): Held-out validation
+      windows, same conventions as `x_train`. Pass alongside `y_val` (or
+      as a `WindowDataset` on its own) to get a per-epoch
+      train-vs-validation loss history.
     - y_val (Optional[np.ndarray]): Held-out validation targets, paired
       with `x_val`.
+    - optimizer (Optional[torch.optim.Optimizer]): Optimizer over
+      `model`'s parameters to keep stepping, e.g. the one of a previous
+      fit to warm-start from, moment estimates included (`learning_rate`
+      is then ignored). Defaults to a fresh
+      `init_optimizer(model, learning_rate)`.
+    - in_memory (bool): Draw minibatches with `TensorBatches` rather than
+      `init_dataloader`'s `DataLoader` -- faster for small models, whose
+      steps the loader's per-batch overhead otherwise dominates, at the
+      cost of holding the training set as tensors. The gain is small (at
+      most about 10%), and compute-bound models such as the CNN can run
+      slightly slower (see `benchmarks/training_throughput.py`).
+    - reuse_buffers (bool): With `in_memory`, gather every minibatch into
+      the same two preallocated tensors.
 
     Returns
     -------
@@ -48,24 +77,34 @@ def train_model(
       plotting a train-vs-validation learning curve.
 
     """
-    train_dataloader = init_dataloader(x=x_train, y=y_train, batch_size=batch_size)
+    if reuse_buffers and not in_memory:
+        raise ValueError("reuse_buffers requires in_memory.")
+    train_batches: Iterable[tuple[torch.Tensor, torch.Tensor]] = (
+        TensorBatches(
+            x=x_train, y=y_train, batch_size=batch_size, reuse_buffers=reuse_buffers
+        )
+        if in_memory
+        else init_dataloader(x=x_train, y=y_train, batch_size=batch_size)
+    )
+    val_dataset = _as_dataset(x=x_val, y=y_val) if x_val is not None else None
     loss_fn = nn.MSELoss()
-    optimizer = init_optimizer(model=model, learning_rate=learning_rate)
+    if optimizer is None:
+        optimizer = init_optimizer(model=model, learning_rate=learning_rate)
 
     loss_history: list[dict[str, float]] = []
     for epoch in tqdm(range(num_epochs), desc="Training"):  # pyright: ignore[reportUnknownMemberType] -- tqdm's __init__ overloads are untyped upstream (tqdm/std.py)
         train_loss = _train_one_epoch(
             model=model,
-            dataloader=train_dataloader,
+            batches=train_batches,
             optimizer=optimizer,
             loss_fn=loss_fn,
         )
 
-        if x_val is not None and y_val is not None:
+        if val_dataset is not None:
             val_loss = _validate(
                 model=model,
-                x_val=x_val,
-                y_val=y_val,
+                dataset=val_dataset,
+                batch_size=batch_size,
                 loss_fn=loss_fn,
             )
             loss_history.append(
@@ -81,19 +120,19 @@ def train_model(
 
 def _train_one_epoch(
     model: nn.Module,
-    dataloader: DataLoader[tuple[torch.Tensor, torch.Tensor]],
+    batches: Iterable[tuple[torch.Tensor, torch.Tensor]],
     optimizer: torch.optim.Optimizer,
     loss_fn: nn.Module,
 ) -> float:
     """
-    Run one training epoch over `dataloader`, updating `model`'s weights
-    in place.
+    Run one training epoch over `batches`, updating `model`'s weights in
+    place.
 
     Parameters
     ----------
     - model (nn.Module): Model to train, updated in place.
-    - dataloader (DataLoader[tuple[torch.Tensor, torch.Tensor]]): Minibatches
-      of `(x_batch, y_batch)`.
+    - batches (Iterable[tuple[torch.Tensor, torch.Tensor]]): Minibatches
+      of `(x_batch, y_batch)`, reshuffled on each iteration.
     - optimizer (torch.optim.Optimizer): Optimizer stepping `model`'s
       parameters.
     - loss_fn (nn.Module): Loss criterion.
@@ -106,7 +145,7 @@ def _train_one_epoch(
     model.train()
     total_loss = 0.0
     total_samples = 0
-    for x_batch, y_batch in dataloader:
+    for x_batch, y_batch in batches:
         optimizer.zero_grad(set_to_none=True)
         output = model(x_batch).squeeze(-1)
         loss = loss_fn(output, y_batch)
@@ -121,8 +160,8 @@ def _train_one_epoch(
 @torch.no_grad()  # pyright: ignore[reportUntypedFunctionDecorator] -- torch.no_grad's decorator overload is untyped upstream (torch/autograd/grad_mode.py)
 def _validate(
     model: nn.Module,
-    x_val: np.ndarray,
-    y_val: np.ndarray,
+    dataset: "WindowDataset | _MinibatchDataset",
+    batch_size: int,
     loss_fn: nn.Module,
 ) -> float:
     """
@@ -132,27 +171,37 @@ def _validate(
     Parameters
     ----------
     - model (nn.Module): Model to evaluate.
-    - x_val (np.ndarray): Validation windows.
-    - y_val (np.ndarray): Validation targets, paired with `x_val`.
+    - dataset (WindowDataset | _MinibatchDataset): Validation windows
+      and targets, fetched a minibatch of indices at a time.
+    - batch_size (int): Number of windows evaluated at once, so the
+      validation windows are never materialized all at once.
     - loss_fn (nn.Module): Loss criterion, same one used for training so
       `train_loss`/`val_loss` stay directly comparable.
 
     Returns
     -------
-    - float: The validation loss.
+    - float: The validation loss, averaged per sample.
 
     """
     model.eval()
-    x_val_tensor = torch.tensor(x_val, dtype=torch.float32)
-    y_val_tensor = torch.tensor(y_val, dtype=torch.float32)
-    output = model(x_val_tensor).squeeze(-1)
+    total_loss = 0.0
+    total_samples = 0
+    for indices in BatchSampler(
+        SequentialSampler(dataset),
+        batch_size=batch_size,
+        drop_last=False,
+    ):
+        x_batch, y_batch = dataset[indices]
+        output = model(x_batch).squeeze(-1)
+        total_loss += loss_fn(output, y_batch).item() * x_batch.shape[0]
+        total_samples += x_batch.shape[0]
 
-    return loss_fn(output, y_val_tensor).item()
+    return total_loss / total_samples
 
 
 def init_dataloader(
-    x: np.ndarray,
-    y: np.ndarray,
+    x: np.ndarray | WindowDataset,
+    y: np.ndarray | None,
     batch_size: int,
 ) -> DataLoader[tuple[torch.Tensor, torch.Tensor]]:
     """
@@ -166,10 +215,17 @@ def init_dataloader(
     it just avoids the optimizer (and `BatchNorm1d`) seeing the same
     temporally-correlated run of windows every epoch.
 
+    `x`/`y` may be read-only views (as `train_test_split` returns): only
+    each minibatch's rows are gathered into a fresh tensor, so the windows
+    are never materialized all at once. A `WindowDataset` goes further
+    and gathers each minibatch's windows straight from the raw series.
+
     Parameters
     ----------
-    - x (np.ndarray): Input windows.
-    - y (np.ndarray): Targets, paired with `x`.
+    - x (np.ndarray | WindowDataset): Input windows, or a `WindowDataset`
+      of windows and targets.
+    - y (Optional[np.ndarray]): Targets, paired with `x`. `None` when `x`
+      is a `WindowDataset`.
     - batch_size (int): Minibatch size.
 
     Returns
@@ -178,19 +234,137 @@ def init_dataloader(
       `(x_batch, y_batch)` tensor pairs each epoch.
 
     """
-    return cast(
-        DataLoader[tuple[torch.Tensor, torch.Tensor]],
-        DataLoader(
-            TensorDataset(
-                torch.tensor(x, dtype=torch.float32),
-                torch.tensor(y, dtype=torch.float32),
-            ),
-            batch_size=batch_size,
-            shuffle=True,
+    dataset = _as_dataset(x=x, y=y)
+    return DataLoader(
+        dataset,
+        # Each sampled item is a whole minibatch of indices
+        sampler=BatchSampler(
+            RandomSampler(dataset), batch_size=batch_size, drop_last=False
         ),
+        batch_size=None,
     )
 
 
+class TensorBatches:
+    """
+    Shuffled minibatches of `(x_batch, y_batch)` gathered from tensors
+    built once, a lighter stand-in for `init_dataloader`'s `DataLoader`
+    when the model is small enough that the loader's per-batch overhead
+    dominates a training step.
+
+    Each iteration is one epoch with the same semantics as
+    `init_dataloader`: one `torch.randperm` draws a fresh order, and each
+    minibatch of it is gathered with one `index_select` per tensor (the
+    last one possibly smaller). Input windows are held as one tensor; a
+    `WindowDataset` holds only its series, and its windows are gathered
+    by index arithmetic.
+
+    With `reuse_buffers`, every minibatch is written into the same two
+    preallocated tensors instead of newly allocated ones, so a minibatch
+    must be consumed (its training step taken) before drawing the next.
+
+    Parameters
+    ----------
+    - x (np.ndarray | WindowDataset): Input windows, or a `WindowDataset`
+      of windows and targets.
+    - y (Optional[np.ndarray]): Targets, paired with `x`. `None` when `x`
+      is a `WindowDataset`.
+    - batch_size (int): Minibatch size.
+    - reuse_buffers (bool): Gather into preallocated minibatch tensors.
+
+    """
+
+    def __init__(
+        self,
+        x: np.ndarray | WindowDataset,
+        y: np.ndarray | None,
+        batch_size: int,
+        reuse_buffers: bool = False,
+    ) -> None:
+        dataset = _as_dataset(x=x, y=y)
+        self.batch_size = batch_size
+        if isinstance(dataset, WindowDataset):
+            self._x = torch.tensor(dataset.series, dtype=torch.float32)
+            self._y = torch.tensor(dataset.targets, dtype=torch.float32)
+            self._starts: torch.Tensor | None = torch.as_tensor(
+                dataset.starts, dtype=torch.int64
+            )
+            self._offsets = torch.arange(dataset.num_lags)
+            window_shape = (dataset.num_lags, *self._x.shape[1:])
+        else:
+            self._x = torch.tensor(dataset.x, dtype=torch.float32)
+            self._y = torch.tensor(dataset.y, dtype=torch.float32)
+            self._starts = None
+            self._offsets = torch.zeros(1, dtype=torch.int64)
+            window_shape = tuple(self._x.shape[1:])
+        self._num_windows = len(dataset)
+
+        self._x_buffer = (
+            torch.empty((batch_size, *window_shape)) if reuse_buffers else None
+        )
+        self._y_buffer = torch.empty(batch_size) if reuse_buffers else None
+        self._window_shape = window_shape
+
+    def __len__(self) -> int:
+        return math.ceil(self._num_windows / self.batch_size)
+
+    def __iter__(self) -> Iterator[tuple[torch.Tensor, torch.Tensor]]:
+        permutation = torch.randperm(self._num_windows)
+        for start in range(0, self._num_windows, self.batch_size):
+            yield self._gather(permutation[start : start + self.batch_size])
+
+    def _gather(self, indices: torch.Tensor) -> tuple[torch.Tensor, torch.Tensor]:
+        # Rows of `_x` making up each window, and each window's target row
+        if self._starts is None:
+            x_rows = y_rows = indices
+        else:
+            starts = self._starts[indices]
+            x_rows = (starts[:, None] + self._offsets).reshape(-1)
+            y_rows = starts + len(self._offsets)
+
+        size = len(indices)
+        if self._x_buffer is None or self._y_buffer is None:
+            return (
+                self._x.index_select(0, x_rows).view(size, *self._window_shape),
+                self._y.index_select(0, y_rows),
+            )
+        x_batch = self._x_buffer[:size]
+        y_batch = self._y_buffer[:size]
+        torch.index_select(self._x, 0, x_rows, out=x_batch.view(-1, *self._x.shape[1:]))
+        torch.index_select(self._y, 0, y_rows, out=y_batch)
+        return x_batch, y_batch
+
+
+def _as_dataset(
+    x: np.ndarray | WindowDataset, y: np.ndarray | None
+) -> "WindowDataset | _MinibatchDataset":
+    if isinstance(x, WindowDataset):
+        if y is not None:
+            raise ValueError("Expected no targets alongside a WindowDataset.")
+        return x
+    if y is None:
+        raise ValueError("Expected targets paired with the input windows.")
+    return _MinibatchDataset(x=x, y=y)
+
+
+class _MinibatchDataset(Dataset[tuple[torch.Tensor, torch.Tensor]]):
+    # Indexed by a list of row indices, gathering those rows of `x`/`y`
+    # into a contiguous minibatch in one go
+
+    def __init__(self, x: np.ndarray, y: np.ndarray) -> None:
+        self.x = x
+        self.y = y
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    def __getitem__(self, indices: list[int]) -> tuple[torch.Tensor, torch.Tensor]:
+        return (
+            torch.as_tensor(self.x[indices], dtype=torch.float32),
+            torch.as_tensor(self.y[indices], dtype=torch.float32),
+        )
+
+
 def init_optimizer(
     model: nn.Module,
     learning_rate: float,
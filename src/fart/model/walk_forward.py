@@ -0,0 +1,351 @@
+import hashlib
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+import numpy.typing as npt
+import polars as pl
+import torch
+from torch import nn
+
+from fart.features.align_predicted_signal import align_predicted_signal
+from fart.features.calculate_trade_returns import calculate_trade_returns
+from fart.model.builder import ModelBuilder
+from fart.model.train_model import init_optimizer, train_model
+
+FOLD = "Fold"
+TRAIN_START = "Train Start"
+TEST_START = "Test Start"
+TEST_END = "Test End"
+EPOCHS = "Epochs"
+NET_RETURN = "Net Return"
+NUM_TRADES = "Trades"
+
+WALK_FORWARD_WINDOWS = ("expanding", "rolling")
+
+
+class Fold(NamedTuple):
+    """Window bounds of one fold, as `[start, end)` lag-window indices."""
+
+    train_start: int
+    test_start: int
+    test_end: int
+
+
+def walk_forward(
+    data: npt.ArrayLike,
+    builder: ModelBuilder,
+    num_lags: int,
+    train_size: int,
+    test_size: int,
+    batch_size: int,
+    learning_rate: float,
+    num_epochs: int,
+    step: int | None = None,
+    window: str = "expanding",
+    initial_capital: float = 500,
+    cost_pct: float = 0.0025,
+    slippage_pct: float = 0.0,
+    threshold: float | None = None,
+    max_holding_period: int | None = None,
+    stop_loss_pct: float | None = None,
+    seed: int = 0,
+    max_workers: int | None = None,
+    cache_dir: Path | None = None,
+    warm_start: bool = False,
+    warm_start_epochs: int | None = None,
+) -> tuple[pl.DataFrame, npt.NDArray[np.float64]]:
+    """
+    Walk-forward backtest of one architecture: for every fold, train a
+    fresh `builder.build()` model on the fold's train windows, predict its
+    test windows, and backtest the aligned predictions with
+    `calculate_trade_returns` (see `align_predicted_signal`).
+
+    Folds are independent, so they're trained in parallel across a process
+    pool, each worker limited to one torch thread so the pool, rather than
+    torch's intra-op threads, spreads the work over the cores. With
+    `warm_start`, every fold after the first instead continues training
+    the previous fold's model and optimizer for `warm_start_epochs`: the
+    folds then run in order, in this process, but each costs a fraction of
+    a cold start since consecutive train windows mostly overlap.
+
+    Parameters
+    ----------
+    - data (npt.ArrayLike): Chronological target column, e.g. magnitudes
+      (see `train_test_split`).
+    - builder (ModelBuilder): Builds each fold's untrained model; must be
+      picklable to reach the worker processes.
+    - num_lags (int): Number of past values per input window.
+    - train_size (int): Number of windows in the first fold's train
+      window, and in every fold's with a 'rolling' `window`.
+    - test_size (int): Number of out-of-sample windows per fold.
+    - batch_size (int): Minibatch size (see `train_model`).
+    - learning_rate (float): Adam learning rate (see `train_model`).
+    - num_epochs (int): Training epochs per fold (see `train_model`).
+    - step (int | None): Number of windows each fold moves forward.
+      Defaults to `test_size`, so the test windows tile the data; it can't
+      be smaller, as the folds' test windows would overlap.
+    - window (str): 'expanding' to train every fold from the first window
+      on, or 'rolling' to train on the last `train_size` windows only.
+    - initial_capital (float): Starting capital of the equity curve.
+    - cost_pct (float): See `calculate_trade_returns`.
+    - slippage_pct (float): See `calculate_trade_returns`.
+    - threshold (float | None): See `calculate_trade_returns`.
+    - max_holding_period (int | None): See `calculate_trade_returns`.
+    - stop_loss_pct (float | None): See `calculate_trade_returns`.
+    - seed (int): Torch seed of the first fold; fold `i` uses `seed + i`,
+      so results don't depend on which worker ran a fold.
+    - max_workers (int | None): Worker processes. Defaults to the
+      number of cores; 1 runs every fold in this process.
+    - cache_dir (Path | None): Directory to cache each fold's
+      train/test windows in, keyed by the data and the fold's bounds, so
+      later runs (e.g. of another architecture) skip building them.
+    - warm_start (bool): Initialize each fold from the previous fold's
+      weights and optimizer state, rather than a fresh `builder.build()`;
+      turn off to compare against cold starts.
+    - warm_start_epochs (int | None): Training epochs of every
+      warm-started fold. Defaults to a quarter of `num_epochs` (at least
+      one).
+
+    Returns
+    -------
+    - tuple[pl.DataFrame, np.ndarray]: One row per fold with its window
+      bounds, training epochs, out-of-sample net return and number of
+      trades, and the out-of-sample equity curve: `initial_capital`
+      compounded by every fold's trades in order, starting with
+      `initial_capital` itself.
+
+    """
+    values = np.asarray(data, dtype=np.float32)
+    folds = calculate_folds(
+        num_windows=len(values) - num_lags,
+        train_size=train_size,
+        test_size=test_size,
+        step=step,
+        window=window,
+    )
+    data_key = hashlib.sha256(values.tobytes()).hexdigest()[:16]
+
+    run_fold = partial(
+        _run_fold,
+        data=values,
+        data_key=data_key,
+        builder=builder,
+        num_lags=num_lags,
+        batch_size=batch_size,
+        learning_rate=learning_rate,
+        num_epochs=num_epochs,
+        cost_pct=cost_pct,
+        slippage_pct=slippage_pct,
+        threshold=threshold,
+        max_holding_period=max_holding_period,
+        stop_loss_pct=stop_loss_pct,
+        cache_dir=cache_dir,
+    )
+
+    if warm_start:
+        warm_start_epochs = (
+            max(num_epochs // 4, 1) if warm_start_epochs is None else warm_start_epochs
+        )
+        epochs = [num_epochs] + [warm_start_epochs] * (len(folds) - 1)
+        torch.manual_seed(seed)  # pyright: ignore[reportUnknownMemberType] -- manual_seed's parameter is untyped upstream (torch/random.py)
+        model = builder.build()
+        optimizer = init_optimizer(model=model, learning_rate=learning_rate)
+        fold_returns = [
+            run_fold(
+                fold=fold,
+                seed=seed + i,
+                num_epochs=epochs[i],
+                model=model,
+                optimizer=optimizer,
+            )
+            for i, fold in enumerate(folds)
+        ]
+    elif max_workers == 1:
+        epochs = [num_epochs] * len(folds)
+        fold_returns = [
+            run_fold(fold=fold, seed=seed + i) for i, fold in enumerate(folds)
+        ]
+    else:
+        epochs = [num_epochs] * len(folds)
+        # Spawned rather than forked workers: forking a process that has
+        # already started torch's thread pools can deadlock
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        ) as executor:
+            futures = [
+                executor.submit(run_fold, fold=fold, seed=seed + i)
+                for i, fold in enumerate(folds)
+            ]
+            fold_returns = [future.result() for future in futures]
+
+    returns = np.concatenate([np.empty(0)] + fold_returns)
+    equity_curve = initial_capital * np.concatenate([[1.0], np.cumprod(1 + returns)])
+
+    summary = pl.DataFrame(
+        {
+            FOLD: list(range(len(folds))),
+            TRAIN_START: [fold.train_start for fold in folds],
+            TEST_START: [fold.test_start for fold in folds],
+            TEST_END: [fold.test_end for fold in folds],
+            EPOCHS: epochs,
+            NET_RETURN: [float(np.prod(1 + r) - 1) for r in fold_returns],
+            NUM_TRADES: [len(r) for r in fold_returns],
+        }
+    )
+
+    return summary, equity_curve
+
+
+def calculate_folds(
+    num_windows: int,
+    train_size: int,
+    test_size: int,
+    step: int | None = None,
+    window: str = "expanding",
+) -> list[Fold]:
+    """
+    Window bounds of every walk-forward fold over `num_windows` lag
+    windows (see `walk_forward`). The last fold's test window is cut short
+    at the end of the data rather than dropped.
+    """
+    step = test_size if step is None else step
+    if window not in WALK_FORWARD_WINDOWS:
+        raise ValueError(
+            f"Unknown window '{window}' (expected one of "
+            f"{', '.join(WALK_FORWARD_WINDOWS)})."
+        )
+    if train_size <= 0 or test_size <= 0:
+        raise ValueError("train_size and test_size must be positive.")
+    if step < test_size:
+        raise ValueError(
+            f"step must be at least test_size ({step} < {test_size}), or the "
+            f"folds' test windows would overlap."
+        )
+    if num_windows <= train_size:
+        raise ValueError(
+            f"Not enough data for a single fold: need more than "
+            f"{train_size} windows, got {num_windows}."
+        )
+
+    folds: list[Fold] = []
+    for test_start in range(train_size, num_windows, step):
+        train_start = test_start - train_size if window == "rolling" else 0
+        folds.append(
+            Fold(train_start, test_start, min(test_start + test_size, num_windows))
+        )
+    return folds
+
+
+def _run_fold(
+    data: npt.NDArray[np.float32],
+    data_key: str,
+    fold: Fold,
+    builder: ModelBuilder,
+    num_lags: int,
+    batch_size: int,
+    learning_rate: float,
+    num_epochs: int,
+    cost_pct: float,
+    slippage_pct: float,
+    threshold: float | None,
+    max_holding_period: int | None,
+    stop_loss_pct: float | None,
+    seed: int,
+    cache_dir: Path | None,
+    model: nn.Module | None = None,
+    optimizer: torch.optim.Optimizer | None = None,
+) -> npt.NDArray[np.float64]:
+    # Train (a fresh model, unless one is given to keep training), predict
+    # and backtest one fold, and return its trades' net returns
+    torch.manual_seed(seed)  # pyright: ignore[reportUnknownMemberType] -- manual_seed's parameter is untyped upstream (torch/random.py)
+
+    x_train, y_train, x_test, y_test = _load_fold_windows(
+        data, data_key, fold, num_lags, cache_dir
+    )
+    model, _ = train_model(
+        model=builder.build() if model is None else model,
+        x_train=x_train,
+        y_train=y_train,
+        batch_size=batch_size,
+        learning_rate=learning_rate,
+        num_epochs=num_epochs,
+        optimizer=optimizer,
+    )
+
+    model.eval()
+    with torch.no_grad():
+        y_pred = model(torch.tensor(x_test)).numpy().reshape(-1)
+
+    returns, _ = calculate_trade_returns(
+        magnitudes=y_test,
+        predicted_magnitudes=align_predicted_signal(y_pred),
+        cost_pct=cost_pct,
+        slippage_pct=slippage_pct,
+        threshold=threshold,
+        max_holding_period=max_holding_period,
+        stop_loss_pct=stop_loss_pct,
+    )
+    return np.asarray(returns, dtype=np.float64)
+
+
+def _init_worker() -> None:
+    # One torch thread per worker process, so the pool doesn't
+    # oversubscribe the cores
+    torch.set_num_threads(1)
+
+
+def _load_fold_windows(
+    data: npt.NDArray[np.float32],
+    data_key: str,
+    fold: Fold,
+    num_lags: int,
+    cache_dir: Path | None,
+) -> tuple[
+    npt.NDArray[np.float32],
+    npt.NDArray[np.float32],
+    npt.NDArray[np.float32],
+    npt.NDArray[np.float32],
+]:
+    fold_key = f"{fold.train_start}-{fold.test_start}-{fold.test_end}"
+    cache_filepath = (
+        cache_dir / f"{data_key}-{num_lags}-{fold_key}.npz"
+        if cache_dir is not None
+        else None
+    )
+    if cache_filepath is not None and cache_filepath.exists():
+        with np.load(cache_filepath) as cached:
+            return (
+                cached["x_train"],
+                cached["y_train"],
+                cached["x_test"],
+                cached["y_test"],
+            )
+
+    # Lag window `i` is `data[i : i + num_lags]`, targeting `data[i + num_lags]`
+    windows = np.lib.stride_tricks.sliding_window_view(
+        data[fold.train_start : fold.test_end + num_lags - 1], num_lags
+    )
+    targets = data[fold.train_start + num_lags : fold.test_end + num_lags]
+    split = fold.test_start - fold.train_start
+    x_train = np.ascontiguousarray(windows[:split])
+    x_test = np.ascontiguousarray(windows[split:])
+    y_train, y_test = targets[:split], targets[split:]
+
+    if cache_filepath is not None:
+        cache_filepath.parent.mkdir(parents=True, exist_ok=True)
+        # Written under a temporary name and renamed, so a fold cached by
+        # a concurrent run is never read half-written
+        tmp_filepath = cache_filepath.with_suffix(f".{os.getpid()}.tmp.npz")
+        np.savez(
+            tmp_filepath, x_train=x_train, y_train=y_train, x_test=x_test, y_test=y_test
+        )
+        tmp_filepath.replace(cache_filepath)
+
+    return x_train, y_train, x_test, y_test
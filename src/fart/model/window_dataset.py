@@ -0,0 +1,164 @@
+from typing import Sequence
+
+import numpy as np
+import numpy.typing as npt
+import torch
+from torch.utils.data import Dataset
+
+
+class WindowDataset(Dataset[tuple[torch.Tensor, torch.Tensor]]):
+    """
+    Lag windows over a raw series, paired with the value following each
+    window as its target, gathered only when a minibatch is fetched.
+
+    Only the series and each window's start row are held, so memory stays
+    proportional to the series length rather than to series length times
+    `num_lags`; indexing with a minibatch of window indices gathers their
+    rows by index arithmetic into fresh tensors. Fetch minibatches through
+    a `BatchSampler` (as `init_dataloader` does) rather than one window at
+    a time.
+
+    Parameters
+    ----------
+    - series (np.ndarray): Values in chronological order, shape (n,), or
+      (n, num_features) for several features per row.
+    - num_lags (int): Number of past rows per input window.
+    - targets (Optional[np.ndarray]): Target value of each row, shape
+      (n,). Defaults to `series` itself, for a 1-D series.
+    - starts (Optional[np.ndarray]): First row of each window. Defaults to
+      every window of the series, in order (the windows of
+      `train_test_split`).
+
+    """
+
+    def __init__(
+        self,
+        series: np.ndarray,
+        num_lags: int,
+        targets: np.ndarray | None = None,
+        starts: npt.NDArray[np.intp] | None = None,
+    ) -> None:
+        if targets is None:
+            if series.ndim != 1:
+                raise ValueError(
+                    "Expected targets for a series with several features per row."
+                )
+            targets = series
+        if len(targets) != len(series):
+            raise ValueError(
+                f"Expected one target per row of the series, got {len(targets)} "
+                f"targets for {len(series)} rows."
+            )
+
+        if starts is None:
+            num_windows = len(series) - num_lags
+            if num_windows <= 0:
+                raise ValueError(
+                    f"Not enough data to build a single window: need at least "
+                    f"{num_lags + 1} rows for num_lags={num_lags}, got {len(series)}."
+                )
+            starts = np.arange(num_windows, dtype=np.intp)
+
+        self.series = series
+        self.targets = targets
+        self.num_lags = num_lags
+        self.starts = starts
+        self._offsets = np.arange(num_lags, dtype=np.intp)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, indices: Sequence[int]) -> tuple[torch.Tensor, torch.Tensor]:
+        """
+        Gather a minibatch of windows.
+
+        Parameters
+        ----------
+        - indices (Sequence[int]): Indices of the windows.
+
+        Returns
+        -------
+        - Tuple[torch.Tensor, torch.Tensor]: The windows, shape
+          (len(indices), num_lags) (or (len(indices), num_lags,
+          num_features)), and their targets, shape (len(indices),), both
+          float32.
+
+        """
+        starts = self.starts[np.asarray(indices, dtype=np.intp)]
+        return (
+            torch.as_tensor(
+                self.series[starts[:, np.newaxis] + self._offsets], dtype=torch.float32
+            ),
+            torch.as_tensor(self.targets[starts + self.num_lags], dtype=torch.float32),
+        )
+
+    def split(
+        self,
+        train_size: float = 0.6,
+        val_size: float = 0.2,
+    ) -> tuple["WindowDataset", "WindowDataset", "WindowDataset"]:
+        """
+        Split the windows into training, validation, and test sets by
+        order, at the same boundaries as `train_test_split`. The splits
+        share the series.
+
+        Parameters
+        ----------
+        - train_size (float): The proportion of windows to include in the
+          training split.
+        - val_size (float): The proportion of windows to include in the
+          validation split. The remainder becomes the test split.
+
+        Returns
+        -------
+        - Tuple[WindowDataset, WindowDataset, WindowDataset]: The
+          training, validation, and test windows.
+
+        """
+        train_end = int(train_size * len(self))
+        val_end = train_end + int(val_size * len(self))
+        return (
+            self._subset(self.starts[:train_end]),
+            self._subset(self.starts[train_end:val_end]),
+            self._subset(self.starts[val_end:]),
+        )
+
+    @classmethod
+    def concat(cls, datasets: Sequence["WindowDataset"]) -> "WindowDataset":
+        """
+        Combine the windows of several series (e.g. one per market) into
+        one dataset, without any window spanning two of them.
+
+        Parameters
+        ----------
+        - datasets (Sequence[WindowDataset]): Datasets with the same
+          `num_lags` and features per row.
+
+        Returns
+        -------
+        - WindowDataset: Every window of `datasets`, in order.
+
+        """
+        if not datasets:
+            raise ValueError("Expected at least one dataset.")
+        num_lags = datasets[0].num_lags
+        if any(dataset.num_lags != num_lags for dataset in datasets):
+            raise ValueError("Expected datasets with the same num_lags.")
+
+        offsets = np.cumsum([0] + [len(dataset.series) for dataset in datasets[:-1]])
+        return cls(
+            series=np.concatenate([dataset.series for dataset in datasets]),
+            num_lags=num_lags,
+            targets=np.concatenate([dataset.targets for dataset in datasets]),
+            starts=np.concatenate(
+                [dataset.starts + offset for dataset, offset in zip(datasets, offsets)]
+            ),
+        )
+
+    def _subset(self, starts: npt.NDArray[np.intp]) -> "WindowDataset":
+        return WindowDataset(
+            series=self.series,
+            num_lags=self.num_lags,
+            targets=self.targets,
+            starts=starts,
+        )
@@ -0,0 +1,140 @@
+from typing import Any, Iterable, Iterator, List, Sequence, Tuple
+
+import numpy as np
+import polars as pl
+
+from fart.constants import CLOSE, HIGH, LOW, OPEN, TIMESTAMP, VOLUME
+
+Candle = Tuple[int, float, float, float, float, float]
+
+CANDLE_DTYPE = np.dtype(
+    [
+        (TIMESTAMP, np.int64),
+        (OPEN, np.float64),
+        (HIGH, np.float64),
+        (LOW, np.float64),
+        (CLOSE, np.float64),
+        (VOLUME, np.float64),
+    ]
+)
+
+
+class CandleBuffer:
+    """
+    Growable, columnar buffer of candles backed by a NumPy structured array
+    (see `CANDLE_DTYPE`).
+
+    Every candle takes exactly its 48 bytes of payload, where a `Candle`
+    tuple in a list costs over 100 bytes more in object overhead.
+    Appending doubles the capacity whenever it runs out, so growing a
+    buffer one candle at a time is still amortized constant time.
+
+    Parameters
+    ----------
+    - capacity (int): Number of candles to allocate room for up front.
+
+    """
+
+    def __init__(self, capacity: int = 1024) -> None:
+        self._array = np.empty(max(capacity, 1), dtype=CANDLE_DTYPE)
+        self._size = 0
+
+    @classmethod
+    def from_candles(cls, candles: Iterable[Sequence[Any]]) -> "CandleBuffer":
+        """
+        Build a buffer from raw candles, e.g. Bitvavo's
+        `[timestamp, "open", "high", "low", "close", "volume"]` lists, in
+        the given order.
+        """
+        rows = [cls.parse(candle) for candle in candles]
+        buffer = cls(len(rows))
+        if rows:
+            buffer._array[: len(rows)] = np.array(rows, dtype=CANDLE_DTYPE)
+            buffer._size = len(rows)
+        return buffer
+
+    @classmethod
+    def from_frame(cls, df: pl.DataFrame) -> "CandleBuffer":
+        """Build a buffer from the candle columns of `df`, in row order."""
+        buffer = cls(len(df))
+        for name in CANDLE_DTYPE.names or ():
+            buffer._array[name][: len(df)] = df[name].to_numpy()
+        buffer._size = len(df)
+        return buffer
+
+    @staticmethod
+    def parse(candle: Sequence[Any]) -> Candle:
+        """Convert a raw candle into a typed `Candle` tuple."""
+        return (
+            int(candle[0]),
+            float(candle[1]),
+            float(candle[2]),
+            float(candle[3]),
+            float(candle[4]),
+            float(candle[5]),
+        )
+
+    @property
+    def array(self) -> np.ndarray:
+        """View of the filled part of the underlying structured array."""
+        return self._array[: self._size]
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._array[TIMESTAMP][: self._size]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: int) -> Candle:
+        if not -self._size <= index < self._size:
+            raise IndexError(f"Candle index {index} out of range")
+        return self.array[index].item()
+
+    def __iter__(self) -> Iterator[Candle]:
+        return iter(self.tolist())
+
+    def append(self, candle: Sequence[Any]) -> None:
+        self._reserve(self._size + 1)
+        self._array[self._size] = self.parse(candle)
+        self._size += 1
+
+    def extend(self, candles: "CandleBuffer") -> None:
+        self._reserve(self._size + len(candles))
+        self._array[self._size : self._size + len(candles)] = candles.array
+        self._size += len(candles)
+
+    def select(self, mask: np.ndarray) -> "CandleBuffer":
+        """
+        Copy of the candles selected by `mask`, a boolean mask or an array
+        of indices.
+        """
+        selected = self.array[mask]
+        buffer = CandleBuffer(len(selected))
+        buffer._array[: len(selected)] = selected
+        buffer._size = len(selected)
+        return buffer
+
+    def sorted(self) -> "CandleBuffer":
+        """Copy of the buffer in timestamp order (stable for ties)."""
+        return self.select(np.argsort(self.timestamps, kind="stable"))
+
+    def tolist(self) -> List[Candle]:
+        return self.array.tolist()
+
+    def to_frame(self) -> pl.DataFrame:
+        """Typed `CANDLE_SCHEMA` frame of the buffered candles."""
+        return pl.DataFrame(
+            {name: self.array[name] for name in CANDLE_DTYPE.names or ()}
+        )
+
+    def _reserve(self, size: int) -> None:
+        capacity = len(self._array)
+        if size <= capacity:
+            return
+
+        while capacity < size:
+            capacity *= 2
+        array = np.empty(capacity, dtype=CANDLE_DTYPE)
+        array[: self._size] = self.array
+        self._array = array
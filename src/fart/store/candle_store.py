@@ -0,0 +1,67 @@
+from pathlib import Path
+from typing import Protocol
+
+import polars as pl
+
+from fart.constants import CLOSE, HIGH, LOW, OPEN, TIMESTAMP, VOLUME
+from fart.store.candle_buffer import CandleBuffer
+
+CANDLE_SCHEMA = pl.Schema(
+    {
+        TIMESTAMP: pl.Int64,
+        OPEN: pl.Float64,
+        HIGH: pl.Float64,
+        LOW: pl.Float64,
+        CLOSE: pl.Float64,
+        VOLUME: pl.Float64,
+    }
+)
+
+
+class CandleStore(Protocol):
+    """
+    Structural interface for a per-market/interval candle cache backend.
+
+    Any object exposing these members satisfies this Protocol -- no
+    inheritance required. `Downloader` only ever appends chronologically
+    ordered batches and reads the cache back, so swapping the on-disk
+    format (CSV, Parquet) is a matter of choosing a different
+    `CandleStore`, not rewriting the download loop.
+
+    """
+
+    @property
+    def path(self) -> Path:
+        """Location of the cache on disk (a file or a directory)."""
+        ...
+
+    def append(self, candles: CandleBuffer) -> None:
+        """Durably persist `candles`, after any already-cached candles."""
+        ...
+
+    def insert(self, candles: CandleBuffer) -> None:
+        """
+        Durably merge `candles` (e.g. backfilled gaps) into the cache in
+        timestamp order. Timestamps already cached are kept, not
+        overwritten. The Parquet store rewrites only the part files the
+        candles fall into; the CSV store, a single file, is rewritten
+        whole (its rows before the first inserted candle copied as is),
+        so merge a batch of candles in one call rather than many.
+        """
+        ...
+
+    def last_timestamp(self) -> int | None:
+        """
+        Timestamp of the last cached candle, or `None` if the cache is
+        empty -- read from the tail of the cache alone, without loading
+        the candles before it.
+        """
+        ...
+
+    def load(self) -> CandleBuffer:
+        """Read every cached candle back, in the order they were appended."""
+        ...
+
+    def scan(self) -> pl.LazyFrame:
+        """Lazily scan the cache as typed `CANDLE_SCHEMA` columns."""
+        ...
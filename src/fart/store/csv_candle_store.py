@@ -0,0 +1,179 @@
+import os
+from pathlib import Path
+
+import polars as pl
+from loguru import logger
+
+from fart.constants import CLOSE, HIGH, LOW, OPEN, TIMESTAMP, VOLUME
+from fart.store.candle_buffer import Candle, CandleBuffer
+from fart.store.candle_store import CANDLE_SCHEMA
+
+
+class CSVCandleStore:
+    """
+    Candle cache backed by a single append-only CSV file, one row per
+    candle.
+
+    Attributes
+    ----------
+    - filepath (Path): Path to the CSV file (see `get_data_filepath`).
+
+    """
+
+    def __init__(self, filepath: Path) -> None:
+        self._filepath = filepath
+
+    @property
+    def path(self) -> Path:
+        return self._filepath
+
+    def append(self, candles: CandleBuffer) -> None:
+        if not candles:
+            return
+
+        filepath = self._filepath
+        write_header = not filepath.exists() or filepath.stat().st_size == 0
+        rows = "".join(self._format_row(candle) for candle in candles)
+
+        with open(filepath, "a", newline="", encoding="utf-8") as file:
+            if write_header:
+                file.write(f"{TIMESTAMP},{OPEN},{HIGH},{LOW},{CLOSE},{VOLUME}\n")
+            file.write(rows)
+            # Flush and fsync so a batch is durable on disk before the next
+            # request is made -- the same per-batch guarantee the previous
+            # full-file rewrite gave, at the cost of one batch's I/O.
+            file.flush()
+            os.fsync(file.fileno())
+
+    def insert(self, candles: CandleBuffer, chunk_size: int = 1 << 20) -> None:
+        if not candles:
+            return
+
+        if self.last_timestamp() is None:
+            self.append(candles.sorted())
+            return
+
+        new_rows = sorted(
+            {
+                int(candle[0]): self._format_row(candle).encode() for candle in candles
+            }.items()
+        )
+        first_new_timestamp = new_rows[0][0]
+
+        with open(self._filepath, "rb") as file:
+            # Find the first row at or after the first inserted candle; only
+            # the rows from there on have to be merged with the new ones.
+            file.readline()  # Header
+            offset = file.tell()
+            line = file.readline()
+            while line and int(line.split(b",", 1)[0]) < first_new_timestamp:
+                offset = file.tell()
+                line = file.readline()
+
+            # A single CSV file can't have rows spliced into its middle, so
+            # the untouched prefix is copied and the rest merged into a
+            # temporary file, which then atomically replaces the original --
+            # an interrupted insert leaves the original intact.
+            tmp_filepath = self._filepath.with_suffix(".csv.tmp")
+            with open(tmp_filepath, "wb") as tmp_file:
+                file.seek(0)
+                remaining = offset
+                while remaining > 0:
+                    chunk = file.read(min(remaining, chunk_size))
+                    tmp_file.write(chunk)
+                    remaining -= len(chunk)
+
+                # Both the cached rows and the new ones are sorted, so they
+                # are merged as they're read, keeping the cached row of a
+                # timestamp present in both
+                new_index = 0
+                for line in file:
+                    timestamp = int(line.split(b",", 1)[0])
+                    while (
+                        new_index < len(new_rows) and new_rows[new_index][0] < timestamp
+                    ):
+                        tmp_file.write(new_rows[new_index][1])
+                        new_index += 1
+                    if (
+                        new_index < len(new_rows)
+                        and new_rows[new_index][0] == timestamp
+                    ):
+                        new_index += 1
+                    tmp_file.write(line)
+                for _, row in new_rows[new_index:]:
+                    tmp_file.write(row)
+                tmp_file.flush()
+                os.fsync(tmp_file.fileno())
+
+        os.replace(tmp_filepath, self._filepath)
+
+    def last_timestamp(self, chunk_size: int = 4096) -> int | None:
+        if not self._filepath.exists():
+            return None
+
+        self._recover_torn_line()
+
+        # Read backwards from the end of the file only as far as needed to
+        # find the start of the last row, so resuming costs the same no
+        # matter how many candles are cached.
+        with open(self._filepath, "rb") as file:
+            end = file.seek(0, os.SEEK_END)
+            tail = b""
+
+            while end > 0:
+                start = max(0, end - chunk_size)
+                file.seek(start)
+                tail = file.read(end - start) + tail
+                end = start
+                if tail.rstrip(b"\n").rfind(b"\n") != -1:
+                    break
+
+        lines = tail.rstrip(b"\n").split(b"\n")
+        if end == 0 and len(lines) < 2:
+            # Only the header row (or nothing) has been written
+            return None
+
+        return int(lines[-1].split(b",", 1)[0])
+
+    def load(self) -> CandleBuffer:
+        if self.last_timestamp() is None:
+            return CandleBuffer()
+
+        # `last_timestamp` has already truncated any torn last line
+        return CandleBuffer.from_frame(
+            pl.read_csv(self._filepath, schema_overrides=CANDLE_SCHEMA)
+        )
+
+    def scan(self) -> pl.LazyFrame:
+        return pl.scan_csv(self._filepath, schema_overrides=CANDLE_SCHEMA)
+
+    def _format_row(self, candle: Candle) -> str:
+        return (
+            f"{candle[0]},{candle[1]},{candle[2]},{candle[3]},{candle[4]},{candle[5]}\n"
+        )
+
+    def _recover_torn_line(self, chunk_size: int = 4096) -> None:
+        # An interrupted append can leave the file ending in a partially
+        # written row. Truncate back to the last complete line, so the
+        # torn candle is simply re-fetched on resume instead of being
+        # parsed as (or appended onto as) a corrupt row.
+        with open(self._filepath, "rb+") as file:
+            size = file.seek(0, os.SEEK_END)
+            end = size
+
+            while end > 0:
+                start = max(0, end - chunk_size)
+                file.seek(start)
+                chunk = file.read(end - start)
+                newline_index = chunk.rfind(b"\n")
+                if newline_index != -1:
+                    end = start + newline_index + 1
+                    break
+                end = start
+
+            if end != size:
+                logger.warning(
+                    f"Truncating torn last line of {self._filepath} "
+                    f"({size - end} bytes)"
+                )
+                file.truncate(end)
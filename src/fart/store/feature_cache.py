@@ -0,0 +1,306 @@
+import hashlib
+import json
+import os
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+import polars as pl
+import pyarrow.parquet as pq
+
+from fart.constants import TIMESTAMP
+from fart.store.scan_candle_data import scan_candle_data
+
+INDEX_FILENAME = "index.json"
+
+# Partition files are hashed in chunks of this many bytes
+_CHUNK_SIZE = 1 << 20
+
+
+class FeatureCache:
+    """
+    On-disk cache of feature frames computed from a candle store, so a
+    training run or notebook session doesn't recompute them from the raw
+    candles when neither the candles, the pipeline config nor the code
+    changed.
+
+    Entries are content-addressed: the key hashes the source's partition
+    files (the CSV file, or each Parquet part), the config and the source
+    of the `fart` package, and the frame is stored as an Arrow IPC file,
+    read back memory-mapped. A partition's content hash is remembered
+    against its size and modification time, so a repeat lookup only
+    `stat`s the source. Entries are evicted least recently used first once
+    the cache outgrows `max_bytes`.
+
+    When the source has only grown since a cached entry for the same
+    config was computed -- rows appended to the CSV or the last Parquet
+    part, or new Parquet parts written -- and the pipeline declares its
+    `lookback`, only the new rows (plus `lookback` rows of context) are
+    recomputed and appended to the cached frame.
+
+    Parameters
+    ----------
+    - cache_dir (Path): Directory of the cache (e.g. `artifacts/features`).
+    - max_bytes (int): Size cap of the cached frames.
+
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int = 1 << 30) -> None:
+        self._cache_dir = cache_dir
+        self._max_bytes = max_bytes
+
+    def get(
+        self,
+        source: Path,
+        compute: Callable[[pl.LazyFrame], pl.LazyFrame],
+        config: Mapping[str, Any],
+        lookback: Optional[int] = None,
+    ) -> pl.DataFrame:
+        """
+        Get the features of `source`, from the cache or by computing (and
+        caching) them.
+
+        Parameters
+        ----------
+        - source (Path): Candle CSV file or Parquet store directory (see
+          `scan_candle_data`).
+        - compute (Callable[[pl.LazyFrame], pl.LazyFrame]): Pipeline from
+          the scanned candles to the features. Its output must keep the
+          `Timestamp` column.
+        - config (Mapping[str, Any]): JSON-serializable description of
+          everything `compute` depends on besides the candles and the code
+          (e.g. the target column and indicator periods).
+        - lookback (Optional[int]): Number of preceding candles a feature
+          row depends on (e.g. 1 for `Magnitude`), so appended candles can
+          be computed on their own. `None` always recomputes everything.
+
+        Returns
+        -------
+        - pl.DataFrame: The features.
+
+        """
+        index = self._read_index()
+        partitions = self._fingerprint(source, index)
+        config_key = _hash(json.dumps(config, sort_keys=True), _code_version())
+        key = _hash(config_key, json.dumps(partitions, sort_keys=True))
+
+        entries: Dict[str, Dict[str, Any]] = index.setdefault("entries", {})
+        if key in entries and (self._cache_dir / f"{key}.arrow").exists():
+            entries[key]["last_access"] = time.time()
+            self._write_index(index)
+            return pl.read_ipc(self._cache_dir / f"{key}.arrow", memory_map=True)
+
+        extended = (
+            self._extend(source, compute, lookback, config_key, partitions, index)
+            if lookback is not None
+            else None
+        )
+        if extended is not None:
+            # The source has moved on, so the entry extended is stale
+            df, stale_key = extended
+            entries.pop(stale_key)
+            (self._cache_dir / f"{stale_key}.arrow").unlink(missing_ok=True)
+        else:
+            df = compute(scan_candle_data(source)).collect()
+
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        filepath = self._cache_dir / f"{key}.arrow"
+        temp_filepath = filepath.with_suffix(f".{os.getpid()}.tmp")
+        df.write_ipc(temp_filepath)
+        os.replace(temp_filepath, filepath)
+
+        entries[key] = {
+            "config_key": config_key,
+            "source": str(source.resolve()),
+            "partitions": partitions,
+            "last_timestamp": _last_timestamp(scan_candle_data(source)),
+            "size": filepath.stat().st_size,
+            "last_access": time.time(),
+        }
+        self._evict(index, keep=key)
+        self._write_index(index)
+        return df
+
+    def _extend(
+        self,
+        source: Path,
+        compute: Callable[[pl.LazyFrame], pl.LazyFrame],
+        lookback: int,
+        config_key: str,
+        partitions: List[Dict[str, Any]],
+        index: Dict[str, Any],
+    ) -> Optional[Tuple[pl.DataFrame, str]]:
+        # Recompute only the candles appended since an entry for the same
+        # config and source was cached, if there is one
+        for key, entry in index.get("entries", {}).items():
+            filepath = self._cache_dir / f"{key}.arrow"
+            if (
+                entry["config_key"] != config_key
+                or entry["source"] != str(source.resolve())
+                or entry["last_timestamp"] is None
+                or not filepath.exists()
+                or not _is_appended(source, entry["partitions"], partitions)
+            ):
+                continue
+
+            candles = scan_candle_data(source)
+            last_timestamp = entry["last_timestamp"]
+            context = (
+                candles.select(TIMESTAMP)
+                .filter(pl.col(TIMESTAMP) <= last_timestamp)
+                .sort(TIMESTAMP)
+                .tail(lookback)
+                .collect()
+            )
+            start = context[TIMESTAMP][0] if len(context) else last_timestamp
+            appended = (
+                compute(candles.filter(pl.col(TIMESTAMP) >= start))
+                .filter(pl.col(TIMESTAMP) > last_timestamp)
+                .collect()
+            )
+            return pl.concat([pl.read_ipc(filepath), appended]), key
+
+        return None
+
+    def _fingerprint(self, source: Path, index: Dict[str, Any]) -> List[Dict[str, Any]]:
+        # Name, size and content hash of each partition file of `source`,
+        # rehashing only files whose size or modification time changed. A
+        # Parquet store's last part also records its rows' hash: appends
+        # rewrite it, so whether it only grew is told from its rows rather
+        # than its bytes.
+        filepaths = sorted(source.glob("*/*.parquet")) if source.is_dir() else [source]
+        hashes: Dict[str, Dict[str, Any]] = index.setdefault("hashes", {})
+
+        partitions: List[Dict[str, Any]] = []
+        for i, filepath in enumerate(filepaths):
+            stat = filepath.stat()
+            known: Optional[Dict[str, Any]] = hashes.get(str(filepath.resolve()))
+            if (
+                known is None
+                or known["size"] != stat.st_size
+                or known["mtime_ns"] != stat.st_mtime_ns
+            ):
+                known = {
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "sha256": _hash_file(filepath, stat.st_size),
+                }
+                hashes[str(filepath.resolve())] = known
+            partition: Dict[str, Any] = {
+                "name": filepath.relative_to(source).as_posix()
+                if source.is_dir()
+                else filepath.name,
+                "size": known["size"],
+                "sha256": known["sha256"],
+            }
+            if source.is_dir() and i == len(filepaths) - 1:
+                if "rows_sha256" not in known:
+                    known["rows"] = pq.read_metadata(filepath).num_rows
+                    known["rows_sha256"] = _hash_rows(filepath, known["rows"])
+                partition["rows"] = known["rows"]
+                partition["rows_sha256"] = known["rows_sha256"]
+            partitions.append(partition)
+        return partitions
+
+    def _evict(self, index: Dict[str, Any], keep: str) -> None:
+        entries: Dict[str, Dict[str, Any]] = index["entries"]
+        total = sum(entry["size"] for entry in entries.values())
+        for key in sorted(entries, key=lambda k: entries[k]["last_access"]):
+            if total <= self._max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= entries.pop(key)["size"]
+            (self._cache_dir / f"{key}.arrow").unlink(missing_ok=True)
+
+    def _read_index(self) -> Dict[str, Any]:
+        try:
+            return json.loads((self._cache_dir / INDEX_FILENAME).read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _write_index(self, index: Dict[str, Any]) -> None:
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        filepath = self._cache_dir / INDEX_FILENAME
+        temp_filepath = filepath.with_suffix(f".{os.getpid()}.tmp")
+        temp_filepath.write_text(json.dumps(index))
+        os.replace(temp_filepath, filepath)
+
+
+def _is_appended(
+    source: Path, old: List[Dict[str, Any]], new: List[Dict[str, Any]]
+) -> bool:
+    # Whether `new` only adds to `old`: the same partitions, except that
+    # the last one may have grown by appended bytes (or, for a Parquet
+    # part, rows), followed by new ones
+    if not old or len(new) < len(old):
+        return False
+
+    for i, (old_partition, new_partition) in enumerate(zip(old, new)):
+        if old_partition["name"] != new_partition["name"]:
+            return False
+        if old_partition["sha256"] == new_partition["sha256"]:
+            continue
+        if i < len(old) - 1:
+            return False
+        if source.is_dir():
+            if (
+                "rows" not in old_partition
+                or _hash_rows(source / new_partition["name"], old_partition["rows"])
+                != old_partition["rows_sha256"]
+            ):
+                return False
+        elif (
+            new_partition["size"] <= old_partition["size"]
+            or _hash_file(source, old_partition["size"]) != old_partition["sha256"]
+        ):
+            return False
+    return True
+
+
+def _last_timestamp(candles: pl.LazyFrame) -> Optional[int]:
+    last_timestamp = candles.select(pl.col(TIMESTAMP).max()).collect().item()
+    return int(last_timestamp) if last_timestamp is not None else None
+
+
+def _hash(*parts: str) -> str:
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()[:32]
+
+
+def _hash_file(filepath: Path, size: int) -> str:
+    # Hash of the first `size` bytes of `filepath`
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as file:
+        remaining = size
+        while remaining > 0:
+            chunk = file.read(min(_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest.hexdigest()
+
+
+def _hash_rows(filepath: Path, num_rows: int) -> Optional[str]:
+    # Hash of the values of the first `num_rows` rows of a Parquet file, or
+    # `None` if it has fewer
+    df = pl.read_parquet(filepath, n_rows=num_rows)
+    if len(df) < num_rows:
+        return None
+    digest = hashlib.sha256()
+    for column in df.get_columns():
+        digest.update(column.name.encode())
+        digest.update(column.to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=1)
+def _code_version() -> str:
+    # Hash of the package's source, so any code change invalidates entries
+    package_dir = Path(__file__).resolve().parent.parent
+    digest = hashlib.sha256()
+    for filepath in sorted(package_dir.rglob("*.py")):
+        digest.update(filepath.relative_to(package_dir).as_posix().encode())
+        digest.update(filepath.read_bytes())
+    return digest.hexdigest()
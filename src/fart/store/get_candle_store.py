@@ -0,0 +1,38 @@
+from pathlib import Path
+
+from fart.store.candle_store import CandleStore
+from fart.store.csv_candle_store import CSVCandleStore
+from fart.store.parquet_candle_store import ParquetCandleStore
+from fart.utils import get_data_dirpath, get_data_filepath
+
+STORE_FORMATS = ("csv", "parquet")
+
+
+def get_candle_store(
+    data_dir: Path, market: str, interval: str, store_format: str = "csv"
+) -> CandleStore:
+    """
+    Get the candle store for a market and interval in the given on-disk
+    format.
+
+    Parameters
+    ----------
+    - data_dir (Path): Path to the directory containing data files.
+    - market (str): Market name (e.g., 'BTC-USD').
+    - interval (str): Interval for the candle data (e.g., '1m', '5m', '1h').
+    - store_format (str): Either 'csv' (one file per market/interval) or
+      'parquet' (a directory of year-partitioned Parquet files).
+
+    Returns
+    -------
+    - CandleStore: The store for the market and interval.
+
+    """
+    if store_format == "csv":
+        return CSVCandleStore(get_data_filepath(data_dir, market, interval))
+    elif store_format == "parquet":
+        return ParquetCandleStore(get_data_dirpath(data_dir, market, interval))
+    else:
+        raise ValueError(
+            f"Invalid store format: {store_format} (expected one of {STORE_FORMATS})"
+        )
@@ -0,0 +1,175 @@
+import os
+from bisect import bisect_right
+from pathlib import Path
+from typing import List, Tuple
+
+import polars as pl
+import pyarrow.parquet as pq
+
+from fart.constants import TIMESTAMP
+from fart.store.candle_buffer import CandleBuffer
+from fart.store.candle_store import CANDLE_SCHEMA
+
+YEAR = "year"
+PART = "part"
+
+# Appends are merged into the year's last part as long as it stays within
+# this many candles (a week of 1m candles), so tailing the live stream one
+# candle at a time doesn't leave a file per candle behind
+MAX_PART_ROWS = 10_080
+
+
+class ParquetCandleStore:
+    """
+    Candle cache backed by a directory of typed, zstd-compressed Parquet
+    files, partitioned by year:
+
+        {market}-{interval}/year={year}/{first_timestamp}.parquet
+
+    An `append` merges into the year's last part while that stays within
+    `MAX_PART_ROWS` candles and writes a new part file otherwise, leaving
+    every earlier part untouched (and `insert` rewrites only the parts its
+    candles fall into), and Polars reads the columns back as
+    `Int64`/`Float64` without any text parsing. Part files are named
+    after their first candle's timestamp, so a sorted directory listing
+    is also chronological.
+
+    Attributes
+    ----------
+    - dirpath (Path): Path to the market/interval directory (see
+      `get_data_dirpath`).
+
+    """
+
+    def __init__(self, dirpath: Path) -> None:
+        self._dirpath = dirpath
+
+    @property
+    def path(self) -> Path:
+        return self._dirpath
+
+    def append(self, candles: CandleBuffer) -> None:
+        if not candles:
+            return
+
+        for year, partition in self._partition_by_year(candles):
+            year_dirpath = self._dirpath / f"{YEAR}={year}"
+            part_filepaths = sorted(year_dirpath.glob("*.parquet"))
+            if (
+                part_filepaths
+                and pq.read_metadata(part_filepaths[-1]).num_rows + len(partition)
+                <= MAX_PART_ROWS
+            ):
+                self._write_part(
+                    pl.concat([pl.read_parquet(part_filepaths[-1]), partition]),
+                    part_filepaths[-1],
+                )
+                continue
+
+            first_timestamp = partition[TIMESTAMP][0]
+            self._write_part(partition, year_dirpath / f"{first_timestamp}.parquet")
+
+    def insert(self, candles: CandleBuffer) -> None:
+        if not candles:
+            return
+
+        for year, partition in self._partition_by_year(candles):
+            year_dirpath = self._dirpath / f"{YEAR}={year}"
+            part_first_timestamps = sorted(
+                int(filepath.stem) for filepath in year_dirpath.glob("*.parquet")
+            )
+
+            # Route each candle to the part whose range it falls into: the
+            # last part starting at or before it. Only those parts are
+            # rewritten; candles preceding every part of the year become a
+            # new part of their own. Either way the parts stay
+            # non-overlapping, so their sorted names remain chronological.
+            part_indices = [
+                bisect_right(part_first_timestamps, timestamp) - 1
+                for timestamp in partition[TIMESTAMP].to_list()
+            ]
+            for group in partition.with_columns(
+                pl.Series(PART, part_indices)
+            ).partition_by(PART, maintain_order=True):
+                part_index = group[PART][0]
+                group = group.drop(PART)
+                if part_index < 0:
+                    self._write_part(
+                        group.sort(TIMESTAMP),
+                        year_dirpath / f"{group[TIMESTAMP].min()}.parquet",
+                    )
+                    continue
+
+                filepath = year_dirpath / f"{part_first_timestamps[part_index]}.parquet"
+                self._write_part(
+                    pl.concat([pl.read_parquet(filepath), group])
+                    .unique(TIMESTAMP, keep="first", maintain_order=True)
+                    .sort(TIMESTAMP),
+                    filepath,
+                )
+
+    def last_timestamp(self) -> int | None:
+        part_files = self._part_files()
+        if not part_files:
+            return None
+
+        # Part files are named after their first timestamp, so the last one
+        # in sorted order holds the latest candle -- and its footer
+        # statistics already record that candle's timestamp, without
+        # reading any column data.
+        metadata = pq.read_metadata(part_files[-1])
+        column_index = metadata.schema.names.index(TIMESTAMP)
+        timestamps: List[int] = []
+        for i in range(metadata.num_row_groups):
+            statistics = metadata.row_group(i).column(column_index).statistics
+            if statistics is not None and statistics.has_min_max:
+                timestamps.append(int(statistics.max))
+
+        if len(timestamps) != metadata.num_row_groups:
+            # Part written without statistics; fall back to reading just the
+            # Timestamp column of this one file
+            last_timestamp = pl.read_parquet(part_files[-1], columns=[TIMESTAMP])[
+                TIMESTAMP
+            ].max()
+            return int(last_timestamp) if isinstance(last_timestamp, int) else None
+
+        return max(timestamps) if timestamps else None
+
+    def load(self) -> CandleBuffer:
+        if not self._part_files():
+            return CandleBuffer()
+
+        return CandleBuffer.from_frame(self.scan().collect())
+
+    def scan(self) -> pl.LazyFrame:
+        return pl.scan_parquet(
+            self._part_files(), schema=CANDLE_SCHEMA, hive_partitioning=False
+        )
+
+    def _partition_by_year(
+        self, candles: CandleBuffer
+    ) -> List[Tuple[int, pl.DataFrame]]:
+        df = candles.to_frame()
+        years = pl.from_epoch(df[TIMESTAMP], time_unit="ms").dt.year()
+
+        return [
+            (partition[YEAR][0], partition.drop(YEAR))
+            for partition in df.with_columns(years.alias(YEAR)).partition_by(
+                YEAR, maintain_order=True
+            )
+        ]
+
+    def _part_files(self) -> List[Path]:
+        return sorted(self._dirpath.glob(f"{YEAR}=*/*.parquet"))
+
+    def _write_part(self, df: pl.DataFrame, filepath: Path) -> None:
+        # Write to a temporary file and atomically rename it into place, so
+        # an interrupted append never leaves a truncated Parquet file (which
+        # would have no readable footer) behind in the store.
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        tmp_filepath = filepath.with_suffix(".parquet.tmp")
+        df.write_parquet(tmp_filepath, compression="zstd", statistics=True)
+
+        with open(tmp_filepath, "rb") as file:
+            os.fsync(file.fileno())
+        os.replace(tmp_filepath, filepath)
@@ -0,0 +1,22 @@
+from pathlib import Path
+
+import polars as pl
+
+from fart.store.scan_candle_data import scan_candle_data
+
+
+def read_candle_data(path: Path) -> pl.DataFrame:
+    """
+    Read cached candle data from either store format (see
+    `scan_candle_data`).
+
+    Parameters
+    ----------
+    - path (Path): Path to a candle CSV file or a Parquet store directory.
+
+    Returns
+    -------
+    - pl.DataFrame: The cached candles.
+
+    """
+    return scan_candle_data(path).collect()
@@ -0,0 +1,53 @@
+import polars as pl
+
+from fart.constants import TIMESTAMP
+from fart.features.resample_candles import resample_candles
+from fart.store.candle_buffer import CandleBuffer
+from fart.store.candle_store import CandleStore
+from fart.utils import interval_to_duration
+
+
+def resample_candle_store(
+    source: CandleStore,
+    target: CandleStore,
+    source_interval: str,
+    interval: str,
+) -> int:
+    """
+    Incrementally derive a coarser-interval candle store from a finer one
+    (see `resample_candles`). Only fine candles from the window after
+    `target`'s last candle onward are scanned and aggregated, and only
+    fully closed coarse candles are appended -- so running this after every
+    download keeps `target` current without re-reading or rewriting what it
+    already holds.
+
+    Parameters
+    ----------
+    - source (CandleStore): Store holding `source_interval` candles.
+    - target (CandleStore): Store to append `interval` candles to.
+    - source_interval (str): Interval of the candles in `source`.
+    - interval (str): Coarser interval of the candles in `target`.
+
+    Returns
+    -------
+    - int: Number of coarse candles appended to `target`.
+
+    """
+    if source.last_timestamp() is None:
+        return 0
+
+    lf = source.scan()
+    last_timestamp = target.last_timestamp()
+    if last_timestamp is not None:
+        next_window_start: int = pl.select(
+            pl.from_epoch(pl.lit(last_timestamp), time_unit="ms")
+            .dt.replace_time_zone("UTC")
+            .dt.offset_by(interval_to_duration(interval))
+            .dt.epoch(time_unit="ms")
+        ).item()
+        lf = lf.filter(pl.col(TIMESTAMP) >= next_window_start)
+
+    resampled = resample_candles(lf.collect(), source_interval, interval)
+    target.append(CandleBuffer.from_frame(resampled))
+
+    return len(resampled)
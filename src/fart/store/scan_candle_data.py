@@ -0,0 +1,31 @@
+from pathlib import Path
+
+import polars as pl
+
+from fart.store.csv_candle_store import CSVCandleStore
+from fart.store.parquet_candle_store import ParquetCandleStore
+
+
+def scan_candle_data(path: Path) -> pl.LazyFrame:
+    """
+    Lazily scan cached candle data from either store format: a directory
+    is scanned as a `ParquetCandleStore`, anything else as a
+    `CSVCandleStore` file. Nothing is read until the query is collected,
+    and then only the columns and rows it needs.
+
+    Parameters
+    ----------
+    - path (Path): Path to a candle CSV file or a Parquet store directory.
+
+    Returns
+    -------
+    - pl.LazyFrame: The cached candles.
+
+    """
+    if path.is_dir():
+        return ParquetCandleStore(path).scan()
+
+    if not path.exists():
+        raise FileNotFoundError(f"No candle data found at {path}")
+
+    return CSVCandleStore(path).scan()
@@ -0,0 +1,84 @@
+from threading import Lock
+from time import monotonic, sleep
+from typing import Callable
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket for spending a weight-based rate limit as fast
+    as it allows, without exceeding it.
+
+    Bitvavo limits each IP or API key to 1000 weight points per minute;
+    exceeding it gets the IP or API key temporarily banned. The bucket
+    starts full, refills continuously at `capacity / refill_period` tokens
+    per second, and `acquire` blocks the calling thread until enough tokens
+    are available for the request about to be made -- so a pool of workers
+    sharing one bucket bursts through the budget and then settles at the
+    refill rate.
+
+    Parameters
+    ----------
+    - capacity (float): Maximum number of tokens (weight points) the bucket
+      holds. Defaults to Bitvavo's 1000-point limit.
+    - refill_period (float): Seconds it takes to refill an empty bucket.
+      Defaults to Bitvavo's one-minute window.
+    - clock (Callable[[], float]): Monotonic clock, in seconds. Injectable
+      for testing.
+    - sleep (Callable[[float], None]): Sleep function, in seconds.
+      Injectable for testing.
+
+    """
+
+    def __init__(
+        self,
+        capacity: float = 1000,
+        refill_period: float = 60.0,
+        clock: Callable[[], float] = monotonic,
+        sleep: Callable[[float], None] = sleep,
+    ) -> None:
+        self._capacity = capacity
+        self._refill_rate = capacity / refill_period
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = capacity
+        self._updated_at = clock()
+        self._lock = Lock()
+
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def acquire(self, weight: float = 1) -> None:
+        """
+        Take `weight` tokens from the bucket, blocking until they're
+        available.
+
+        Parameters
+        ----------
+        - weight (float): Rate limit weight of the request about to be made.
+
+        """
+        if weight > self._capacity:
+            raise ValueError(
+                f"Weight {weight} exceeds the bucket capacity of {self._capacity}"
+            )
+
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= weight:
+                    self._tokens -= weight
+                    return
+                wait = (weight - self._tokens) / self._refill_rate
+
+            # Sleep outside the lock, so other threads aren't blocked from
+            # checking the bucket in the meantime
+            self._sleep(wait)
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = now - self._updated_at
+        self._tokens = min(self._capacity, self._tokens + elapsed * self._refill_rate)
+        self._updated_at = now
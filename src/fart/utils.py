@@ -44,6 +44,76 @@ def get_data_filepath(data_dir: Path, market: str, interval: str) -> Path:
     return data_dir / f"{market}-{interval}.csv"
 
 
+def get_data_dirpath(data_dir: Path, market: str, interval: str) -> Path:
+    """
+    Get the directory path for a partitioned (Parquet) candle data store.
+
+    Parameters
+    ----------
+    - data_dir (Path): Path to the directory containing data files.
+    - market (str): Market name (e.g., 'BTC-USD').
+    - interval (str): Interval for the candle data (e.g., '1m', '5m', '1h').
+
+    Returns
+    -------
+    - Path: Path to the candle data store directory.
+
+    """
+    return data_dir / f"{market}-{interval}"
+
+
+def interval_to_milliseconds(interval: str) -> int:
+    """
+    Get the length of a Bitvavo candle interval in milliseconds. Months
+    ('M') are approximated as 30 days.
+
+    Parameters
+    ----------
+    - interval (str): Interval for the candle data (e.g., '1m', '5m', '1h').
+
+    Returns
+    -------
+    - int: Length of the interval in milliseconds.
+
+    """
+    if interval.endswith("m"):
+        return int(interval[:-1]) * 60_000
+    elif interval.endswith("h"):
+        return int(interval[:-1]) * 3_600_000
+    elif interval.endswith("d"):
+        return int(interval[:-1]) * 86_400_000
+    elif interval.endswith("W"):
+        return int(interval[:-1]) * 604_800_000
+    elif interval.endswith("M"):
+        return int(interval[:-1]) * 30 * 86_400_000
+    else:
+        raise ValueError(f"Invalid interval: {interval}")
+
+
+def interval_to_duration(interval: str) -> str:
+    """
+    Get the Polars duration string (as used by e.g. `group_by_dynamic`) for
+    a Bitvavo candle interval. Unlike `interval_to_milliseconds`, weeks and
+    months are calendar-aware: weeks start on Monday and months follow the
+    calendar.
+
+    Parameters
+    ----------
+    - interval (str): Interval for the candle data (e.g., '1m', '5m', '1h').
+
+    Returns
+    -------
+    - str: Polars duration string (e.g., '1m', '1h', '1w', '1mo').
+
+    """
+    units = {"m": "m", "h": "h", "d": "d", "W": "w", "M": "mo"}
+    unit = interval[-1:]
+    if unit not in units or not interval[:-1].isdigit():
+        raise ValueError(f"Invalid interval: {interval}")
+
+    return f"{interval[:-1]}{units[unit]}"
+
+
 def get_model_filepath(
     artifacts_dir: Path, market: str, interval: str, timestamp: datetime
 ) -> Path:
@@ -0,0 +1,116 @@
+from typing import List
+
+import pytest
+
+from fart.core.broker import (
+    BUY,
+    EXCHANGE_ERROR,
+    FILLED,
+    HALTED,
+    LISTENING,
+    PARTIAL_FILL,
+    PAUSING,
+    SELL,
+    Broker,
+    Fill,
+)
+from fart.store.candle_buffer import Candle
+
+
+class ScriptedGateway:
+    """Fills every order at `price`, or with the next scripted status."""
+
+    def __init__(self, statuses: List[str] | None = None) -> None:
+        self.price = 100.0
+        self.orders: List[tuple[str, float]] = []
+        self._statuses = list(statuses or [])
+
+    def place_market_order(self, market: str, side: str, amount: float) -> Fill:
+        self.orders.append((side, amount))
+        status = self._statuses.pop(0) if self._statuses else FILLED
+        if status == EXCHANGE_ERROR:
+            return Fill(EXCHANGE_ERROR, 0.0, 0.0)
+        share = 0.5 if status == PARTIAL_FILL else 1.0
+        if side == BUY:
+            return Fill(status, amount * share / self.price, amount * share)
+        return Fill(status, amount * share, amount * share * self.price)
+
+
+def _candle(timestamp: int, close: float) -> Candle:
+    return (timestamp, close, close, close, close, 1.0)
+
+
+def _broker(gateway: ScriptedGateway, signals: List[float], **kwargs: float) -> Broker:
+    next_signal = iter(signals).__next__
+    return Broker(
+        gateway=gateway,
+        predict=lambda candle: next_signal(),
+        initial_capital=1000,
+        threshold=0.01,
+        **kwargs,  # pyright: ignore[reportArgumentType]
+    )
+
+
+def test_broker_opens_and_closes_a_position_on_the_signal() -> None:
+    gateway = ScriptedGateway()
+    broker = _broker(gateway, [0.02, 0.0, -0.02])
+
+    for timestamp, close in enumerate([100.0, 110.0, 120.0]):
+        gateway.price = close
+        broker.on_candle(_candle(timestamp, close))
+
+    assert gateway.orders == [(BUY, 1000), (SELL, 10)]
+    assert broker.state == LISTENING
+    assert broker.cash == 1200
+    assert broker.trades[0].net_return == pytest.approx(0.2)
+    assert [equity for _, equity in broker.equity] == [1000, 1100, 1200]
+
+
+def test_broker_retries_after_a_failed_order_and_reconciles_partial_fills() -> None:
+    gateway = ScriptedGateway([EXCHANGE_ERROR, PARTIAL_FILL, PARTIAL_FILL])
+    broker = _broker(gateway, [0.02, 0.02, -0.02, -0.02])
+
+    for timestamp in range(4):
+        broker.on_candle(_candle(timestamp, 100.0))
+
+    # The failed buy is retried on the next candle and half filled; the
+    # half-filled sell leaves the rest of the position open until the next
+    assert gateway.orders == [(BUY, 1000), (BUY, 1000), (SELL, 5), (SELL, 2.5)]
+    assert broker.position == 0
+    assert broker.cash == 1000
+    assert len(broker.trades) == 1
+
+
+def test_broker_kill_switch_flattens_and_halts_until_operator_resume() -> None:
+    gateway = ScriptedGateway()
+    broker = _broker(gateway, [0.02, 0.0, 0.0, 0.02], max_drawdown_pct=0.1)
+
+    for timestamp, close in enumerate([100.0, 95.0, 80.0]):
+        gateway.price = close
+        broker.on_candle(_candle(timestamp, close))
+
+    assert broker.state == HALTED
+    assert broker.position == 0
+    assert broker.cash == 800
+
+    broker.on_candle(_candle(3, 80.0))
+    assert len(gateway.orders) == 2
+
+    broker.operator_resume()
+    assert broker.state == LISTENING
+    broker.on_candle(_candle(4, 80.0))
+    assert gateway.orders[-1] == (BUY, 800)
+
+
+def test_broker_ignores_candles_while_paused() -> None:
+    gateway = ScriptedGateway()
+    broker = _broker(gateway, [0.02])
+
+    broker.pause()
+    broker.on_candle(_candle(0, 100.0))
+    assert broker.state == PAUSING
+    assert gateway.orders == []
+
+    broker.resume()
+    broker.on_candle(_candle(1, 100.0))
+    assert gateway.orders == [(BUY, 1000)]
@@ -0,0 +1,135 @@
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from fart.core.fake_bitvavo import FakeBitvavo
+from fart.downloader import Downloader
+from fart.features.find_candle_gaps import find_candle_gaps
+from fart.token_bucket import TokenBucket
+
+MINUTE = 60_000
+NOW = 1_700_000_000_000
+
+
+def test_fake_bitvavo_candles_are_deterministic_across_requests() -> None:
+    client = FakeBitvavo(now=lambda: NOW)
+    other = FakeBitvavo(now=lambda: NOW)
+
+    wide = client.candles("BTC-EUR", "1m", start=NOW - 100 * MINUTE, end=NOW)
+    narrow = other.candles(
+        "BTC-EUR", "1m", start=NOW - 50 * MINUTE, end=NOW - 40 * MINUTE
+    )
+
+    assert isinstance(wide, list) and isinstance(narrow, list)
+    assert [candle for candle in wide if candle in narrow] == narrow
+
+
+def test_fake_bitvavo_candles_are_newest_first_within_inclusive_bounds() -> None:
+    client = FakeBitvavo(now=lambda: NOW)
+    start = NOW // MINUTE * MINUTE - 10 * MINUTE
+
+    candles = client.candles("BTC-EUR", "1m", start=start, end=start + 5 * MINUTE)
+
+    assert isinstance(candles, list)
+    assert [candle[0] for candle in candles] == [
+        start + i * MINUTE for i in range(5, -1, -1)
+    ]
+    for _, open_, high, low, close, _ in candles:
+        assert float(low) <= min(float(open_), float(close))
+        assert float(high) >= max(float(open_), float(close))
+
+
+def test_fake_bitvavo_candles_are_capped_at_the_request_limit() -> None:
+    client = FakeBitvavo(now=lambda: NOW)
+
+    candles = client.candles("BTC-EUR", "1m", start=datetime(2019, 3, 9))
+
+    assert isinstance(candles, list)
+    assert len(candles) == 1440
+    assert candles[0][0] == NOW // MINUTE * MINUTE
+
+
+def test_fake_bitvavo_rate_limit_errors_and_resets() -> None:
+    now = [0.0]
+    client = FakeBitvavo(rate_limit=6, clock=lambda: now[0])
+
+    assert isinstance(client.balance(), list)
+    assert client.getRemainingLimit() == 1
+    assert client.balance() == {
+        "errorCode": 105,
+        "error": "Your account has been temporarily banned.",
+    }
+    assert isinstance(client.markets(), list)
+
+    now[0] = 60.0
+    assert client.getRemainingLimit() == 6
+
+
+def test_fake_bitvavo_ticker_price_matches_latest_candle() -> None:
+    client = FakeBitvavo(now=lambda: NOW)
+
+    price = client.tickerPrice({"market": "BTC-EUR"})
+    candles = client.candles("BTC-EUR", "1m", limit=1)
+
+    assert isinstance(price, dict) and isinstance(candles, list)
+    assert price == {"market": "BTC-EUR", "price": candles[0][4]}
+
+
+def test_fake_bitvavo_serves_a_gap_free_download(tmp_path: Path) -> None:
+    client = FakeBitvavo(latency=0.001)
+    downloader = Downloader(
+        assets_dir=tmp_path,
+        market="BTC-EUR",
+        interval="1d",
+        api_key=None,
+        api_secret=None,
+        max_workers=2,
+        token_bucket=TokenBucket(),
+        client=client,  # pyright: ignore[reportArgumentType] -- Duck-typed stand-in
+    )
+
+    num_candles = downloader.download()
+
+    df = downloader._store.scan().collect()
+    assert num_candles == len(df) > 1440
+    assert find_candle_gaps(df, "1d") == []
+    assert client.calls["candles"] == 2
+
+
+def test_fake_bitvavo_websocket_feeds_tail(tmp_path: Path) -> None:
+    client = FakeBitvavo(now=lambda: NOW)
+    downloader = Downloader(
+        assets_dir=tmp_path,
+        market="BTC-EUR",
+        interval="1m",
+        api_key=None,
+        api_secret=None,
+        client=client,  # pyright: ignore[reportArgumentType] -- Duck-typed stand-in
+    )
+    start = NOW // MINUTE * MINUTE - 10 * MINUTE
+    downloader._store.append(
+        # Seed the store so tailing starts right before the stream
+        downloader._process_candles(
+            client.candles("BTC-EUR", "1m", start=start, end=start)  # pyright: ignore[reportArgumentType] -- Known to be a list
+        )
+    )
+    stop = threading.Event()
+    socket = client.newWebsocket()
+    client.newWebsocket = lambda: socket
+
+    def publish() -> None:
+        socket.subscribed.wait()
+        socket.publish(
+            "BTC-EUR",
+            "1m",
+            client.candle_updates(
+                "BTC-EUR", "1m", start + MINUTE, 5, updates_per_candle=3
+            ),
+        )
+        stop.set()
+
+    threading.Thread(target=publish).start()
+
+    assert downloader.tail(stop) == 4
+    assert socket.closed
+    assert client.calls["candles"] == 1
@@ -0,0 +1,69 @@
+from typing import Any, Callable, Dict
+
+import numpy as np
+import pytest
+
+from fart.constants import BALANCE
+from fart.core import replay as replay_module
+from fart.core.broker import Broker
+from fart.core.replay import replay
+from fart.features.calculate_trade_returns import calculate_trade_returns
+from fart.store.candle_buffer import Candle, CandleBuffer
+
+
+def test_replay_trades_like_calculate_trade_returns() -> None:
+    rng = np.random.default_rng(0)
+    closes = 100 * np.cumprod(1 + rng.normal(0, 0.01, 2000))
+    magnitudes = np.concatenate([[np.nan], closes[1:] / closes[:-1] - 1])
+    predictions = np.concatenate([magnitudes[1:], [np.nan]]) + rng.normal(
+        0, 0.01, len(closes)
+    )
+    candles = CandleBuffer.from_candles(
+        [i * 60_000, close, close, close, close, 1.0] for i, close in enumerate(closes)
+    )
+    rules = {"threshold": 0.01, "max_holding_period": 10, "stop_loss_pct": 0.02}
+
+    equity, trades = replay(candles, predictions, initial_capital=500, **rules)
+
+    returns, profits = calculate_trade_returns(magnitudes, predictions, **rules)
+    assert [trade.net_return for trade in trades] == pytest.approx(returns)
+    assert len(equity) == len(candles)
+    assert equity[BALANCE][-1] == pytest.approx(500 + sum(profits))
+
+
+def test_replay_rejects_mismatched_predictions() -> None:
+    with pytest.raises(ValueError, match="same length"):
+        replay(CandleBuffer(), [0.1])
+
+
+def test_replay_predicts_each_candle_from_its_own_signal(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    predicted: Dict[int, float] = {}
+
+    class PausingBroker(Broker):
+        # Records every signal predicted, and isn't listening for the
+        # candles at positions 3 to 5
+        def __init__(self, predict: Callable[[Candle], float], **kwargs: Any) -> None:
+            def record(candle: Candle) -> float:
+                predicted[candle[0]] = predict(candle)
+                return predicted[candle[0]]
+
+            super().__init__(predict=record, **kwargs)
+
+        def on_candle(self, candle: Candle) -> None:
+            if candle[0] == 3:
+                self.pause()
+            elif candle[0] == 6:
+                self.resume()
+            super().on_candle(candle)
+
+    monkeypatch.setattr(replay_module, "Broker", PausingBroker)
+    candles = CandleBuffer.from_candles(
+        [i, 100.0, 100.0, 100.0, 100.0, 1.0] for i in range(10)
+    )
+    predictions = np.arange(10) / 100
+
+    replay(candles, predictions, threshold=1.0)
+
+    assert predicted == {i: i / 100 for i in [0, 1, 2, 6, 7, 8, 9]}
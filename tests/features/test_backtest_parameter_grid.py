@@ -0,0 +1,87 @@
+import math
+
+import numpy as np
+import pytest
+
+from fart.features.backtest_parameter_grid import (
+    COST_PCT,
+    HIT_RATE,
+    MAX_DRAWDOWN,
+    MAX_HOLDING_PERIOD,
+    NET_RETURN,
+    NUM_TRADES,
+    SERIES,
+    SLIPPAGE_PCT,
+    STOP_LOSS_PCT,
+    THRESHOLD,
+    backtest_parameter_grid,
+)
+from fart.features.calculate_trade_returns import calculate_trade_returns
+
+
+def _summarize(returns: list[float]) -> tuple[float, int, float, float]:
+    capital = peak = 1.0
+    max_drawdown = 0.0
+    for net_return in returns:
+        capital *= 1 + net_return
+        peak = max(peak, capital)
+        max_drawdown = max(max_drawdown, 1 - capital / peak)
+    hit_rate = (
+        sum(net_return > 0 for net_return in returns) / len(returns)
+        if returns
+        else math.nan
+    )
+    return capital - 1, len(returns), hit_rate, max_drawdown
+
+
+def test_backtest_parameter_grid_matches_per_config_backtests() -> None:
+    rng = np.random.default_rng(0)
+    magnitudes = rng.normal(0, 0.01, 3000)
+    magnitudes[rng.random(3000) < 0.01] = np.nan
+    predicted = {
+        "noisy": magnitudes + rng.normal(0, 0.01, 3000),
+        "oracle": np.append(magnitudes[1:], np.nan),
+    }
+    predicted["noisy"][rng.random(3000) < 0.02] = np.nan
+    magnitudes = np.nan_to_num(magnitudes)
+
+    df = backtest_parameter_grid(
+        magnitudes,
+        thresholds=[0.0, 0.005, 0.01],
+        predicted_magnitudes=predicted,
+        stop_loss_pcts=[None, 0.005, 0.02],
+        max_holding_periods=[None, 1, 10, 200],
+        cost_pcts=[0.0, 0.0025],
+        slippage_pcts=[0.0, 0.001],
+    )
+
+    assert len(df) == 2 * 3 * 3 * 4 * 2 * 2
+    for row in df.iter_rows(named=True):
+        returns, _ = calculate_trade_returns(
+            magnitudes,
+            predicted[row[SERIES]],
+            cost_pct=row[COST_PCT],
+            slippage_pct=row[SLIPPAGE_PCT],
+            threshold=row[THRESHOLD],
+            max_holding_period=row[MAX_HOLDING_PERIOD],
+            stop_loss_pct=row[STOP_LOSS_PCT],
+        )
+        net_return, num_trades, hit_rate, max_drawdown = _summarize(returns)
+        assert row[NUM_TRADES] == num_trades
+        assert row[NET_RETURN] == pytest.approx(net_return, rel=1e-9, abs=1e-12)
+        assert row[HIT_RATE] == pytest.approx(hit_rate, nan_ok=True)
+        assert row[MAX_DRAWDOWN] == pytest.approx(max_drawdown, rel=1e-9, abs=1e-12)
+
+
+def test_backtest_parameter_grid_without_trades() -> None:
+    df = backtest_parameter_grid([0.001, -0.001, 0.001], thresholds=[0.01])
+
+    assert df[SERIES].to_list() == ["magnitudes"]
+    assert df[NUM_TRADES].to_list() == [0]
+    assert df[NET_RETURN].to_list() == [0.0]
+    assert math.isnan(df[HIT_RATE][0])
+
+
+def test_backtest_parameter_grid_mismatched_predicted_length_raises() -> None:
+    with pytest.raises(ValueError, match="same length"):
+        backtest_parameter_grid([0.01, 0.02], [0.0], predicted_magnitudes=[0.01])
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from fart.constants import PROFIT_LOSS
+from fart.features.backtest_portfolio import (
+    MARKET,
+    NUM_TRADES,
+    PORTFOLIO,
+    backtest_portfolio,
+)
+from fart.features.calculate_trade_returns import calculate_trade_returns
+
+RULES = {
+    "cost_pct": 0.001,
+    "threshold": 0.002,
+    "max_holding_period": 6,
+    "stop_loss_pct": 0.01,
+}
+
+
+def _series(num_candles: int, num_markets: int) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(0)
+    magnitudes = rng.normal(0, 0.005, (num_candles, num_markets))
+    predicted = np.roll(magnitudes, -1, axis=0) + rng.normal(0, 0.003, magnitudes.shape)
+    predicted[rng.random(magnitudes.shape) < 0.05] = np.nan
+    return magnitudes, predicted
+
+
+def test_backtest_portfolio_single_market_matches_calculate_trade_returns() -> None:
+    magnitudes, predicted = _series(400, 1)
+
+    equity, summary = backtest_portfolio(magnitudes[:, 0], predicted[:, 0], **RULES)
+
+    returns, profits = calculate_trade_returns(
+        magnitudes[:, 0], predicted[:, 0], initial_capital=500, **RULES
+    )
+    assert summary[NUM_TRADES].to_list() == [len(returns)]
+    assert equity[PORTFOLIO][-1] == pytest.approx(500 + sum(profits))
+
+
+def test_backtest_portfolio_trades_every_market_by_the_same_rules() -> None:
+    magnitudes, predicted = _series(300, 5)
+    markets = ["BTC-EUR", "ETH-EUR", "SOL-EUR", "ADA-EUR", "XRP-EUR"]
+
+    equity, summary = backtest_portfolio(magnitudes, predicted, markets, **RULES)
+
+    assert summary[MARKET].to_list() == markets
+    for j in range(len(markets)):
+        returns, _ = calculate_trade_returns(magnitudes[:, j], predicted[:, j], **RULES)
+        assert summary[NUM_TRADES][j] == len(returns)
+    assert equity.columns == [*markets, PORTFOLIO]
+    assert equity[PORTFOLIO][-1] == pytest.approx(500 + summary[PROFIT_LOSS].sum())
+    # Everything is closed by the last candle, so no capital is left out
+    assert equity.row(-1)[: len(markets)] == pytest.approx(
+        summary[PROFIT_LOSS].to_list()
+    )
+
+
+def test_backtest_portfolio_rejects_mismatched_shapes() -> None:
+    with pytest.raises(ValueError, match="same shape"):
+        backtest_portfolio(np.zeros((10, 2)), np.zeros((10, 3)))
@@ -0,0 +1,72 @@
+import numpy as np
+import polars as pl
+import pytest
+
+from fart.constants import CLOSE, EMA
+from fart.features.calculate_indicator_sweep import (
+    calculate_indicator_sweep,
+    indicator_sweep_columns,
+)
+from fart.features.calculate_technical_indicators import (
+    calculate_technical_indicators,
+)
+from fart.features.technical_indicators_config import (
+    BBandsConfig,
+    EMAConfig,
+    MACDConfig,
+    RSIConfig,
+    TechnicalIndicatorsConfig,
+)
+
+CONFIGS = [
+    TechnicalIndicatorsConfig(),
+    TechnicalIndicatorsConfig(
+        ema=EMAConfig(fast_period=12, slow_period=26),
+        macd=MACDConfig(fast_period=26, slow_period=12, signal_period=5),
+        rsi=RSIConfig(period=7),
+    ),
+    TechnicalIndicatorsConfig(bbands=BBandsConfig(standard_deviation=3)),
+]
+
+
+def test_calculate_indicator_sweep_matches_each_config_per_market() -> None:
+    rng = np.random.default_rng(0)
+    df = pl.DataFrame(
+        {
+            "Market": ["BTC-EUR", "ETH-EUR"] * 300,
+            CLOSE: 100 * np.cumprod(1 + rng.normal(0, 0.01, 600)),
+        }
+    )
+
+    sweep = calculate_indicator_sweep(df, CONFIGS, by="Market", max_workers=4)
+
+    assert sweep.select(df.columns).equals(df)
+    for market in ["BTC-EUR", "ETH-EUR"]:
+        rows = pl.col("Market") == market
+        for config in CONFIGS:
+            expected = calculate_technical_indicators(df.filter(rows), config)
+            for column, sweep_column in indicator_sweep_columns(config).items():
+                np.testing.assert_array_equal(
+                    sweep.filter(rows)[sweep_column].to_numpy(),
+                    expected[column].to_numpy(),
+                    err_msg=column,
+                )
+
+
+def test_calculate_indicator_sweep_computes_shared_series_once() -> None:
+    df = pl.DataFrame({CLOSE: np.linspace(100, 200, 100)})
+
+    sweep = calculate_indicator_sweep(df, CONFIGS)
+
+    # EMA 9, 12, 21 and 26, the last two shared with the MACD slow lines
+    assert [c for c in sweep.columns if c.startswith(EMA)] == [
+        f"{EMA} (9)",
+        f"{EMA} (12)",
+        f"{EMA} (21)",
+        f"{EMA} (26)",
+    ]
+    # Bands (3 columns, the middle one shared): 5, MACD: 2 x 3, RSI: 2
+    assert sweep.width == 1 + 5 + 4 + 6 + 2
+
+    with pytest.raises(ValueError, match="config"):
+        calculate_indicator_sweep(df, [])
@@ -0,0 +1,21 @@
+import numpy as np
+import polars as pl
+
+from fart.constants import CLOSE, RSI
+from fart.features.calculate_technical_indicators import (
+    calculate_technical_indicators,
+)
+
+
+def test_calculate_technical_indicators_runs_eagerly_or_lazily() -> None:
+    df = pl.DataFrame(
+        {CLOSE: 100 * np.cumprod(1 + np.random.default_rng(0).normal(0, 0.01, 100))}
+    )
+
+    eager = calculate_technical_indicators(df)
+    lazy = calculate_technical_indicators(df.lazy())
+
+    assert isinstance(lazy, pl.LazyFrame)
+    assert lazy.collect().equals(eager)
+    assert eager.width == 10
+    assert eager[RSI].is_nan().sum() == 14
@@ -1,8 +1,16 @@
+import importlib.util
 import math
 
+import numpy as np
 import pytest
 
-from fart.features.calculate_trade_returns import calculate_trade_returns
+from fart.features.calculate_trade_returns import (
+    STOP_LOSS_SCAN_CHUNK,
+    _find_trade_boundaries,  # pyright: ignore[reportPrivateUsage] -- Reference implementation
+    _find_trade_boundaries_numba,  # pyright: ignore[reportPrivateUsage] -- Backend under test
+    _find_trade_boundaries_numpy,  # pyright: ignore[reportPrivateUsage] -- Backend under test
+    calculate_trade_returns,
+)
 
 
 def test_calculate_trade_returns_opens_and_closes_a_trade() -> None:
@@ -188,3 +196,99 @@ def test_calculate_trade_returns_predicted_magnitudes_trailing_nan_is_no_signal(
     cost_factor = (1 - 0.0025) ** 2
     expected_return = (1 - 0.01) * cost_factor - 1
     assert returns == pytest.approx([expected_return])
+
+
+def test_calculate_trade_returns_unknown_backend_raises() -> None:
+    with pytest.raises(ValueError, match="backend"):
+        calculate_trade_returns([0.01, 0.02], backend="fortran")
+
+
+@pytest.mark.parametrize(
+    "backend",
+    [
+        "numpy",
+        pytest.param(
+            "numba",
+            marks=pytest.mark.skipif(
+                importlib.util.find_spec("numba") is None,
+                reason="requires the numba extra",
+            ),
+        ),
+    ],
+)
+def test_find_trade_boundaries_backends_match_reference_loop(backend: str) -> None:
+    rng = np.random.default_rng(0)
+    find_trade_boundaries = {
+        "numpy": _find_trade_boundaries_numpy,
+        "numba": _find_trade_boundaries_numba,
+    }[backend]
+
+    for _ in range(200):
+        size = int(rng.integers(1, 300))
+        values = rng.normal(0, 0.01, size)
+        signal_values = values + rng.normal(0, 0.01, size)
+        values[rng.random(size) < 0.05] = np.nan
+        signal_values[rng.random(size) < 0.05] = np.nan
+        threshold = float(rng.uniform(0, 0.015))
+        max_holding_period = None if rng.random() < 0.3 else int(rng.integers(-1, 20))
+        stop_loss_pct = None if rng.random() < 0.3 else float(rng.uniform(0, 0.03))
+
+        assert find_trade_boundaries(
+            values, signal_values, threshold, max_holding_period, stop_loss_pct
+        ) == _find_trade_boundaries(
+            values, signal_values, threshold, max_holding_period, stop_loss_pct
+        )
+
+
+def test_find_trade_boundaries_numpy_stop_loss_without_close_signal() -> None:
+    # No close signal or holding period, so only the stop-loss ends trades,
+    # some after several scan chunks
+    rng = np.random.default_rng(2)
+    values = rng.normal(0, 0.01, 5000)
+    signal_values = np.abs(values) + 0.01
+
+    boundaries = _find_trade_boundaries_numpy(values, signal_values, 0.005, None, 0.05)
+
+    assert len(boundaries) > 1
+    assert max(exit - entry for entry, exit in boundaries) > 4 * STOP_LOSS_SCAN_CHUNK
+    assert boundaries == _find_trade_boundaries(
+        values, signal_values, 0.005, None, 0.05
+    )
+
+
+@pytest.mark.skipif(
+    importlib.util.find_spec("numba") is not None, reason="numba is installed"
+)
+def test_calculate_trade_returns_numba_backend_without_numba_raises() -> None:
+    with pytest.raises(ImportError, match="numba"):
+        calculate_trade_returns([0.01, 0.02], backend="numba")
+
+
+def test_calculate_trade_returns_prefix_matches_per_trade_compounding() -> None:
+    rng = np.random.default_rng(1)
+    magnitudes = rng.normal(0, 0.01, 2000)
+    magnitudes[rng.random(2000) < 0.002] = np.nan
+    magnitudes[100] = -1.0  # Price to zero
+    magnitudes[200] = -1.5  # Sign flip
+    # Stay in the market, so trades span the special magnitudes above
+    predicted_magnitudes = np.full(2000, 0.01)
+
+    returns, profits = calculate_trade_returns(
+        magnitudes, predicted_magnitudes, threshold=0.005, max_holding_period=50
+    )
+
+    boundaries = _find_trade_boundaries(magnitudes, predicted_magnitudes, 0.005, 50)
+    cost_factor = (1 - 0.0025) ** 2
+    expected_returns = [
+        float(np.prod(1 + magnitudes[entry + 1 : exit + 1])) * cost_factor - 1
+        for entry, exit in boundaries
+    ]
+    expected_profits: list[float] = []
+    capital = 500.0
+    for net_return in expected_returns:
+        expected_profits.append(capital * net_return)
+        capital += capital * net_return
+    assert any(math.isnan(net_return) for net_return in expected_returns)
+    assert -1 in expected_returns
+    assert returns == pytest.approx(expected_returns, rel=1e-9, nan_ok=True)
+    assert profits == pytest.approx(expected_profits, rel=1e-9, nan_ok=True)
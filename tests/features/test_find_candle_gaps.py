@@ -0,0 +1,42 @@
+import polars as pl
+
+from fart.constants import CLOSE, TIMESTAMP
+from fart.features.find_candle_gaps import find_candle_gaps
+
+MINUTE = 60_000
+
+
+def test_find_candle_gaps_returns_missing_ranges() -> None:
+    df = pl.DataFrame(
+        {
+            TIMESTAMP: [0, MINUTE, 4 * MINUTE, 5 * MINUTE, 7 * MINUTE],
+            CLOSE: [1.0, 2.0, 3.0, 4.0, 5.0],
+        }
+    )
+
+    assert find_candle_gaps(df, "1m") == [
+        (2 * MINUTE, 4 * MINUTE),
+        (6 * MINUTE, 7 * MINUTE),
+    ]
+
+
+def test_find_candle_gaps_ignores_order_and_duplicates() -> None:
+    df = pl.DataFrame({TIMESTAMP: [3 * MINUTE, 0, MINUTE, MINUTE]})
+
+    assert find_candle_gaps(df, "1m") == [(2 * MINUTE, 3 * MINUTE)]
+
+
+def test_find_candle_gaps_without_gaps_is_empty() -> None:
+    df = pl.DataFrame({TIMESTAMP: [0, MINUTE, 2 * MINUTE]})
+
+    assert find_candle_gaps(df, "1m") == []
+
+
+def test_find_candle_gaps_follows_calendar_months() -> None:
+    # 2024-01-01, 2024-02-01, 2024-04-01 (UTC): only March is missing,
+    # despite months differing in length
+    df = pl.DataFrame(
+        {TIMESTAMP: [1_704_067_200_000, 1_706_745_600_000, 1_711_929_600_000]}
+    )
+
+    assert find_candle_gaps(df, "1M") == [(1_709_251_200_000, 1_711_929_600_000)]
@@ -0,0 +1,69 @@
+import polars as pl
+import pytest
+
+from fart.constants import CLOSE, HIGH, LOW, OPEN, TIMESTAMP, VOLUME
+from fart.features.resample_candles import resample_candles
+
+# 2024-01-01T00:00:00Z, a Monday
+START = 1_704_067_200_000
+MINUTE = 60_000
+HOUR = 3_600_000
+
+
+def _minute_candles(num_candles: int, start: int = START) -> pl.DataFrame:
+    return pl.DataFrame(
+        {
+            TIMESTAMP: [start + i * MINUTE for i in range(num_candles)],
+            OPEN: [float(i) for i in range(num_candles)],
+            HIGH: [float(i) + 10 for i in range(num_candles)],
+            LOW: [float(i) - 10 for i in range(num_candles)],
+            CLOSE: [float(i) + 0.5 for i in range(num_candles)],
+            VOLUME: [1.0] * num_candles,
+        }
+    )
+
+
+def test_resample_candles_aggregates_ohlcv() -> None:
+    resampled = resample_candles(_minute_candles(120), "1m", "1h")
+
+    assert resampled[TIMESTAMP].to_list() == [START, START + HOUR]
+    assert resampled[OPEN].to_list() == [0.0, 60.0]
+    assert resampled[HIGH].to_list() == [69.0, 129.0]
+    assert resampled[LOW].to_list() == [-10.0, 50.0]
+    assert resampled[CLOSE].to_list() == [59.5, 119.5]
+    assert resampled[VOLUME].to_list() == [60.0, 60.0]
+
+
+def test_resample_candles_drops_trailing_incomplete_window() -> None:
+    resampled = resample_candles(_minute_candles(119), "1m", "1h")
+
+    assert resampled[TIMESTAMP].to_list() == [START]
+
+
+def test_resample_candles_sorts_and_deduplicates_first() -> None:
+    df = _minute_candles(60)
+    shuffled = pl.concat([df.reverse(), df.head(5)])
+
+    assert resample_candles(shuffled, "1m", "1h").equals(
+        resample_candles(df, "1m", "1h")
+    )
+
+
+def test_resample_candles_aligns_weeks_on_monday() -> None:
+    # Starts on Monday 2024-01-01 and covers exactly one full week
+    df = _minute_candles(7 * 24 * 60)
+
+    resampled = resample_candles(df, "1m", "1W")
+
+    assert resampled[TIMESTAMP].to_list() == [START]
+    assert resampled[VOLUME].to_list() == [7 * 24 * 60.0]
+
+
+@pytest.mark.parametrize(
+    "source_interval,interval", [("1h", "1m"), ("1h", "1h"), ("15m", "20m")]
+)
+def test_resample_candles_rejects_non_coarser_intervals(
+    source_interval: str, interval: str
+) -> None:
+    with pytest.raises(ValueError):
+        resample_candles(_minute_candles(10), source_interval, interval)
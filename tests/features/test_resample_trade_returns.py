@@ -0,0 +1,95 @@
+from typing import Any
+
+import numpy as np
+import pytest
+
+from fart.features import resample_trade_returns as resample_module
+from fart.features.calculate_trade_returns import calculate_trade_returns
+from fart.features.resample_trade_returns import (
+    LOWER,
+    MEAN,
+    OBSERVED,
+    UPPER,
+    resample_trade_returns,
+)
+
+
+def _magnitudes(num_candles: int = 500) -> np.ndarray:
+    return np.random.default_rng(0).normal(0.0005, 0.01, num_candles)
+
+
+@pytest.mark.parametrize("method", ["block", "trades"])
+def test_resample_trade_returns_brackets_the_observed_backtest(method: str) -> None:
+    magnitudes = _magnitudes()
+    # A noisy forecast of the next candle, so some trades lose
+    predicted = np.concatenate([magnitudes[1:], [np.nan]]) + np.random.default_rng(
+        1
+    ).normal(0, 0.01, len(magnitudes))
+
+    summary = resample_trade_returns(
+        magnitudes,
+        predicted,
+        method=method,
+        num_resamples=200,
+        max_workers=1,
+        cost_pct=0.0,
+    )
+
+    returns, _ = calculate_trade_returns(magnitudes, predicted, cost_pct=0.0)
+    net_return, max_drawdown = summary[OBSERVED].to_list()
+    assert net_return == pytest.approx(np.prod(1 + np.array(returns)) - 1)
+    assert 0 <= max_drawdown < 1
+    assert (summary[LOWER] <= summary[MEAN]).all()
+    assert (summary[MEAN] <= summary[UPPER]).all()
+    assert (summary[LOWER] < summary[UPPER]).all()
+
+
+def test_resample_trade_returns_is_reproducible_across_workers() -> None:
+    magnitudes = _magnitudes()
+
+    in_process = resample_trade_returns(
+        magnitudes, num_resamples=100, seed=1, max_workers=1
+    )
+    pooled = resample_trade_returns(
+        magnitudes, num_resamples=100, seed=1, max_workers=2
+    )
+
+    assert pooled.equals(in_process)
+
+
+def test_resample_trade_returns_rejects_unknown_method() -> None:
+    with pytest.raises(ValueError, match="method"):
+        resample_trade_returns(_magnitudes(), method="x")
+
+
+def test_resample_trade_returns_batches_replays_within_the_memory_budget(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    magnitudes = _magnitudes()
+    at_once = resample_trade_returns(magnitudes, num_resamples=100, max_workers=1)
+    replayed_candles = []
+    backtest_signal = resample_module._backtest_signal  # pyright: ignore[reportPrivateUsage] -- Wrapped to record batch sizes
+
+    def recording_backtest_signal(values: np.ndarray, *args: Any, **kwargs: Any) -> Any:
+        replayed_candles.append(len(values))
+        return backtest_signal(values, *args, **kwargs)
+
+    # Room for three replays of the series per batch
+    monkeypatch.setattr(
+        resample_module,
+        "REPLAY_MEMORY_BUDGET",
+        3 * len(magnitudes) * resample_module.BYTES_PER_REPLAYED_CANDLE,
+    )
+    monkeypatch.setattr(resample_module, "_backtest_signal", recording_backtest_signal)
+    batched = resample_trade_returns(magnitudes, num_resamples=100, max_workers=1)
+
+    assert max(replayed_candles) == 3 * len(magnitudes)
+    for column in [MEAN, LOWER, UPPER]:
+        np.testing.assert_allclose(batched[column], at_once[column])
+
+
+def test_resample_trade_returns_rejects_a_series_without_magnitudes() -> None:
+    with pytest.raises(ValueError, match="at least one candle"):
+        resample_trade_returns([], max_workers=1)
+    with pytest.raises(ValueError, match="at least one candle"):
+        resample_trade_returns([np.nan, np.nan], max_workers=1)
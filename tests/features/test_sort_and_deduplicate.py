@@ -63,3 +63,12 @@ def test_sort_and_deduplicate_noop_without_timestamp_column() -> None:
     df = pl.DataFrame({CLOSE: [1.0, 2.0, 3.0]})
 
     assert sort_and_deduplicate(df).equals(df)
+
+
+def test_sort_and_deduplicate_extends_a_lazy_query() -> None:
+    df = pl.DataFrame({TIMESTAMP: [60_000, 0, 60_000], CLOSE: [2.0, 1.0, 3.0]})
+
+    result = sort_and_deduplicate(df.lazy())
+
+    assert isinstance(result, pl.LazyFrame)
+    assert result.collect().equals(sort_and_deduplicate(df))
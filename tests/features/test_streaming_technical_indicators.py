@@ -0,0 +1,82 @@
+import json
+
+import numpy as np
+import polars as pl
+import pytest
+
+from fart.constants import CLOSE
+from fart.features.calculate_technical_indicators import (
+    calculate_technical_indicators,
+)
+from fart.features.streaming_technical_indicators import (
+    StreamingTechnicalIndicators,
+)
+from fart.features.technical_indicators_config import (
+    BBandsConfig,
+    MACDConfig,
+    RSIConfig,
+    TechnicalIndicatorsConfig,
+)
+
+
+def _closes() -> list[float]:
+    closes = 100 * np.cumprod(1 + np.random.default_rng(0).normal(0, 0.01, 1000))
+    # A flat stretch, where the bands collapse and RSI stops moving
+    closes[300:340] = closes[299]
+    return closes.tolist()
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        TechnicalIndicatorsConfig(),
+        TechnicalIndicatorsConfig(
+            bbands=BBandsConfig(period=2, standard_deviation=1),
+            macd=MACDConfig(fast_period=26, slow_period=12, signal_period=1),
+            rsi=RSIConfig(period=2),
+        ),
+    ],
+)
+def test_streaming_indicators_match_the_batch_path(
+    config: TechnicalIndicatorsConfig,
+) -> None:
+    closes = _closes()
+    expected = calculate_technical_indicators(pl.DataFrame({CLOSE: closes}), config)
+
+    indicators = StreamingTechnicalIndicators(config)
+    rows = [indicators.update(close) for close in closes]
+
+    for column in rows[0]:
+        np.testing.assert_allclose(
+            [row[column] for row in rows],
+            expected[column].to_numpy(),
+            rtol=1e-10,
+            atol=1e-10,
+            err_msg=column,
+        )
+
+
+def test_streaming_indicators_resume_from_a_snapshot() -> None:
+    closes = _closes()
+    indicators = StreamingTechnicalIndicators()
+    for close in closes[:500]:
+        indicators.update(close)
+
+    restored = StreamingTechnicalIndicators.restore(
+        json.loads(json.dumps(indicators.snapshot(), allow_nan=False))
+    )
+
+    for close in closes[500:]:
+        assert restored.update(close) == indicators.update(close)
+
+
+def test_streaming_indicators_snapshot_before_any_update_is_strict_json() -> None:
+    indicators = StreamingTechnicalIndicators()
+
+    restored = StreamingTechnicalIndicators.restore(
+        json.loads(json.dumps(indicators.snapshot(), allow_nan=False))
+    )
+
+    closes = _closes()
+    for close in closes[:100]:
+        np.testing.assert_equal(restored.update(close), indicators.update(close))
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+import torch
+from torch import nn
+
+from fart.model.evaluate_model import evaluate_model
+from fart.model.prepare_datasets import train_test_split
+from fart.model.window_dataset import WindowDataset
+
+
+class _RecordingModel(nn.Module):
+    # A fixed linear model, recording the size of every minibatch it sees
+    def __init__(self, num_lags: int) -> None:
+        super().__init__()
+        self.linear = nn.Linear(num_lags, 1)
+        self.batch_sizes: list[int] = []
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        self.batch_sizes.append(x.shape[0])
+        return self.linear(x)
+
+
+def test_evaluate_model_predicts_in_minibatches_like_one_pass() -> None:
+    data = np.random.default_rng(0).normal(0, 0.01, 100).astype(np.float32)
+    x_train, y_train, _, _, x_test, y_test = train_test_split(data=data, num_lags=5)
+    torch.manual_seed(0)  # pyright: ignore[reportUnknownMemberType] -- manual_seed's parameter is untyped upstream (torch/random.py)
+    model = _RecordingModel(num_lags=5)
+
+    y_train_pred, y_test_pred, *metrics = evaluate_model(
+        model, x_train, y_train, x_test, y_test, batch_size=8
+    )
+
+    assert max(model.batch_sizes) == 8
+    with torch.no_grad():
+        np.testing.assert_allclose(
+            y_train_pred, model(torch.tensor(x_train)).numpy().reshape(-1), rtol=1e-6
+        )
+        np.testing.assert_allclose(
+            y_test_pred, model(torch.tensor(x_test)).numpy().reshape(-1), rtol=1e-6
+        )
+    assert all(np.isfinite(metric) for metric in metrics)
+
+
+def test_evaluate_model_accepts_window_datasets() -> None:
+    data = np.random.default_rng(0).normal(0, 0.01, 100).astype(np.float32)
+    x_train, y_train, _, _, x_test, y_test = train_test_split(data=data, num_lags=5)
+    train, _, test = WindowDataset(data, num_lags=5).split()
+    torch.manual_seed(0)  # pyright: ignore[reportUnknownMemberType] -- manual_seed's parameter is untyped upstream (torch/random.py)
+    model = _RecordingModel(num_lags=5)
+
+    from_arrays = evaluate_model(model, x_train, y_train, x_test, y_test)
+    from_datasets = evaluate_model(model, train, None, test, None)
+
+    for from_array, from_dataset in zip(from_arrays, from_datasets):
+        assert from_dataset == pytest.approx(from_array)
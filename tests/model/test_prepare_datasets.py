@@ -3,8 +3,10 @@ from pathlib import Path
 import numpy as np
 import pytest
 
-from fart.constants import CLOSE, MAGNITUDE, TIMESTAMP
+from fart.constants import CLOSE, MAGNITUDE, TIMESTAMP, VOLUME
 from fart.model.prepare_datasets import prepare_datasets, train_test_split
+from fart.store.candle_buffer import CandleBuffer
+from fart.store.parquet_candle_store import ParquetCandleStore
 
 CSV_HEADER = f"{TIMESTAMP},{CLOSE}\n"
 
@@ -42,6 +44,17 @@ def test_train_test_split_builds_lag_windows() -> None:
     assert y_test[0] == 16
 
 
+def test_train_test_split_returns_read_only_views_of_data() -> None:
+    data = np.arange(20, dtype=np.float32)
+
+    splits = train_test_split(data=data, num_lags=3)
+
+    for split in splits:
+        assert np.shares_memory(split, data)
+    for x in splits[::2]:
+        assert not x.flags.writeable
+
+
 def test_train_test_split_raises_when_not_enough_data() -> None:
     data = np.arange(3, dtype=np.float32)
 
@@ -71,6 +84,28 @@ def test_prepare_datasets_returns_windowed_split(tmp_path: Path) -> None:
     assert np.all(np.isfinite(y_train))
 
 
+def test_prepare_datasets_reads_parquet_store_like_csv(tmp_path: Path) -> None:
+    csv_path = tmp_path / "BTC-EUR-1d.csv"
+    _write_candle_csv(csv_path, num_rows=60)
+    store = ParquetCandleStore(tmp_path / "BTC-EUR-1d")
+    store.append(
+        CandleBuffer.from_candles(
+            [
+                (1_600_000_000_000 + i * 86_400_000, 0.0, 0.0, 0.0, 100.0 + i, 0.0)
+                for i in range(60)
+            ]
+        )
+    )
+
+    from_csv = prepare_datasets(data_filepath=csv_path, target=MAGNITUDE, num_lags=5)
+    from_parquet = prepare_datasets(
+        data_filepath=store.path, target=MAGNITUDE, num_lags=5
+    )
+
+    for csv_split, parquet_split in zip(from_csv, from_parquet):
+        np.testing.assert_array_equal(csv_split, parquet_split)
+
+
 def test_prepare_datasets_deduplicates_and_sorts_candles(tmp_path: Path) -> None:
     clean_path = tmp_path / "clean.csv"
     tampered_path = tmp_path / "tampered.csv"
@@ -101,3 +136,68 @@ def test_prepare_datasets_missing_csv_raises(tmp_path: Path) -> None:
         prepare_datasets(
             data_filepath=tmp_path / "missing.csv", target=MAGNITUDE, num_lags=5
         )
+
+
+def test_prepare_datasets_only_reads_the_columns_of_the_target(
+    tmp_path: Path,
+) -> None:
+    filepath = tmp_path / "BTC-EUR-1d.csv"
+    _write_candle_csv(filepath, num_rows=60)
+    lines = filepath.read_text().splitlines()
+    # An unparseable column the Magnitude target doesn't depend on
+    filepath.write_text(
+        "\n".join(
+            [f"{lines[0]},{VOLUME}"] + [f"{line},not-a-number" for line in lines[1:]]
+        )
+        + "\n"
+    )
+
+    x_train, *_ = prepare_datasets(data_filepath=filepath, target=MAGNITUDE, num_lags=5)
+
+    assert np.all(np.isfinite(x_train))
+
+
+def test_prepare_datasets_keeps_rows_with_nulls_outside_the_target(
+    tmp_path: Path,
+) -> None:
+    clean_path = tmp_path / "clean.csv"
+    _write_candle_csv(clean_path, num_rows=60)
+    lines = clean_path.read_text().splitlines()
+    gappy_path = tmp_path / "gappy.csv"
+    # Every other candle is missing its Volume
+    gappy_path.write_text(
+        "\n".join(
+            [f"{lines[0]},{VOLUME}"]
+            + [
+                f"{line}," if i % 2 else f"{line},1.0"
+                for i, line in enumerate(lines[1:])
+            ]
+        )
+        + "\n"
+    )
+
+    clean = prepare_datasets(data_filepath=clean_path, target=MAGNITUDE, num_lags=5)
+    gappy = prepare_datasets(data_filepath=gappy_path, target=MAGNITUDE, num_lags=5)
+
+    for clean_split, gappy_split in zip(clean, gappy):
+        np.testing.assert_array_equal(clean_split, gappy_split)
+
+
+def test_prepare_datasets_caches_the_target_series(tmp_path: Path) -> None:
+    filepath = tmp_path / "BTC-EUR-1d.csv"
+    _write_candle_csv(filepath, num_rows=60)
+    cache_dir = tmp_path / "features"
+
+    uncached = prepare_datasets(data_filepath=filepath, target=MAGNITUDE, num_lags=5)
+    cached = prepare_datasets(
+        data_filepath=filepath, target=MAGNITUDE, num_lags=5, cache_dir=cache_dir
+    )
+    for uncached_split, cached_split in zip(uncached, cached):
+        np.testing.assert_array_equal(uncached_split, cached_split)
+
+    # Rewritten candles are hashed again rather than served from the cache
+    filepath.write_text(filepath.read_text().replace(",101.0", ",99.0"))
+    rewritten = prepare_datasets(
+        data_filepath=filepath, target=MAGNITUDE, num_lags=5, cache_dir=cache_dir
+    )
+    assert rewritten[0][0, 0] < 0 < cached[0][0, 0]
@@ -1,10 +1,17 @@
 import copy
 
 import numpy as np
+import pytest
 import torch
 from torch import nn
 
-from fart.model.train_model import init_dataloader, init_optimizer, train_model
+from fart.model.train_model import (
+    TensorBatches,
+    init_dataloader,
+    init_optimizer,
+    train_model,
+)
+from fart.model.window_dataset import WindowDataset
 
 
 def test_init_dataloader_batches_and_converts_to_tensors() -> None:
@@ -21,6 +28,23 @@ def test_init_dataloader_batches_and_converts_to_tensors() -> None:
     assert y_batch.dtype == torch.float32
 
 
+def test_init_dataloader_copies_minibatches_of_read_only_views() -> None:
+    data = np.arange(12, dtype=np.float32)
+    x = np.lib.stride_tricks.sliding_window_view(data[:-1], 3)
+    y = data[3:]
+
+    loader = init_dataloader(x=x, y=y, batch_size=4)
+    batches = list(loader)
+
+    assert [x_batch.shape for x_batch, _ in batches] == [(4, 3), (4, 3), (1, 3)]
+    x_all = torch.cat([x_batch for x_batch, _ in batches]).numpy()
+    y_all = torch.cat([y_batch for _, y_batch in batches]).numpy()
+    # Every window once, still paired with its target, in shuffled order
+    order = np.argsort(y_all)
+    np.testing.assert_array_equal(x_all[order], x)
+    np.testing.assert_array_equal(y_all[order], y)
+
+
 def test_init_optimizer_returns_adam_with_learning_rate() -> None:
     model = nn.Linear(2, 1)
 
@@ -87,3 +111,158 @@ def test_train_model_with_validation_returns_per_epoch_loss_history() -> None:
     assert [record["epoch"] for record in loss_history] == [1.0, 2.0, 3.0]
     for record in loss_history:
         assert set(record.keys()) == {"epoch", "train_loss", "val_loss"}
+
+
+def test_train_model_keeps_stepping_a_given_optimizer() -> None:
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=(32, 2)).astype(np.float32)
+    y = rng.normal(size=32).astype(np.float32)
+    model = nn.Linear(2, 1)
+    # A zero learning rate leaves the weights untouched, so they only
+    # change if `learning_rate` wrongly built a fresh optimizer
+    optimizer = init_optimizer(model=model, learning_rate=0.0)
+    weights_before = copy.deepcopy(model.state_dict())
+
+    train_model(
+        model=model,
+        x_train=x,
+        y_train=y,
+        batch_size=8,
+        learning_rate=0.05,
+        num_epochs=2,
+        optimizer=optimizer,
+    )
+
+    for name, weights in model.state_dict().items():
+        assert torch.equal(weights, weights_before[name])
+    assert optimizer.state
+
+
+def test_train_model_on_window_dataset_matches_arrays() -> None:
+    rng = np.random.default_rng(0)
+    data = rng.normal(size=80).astype(np.float32)
+    x = np.lib.stride_tricks.sliding_window_view(data[:-1], 3)
+    y = data[3:]
+    train, val, _ = WindowDataset(series=data, num_lags=3).split(
+        train_size=0.75, val_size=0.25
+    )
+    split, val_end = len(train), len(train) + len(val)
+
+    torch.manual_seed(0)
+    from_arrays, array_history = train_model(
+        model=nn.Linear(3, 1),
+        x_train=x[:split],
+        y_train=y[:split],
+        batch_size=8,
+        learning_rate=0.01,
+        num_epochs=3,
+        x_val=x[split:val_end],
+        y_val=y[split:val_end],
+    )
+    torch.manual_seed(0)
+    from_windows, window_history = train_model(
+        model=nn.Linear(3, 1),
+        x_train=train,
+        y_train=None,
+        batch_size=8,
+        learning_rate=0.01,
+        num_epochs=3,
+        x_val=val,
+    )
+
+    assert window_history == array_history
+    for array_param, window_param in zip(
+        from_arrays.parameters(), from_windows.parameters()
+    ):
+        torch.testing.assert_close(window_param, array_param)
+
+
+@pytest.mark.parametrize("reuse_buffers", [False, True])
+@pytest.mark.parametrize("windowed", [False, True])
+def test_tensor_batches_yield_every_window_once_per_epoch(
+    windowed: bool, reuse_buffers: bool
+) -> None:
+    torch.manual_seed(0)
+    data = np.arange(12, dtype=np.float32)
+    x = np.lib.stride_tricks.sliding_window_view(data[:-1], 3)
+    y = data[3:]
+
+    batches = (
+        TensorBatches(
+            x=WindowDataset(series=data, num_lags=3),
+            y=None,
+            batch_size=4,
+            reuse_buffers=reuse_buffers,
+        )
+        if windowed
+        else TensorBatches(x=x, y=y, batch_size=4, reuse_buffers=reuse_buffers)
+    )
+
+    assert len(batches) == 3
+    orders: list[np.ndarray] = []
+    for _ in range(2):
+        x_batches: list[np.ndarray] = []
+        y_batches: list[np.ndarray] = []
+        for x_batch, y_batch in batches:
+            assert x_batch.dtype == torch.float32
+            x_batches.append(x_batch.numpy().copy())
+            y_batches.append(y_batch.numpy().copy())
+        assert [len(x_batch) for x_batch in x_batches] == [4, 4, 1]
+        x_all = np.concatenate(x_batches)
+        y_all = np.concatenate(y_batches)
+        order = np.argsort(y_all)
+        np.testing.assert_array_equal(x_all[order], x)
+        np.testing.assert_array_equal(y_all[order], y)
+        orders.append(y_all)
+
+    # Reshuffled every epoch
+    assert not np.array_equal(orders[0], orders[1])
+
+
+def test_tensor_batches_reuse_buffers() -> None:
+    x = np.arange(20, dtype=np.float32).reshape(10, 2)
+    y = np.arange(10, dtype=np.float32)
+
+    batches = TensorBatches(x=x, y=y, batch_size=4, reuse_buffers=True)
+    pointers = {x_batch.data_ptr() for x_batch, _ in batches}
+
+    assert len(pointers) == 1
+
+
+def test_train_model_in_memory_reduces_loss() -> None:
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=(64, 3)).astype(np.float32)
+    y = (x @ np.array([1.5, -2.0, 0.5], dtype=np.float32)).astype(np.float32)
+    loss_fn = nn.MSELoss()
+
+    torch.manual_seed(0)
+    model = nn.Linear(3, 1)
+    with torch.no_grad():
+        initial_loss = loss_fn(model(torch.tensor(x)).squeeze(-1), torch.tensor(y))
+    trained, _ = train_model(
+        model=model,
+        x_train=x,
+        y_train=y,
+        batch_size=16,
+        learning_rate=0.05,
+        num_epochs=20,
+        in_memory=True,
+        reuse_buffers=True,
+    )
+    with torch.no_grad():
+        final_loss = loss_fn(trained(torch.tensor(x)).squeeze(-1), torch.tensor(y))
+
+    assert final_loss < initial_loss
+
+
+def test_train_model_raises_on_reuse_buffers_without_in_memory() -> None:
+    with pytest.raises(ValueError):
+        train_model(
+            model=nn.Linear(3, 1),
+            x_train=np.zeros((8, 3), dtype=np.float32),
+            y_train=np.zeros(8, dtype=np.float32),
+            batch_size=4,
+            learning_rate=0.01,
+            num_epochs=1,
+            reuse_buffers=True,
+        )
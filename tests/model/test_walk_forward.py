@@ -0,0 +1,116 @@
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pytest
+import torch
+
+from fart.model import walk_forward as walk_forward_module
+from fart.model.mlp_builder import MLPBuilder
+from fart.model.mlp_config import MLPConfig
+from fart.model.walk_forward import (
+    EPOCHS,
+    NET_RETURN,
+    NUM_TRADES,
+    TEST_START,
+    TRAIN_START,
+    Fold,
+    calculate_folds,
+    walk_forward,
+)
+
+
+def _walk_forward(data: np.ndarray, **kwargs: object):
+    return walk_forward(
+        data=data,
+        builder=MLPBuilder(MLPConfig(num_lags=4, num_neurons=8, num_blocks=1)),
+        num_lags=4,
+        train_size=40,
+        test_size=20,
+        batch_size=16,
+        learning_rate=0.01,
+        num_epochs=2,
+        cost_pct=0.0,
+        threshold=0.0,
+        **kwargs,  # pyright: ignore[reportArgumentType]
+    )
+
+
+def test_calculate_folds_expanding_and_rolling() -> None:
+    assert calculate_folds(num_windows=100, train_size=40, test_size=25) == [
+        Fold(0, 40, 65),
+        Fold(0, 65, 90),
+        Fold(0, 90, 100),
+    ]
+    assert calculate_folds(
+        num_windows=100, train_size=40, test_size=20, step=30, window="rolling"
+    ) == [Fold(0, 40, 60), Fold(30, 70, 90)]
+
+
+def test_calculate_folds_rejects_overlapping_test_windows() -> None:
+    with pytest.raises(ValueError, match="step"):
+        calculate_folds(num_windows=100, train_size=40, test_size=20, step=10)
+
+    with pytest.raises(ValueError, match="window"):
+        calculate_folds(num_windows=100, train_size=40, test_size=20, window="x")
+
+
+def test_walk_forward_compounds_folds_into_one_equity_curve(tmp_path: Path) -> None:
+    data = np.random.default_rng(0).normal(0, 0.01, 104).astype(np.float32)
+
+    summary, equity_curve = _walk_forward(
+        data, window="rolling", max_workers=1, cache_dir=tmp_path
+    )
+
+    assert summary[TRAIN_START].to_list() == [0, 20, 40]
+    assert summary[TEST_START].to_list() == [40, 60, 80]
+    assert len(equity_curve) == summary[NUM_TRADES].sum() + 1
+    assert equity_curve[0] == 500
+    assert equity_curve[-1] == pytest.approx(
+        500 * np.prod(1 + summary[NET_RETURN].to_numpy())
+    )
+    assert len(list(tmp_path.glob("*.npz"))) == 3
+
+    # Cached windows and per-fold seeds reproduce the same run, in a pool
+    pooled_summary, pooled_equity_curve = _walk_forward(
+        data, window="rolling", max_workers=2, cache_dir=tmp_path
+    )
+    assert pooled_summary.equals(summary)
+    np.testing.assert_allclose(pooled_equity_curve, equity_curve)
+
+
+def test_walk_forward_warm_starts_folds_with_fewer_epochs() -> None:
+    data = np.random.default_rng(0).normal(0, 0.01, 104).astype(np.float32)
+
+    summary, equity_curve = _walk_forward(data, warm_start=True, warm_start_epochs=1)
+
+    assert summary[EPOCHS].to_list() == [2, 1, 1]
+    assert len(equity_curve) == summary[NUM_TRADES].sum() + 1
+
+    cold_summary, _ = _walk_forward(data, max_workers=1)
+    assert cold_summary[EPOCHS].to_list() == [2, 2, 2]
+
+
+def test_walk_forward_warm_start_continues_from_the_previous_fold(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    data = np.random.default_rng(0).normal(0, 0.01, 104).astype(np.float32)
+    train_model = walk_forward_module.train_model
+    states: list[tuple[dict[str, torch.Tensor], dict[str, torch.Tensor]]] = []
+
+    def recording_train_model(model: torch.nn.Module, **kwargs: Any):
+        before = {k: v.clone() for k, v in model.state_dict().items()}
+        model, loss_history = train_model(model=model, **kwargs)
+        after = {k: v.clone() for k, v in model.state_dict().items()}
+        states.append((before, after))
+        return model, loss_history
+
+    monkeypatch.setattr(walk_forward_module, "train_model", recording_train_model)
+    _walk_forward(data, warm_start=True, warm_start_epochs=1)
+
+    assert len(states) == 3
+    for (_, previous_after), (before, after) in zip(states, states[1:]):
+        for name, tensor in before.items():
+            torch.testing.assert_close(tensor, previous_after[name])
+        # And each fold does train further
+        assert any(not torch.equal(after[name], before[name]) for name in before)
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+import torch
+
+from fart.model.prepare_datasets import train_test_split
+from fart.model.window_dataset import WindowDataset
+
+
+def test_window_dataset_matches_train_test_split() -> None:
+    data = np.arange(20, dtype=np.float32)
+
+    splits = WindowDataset(series=data, num_lags=3).split(train_size=0.6, val_size=0.2)
+    arrays = train_test_split(data=data, num_lags=3, train_size=0.6, val_size=0.2)
+
+    for dataset, x, y in zip(splits, arrays[::2], arrays[1::2]):
+        x_batch, y_batch = dataset[list(range(len(dataset)))]
+        assert x_batch.dtype == torch.float32
+        np.testing.assert_array_equal(x_batch.numpy(), x)
+        np.testing.assert_array_equal(y_batch.numpy(), y)
+
+
+def test_window_dataset_gathers_multi_feature_windows() -> None:
+    series = np.arange(20, dtype=np.float32).reshape(10, 2)
+    targets = np.arange(10, dtype=np.float32) * 10
+
+    dataset = WindowDataset(series=series, num_lags=3, targets=targets)
+    x_batch, y_batch = dataset[[4, 0]]
+
+    assert len(dataset) == 7
+    assert x_batch.shape == (2, 3, 2)
+    np.testing.assert_array_equal(x_batch[0].numpy(), series[4:7])
+    np.testing.assert_array_equal(y_batch.numpy(), [70, 30])
+
+
+def test_window_dataset_concat_keeps_windows_within_each_series() -> None:
+    first = WindowDataset(series=np.arange(5, dtype=np.float32), num_lags=2)
+    second = WindowDataset(series=np.arange(100, 104, dtype=np.float32), num_lags=2)
+
+    dataset = WindowDataset.concat([first, second])
+    x_batch, y_batch = dataset[list(range(len(dataset)))]
+
+    assert len(dataset) == 3 + 2
+    np.testing.assert_array_equal(x_batch[3].numpy(), [100, 101])
+    np.testing.assert_array_equal(y_batch.numpy(), [2, 3, 4, 102, 103])
+
+
+def test_window_dataset_raises_without_targets_for_multi_feature_series() -> None:
+    with pytest.raises(ValueError):
+        WindowDataset(series=np.zeros((10, 2), dtype=np.float32), num_lags=3)
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from fart.constants import TIMESTAMP
+from fart.store.candle_buffer import CANDLE_DTYPE, CandleBuffer
+
+
+def test_candle_buffer_parses_raw_bitvavo_candles() -> None:
+    buffer = CandleBuffer.from_candles([[2, "1.5", "2.5", "1.0", "2.0", "20.0"]])
+
+    assert buffer.tolist() == [(2, 1.5, 2.5, 1.0, 2.0, 20.0)]
+    assert buffer.array.dtype == CANDLE_DTYPE
+    assert CANDLE_DTYPE.itemsize == 48
+
+
+def test_candle_buffer_grows_by_doubling_capacity() -> None:
+    buffer = CandleBuffer(capacity=2)
+
+    for i in range(5):
+        buffer.append((i, 1.0, 1.0, 1.0, 1.0, 1.0))
+
+    assert len(buffer) == 5
+    assert len(buffer._array) == 8  # pyright: ignore[reportPrivateUsage] -- Asserting on the allocated capacity
+    assert buffer.timestamps.tolist() == [0, 1, 2, 3, 4]
+
+
+def test_candle_buffer_extend_copies_other_buffer() -> None:
+    buffer = CandleBuffer.from_candles([(1, 1.0, 1.0, 1.0, 1.0, 1.0)])
+
+    buffer.extend(CandleBuffer.from_candles([(2, 2.0, 2.0, 2.0, 2.0, 2.0)]))
+
+    assert [candle[0] for candle in buffer] == [1, 2]
+
+
+def test_candle_buffer_sorted_and_select() -> None:
+    buffer = CandleBuffer.from_candles(
+        [(3, 3.0, 3.0, 3.0, 3.0, 3.0), (1, 1.0, 1.0, 1.0, 1.0, 1.0), (2, 2, 2, 2, 2, 2)]
+    )
+
+    ordered = buffer.sorted()
+    selected = ordered.select(ordered.timestamps >= 2)
+
+    assert ordered.timestamps.tolist() == [1, 2, 3]
+    assert selected.timestamps.tolist() == [2, 3]
+    assert buffer.timestamps.tolist() == [3, 1, 2]
+
+
+def test_candle_buffer_getitem_supports_negative_indices() -> None:
+    buffer = CandleBuffer.from_candles(
+        [(1, 1.0, 1.0, 1.0, 1.0, 1.0), (2, 2.0, 2.0, 2.0, 2.0, 2.0)]
+    )
+
+    assert buffer[-1] == (2, 2.0, 2.0, 2.0, 2.0, 2.0)
+    with pytest.raises(IndexError):
+        buffer[2]
+
+
+def test_candle_buffer_round_trips_through_frame() -> None:
+    buffer = CandleBuffer.from_candles([(1, 1.0, 2.0, 0.5, 1.5, 10.0)])
+
+    df = buffer.to_frame()
+
+    assert df[TIMESTAMP].to_list() == [1]
+    assert CandleBuffer.from_frame(df).tolist() == buffer.tolist()
+    assert np.array_equal(CandleBuffer.from_frame(df).array, buffer.array)
@@ -0,0 +1,140 @@
+from pathlib import Path
+
+import polars as pl
+
+from fart.constants import CLOSE, TIMESTAMP
+from fart.store.candle_buffer import CandleBuffer
+from fart.store.csv_candle_store import CSVCandleStore
+
+
+def test_csv_candle_store_appends_batches_without_rewriting_cached_rows(
+    tmp_path: Path,
+) -> None:
+    store = CSVCandleStore(tmp_path / "BTC-EUR-1d.csv")
+
+    store.append(CandleBuffer.from_candles([(1, 1.0, 2.0, 0.5, 1.5, 10.0)]))
+    first_batch = store.path.read_text()
+    store.append(CandleBuffer.from_candles([(2, 1.5, 2.5, 1.0, 2.0, 20.0)]))
+
+    content = store.path.read_text()
+    assert content.startswith(first_batch)
+    assert content.splitlines() == [
+        "Timestamp,Open,High,Low,Close,Volume",
+        "1,1.0,2.0,0.5,1.5,10.0",
+        "2,1.5,2.5,1.0,2.0,20.0",
+    ]
+
+
+def test_csv_candle_store_skips_empty_batches(tmp_path: Path) -> None:
+    store = CSVCandleStore(tmp_path / "BTC-EUR-1d.csv")
+
+    store.append(CandleBuffer.from_candles([]))
+
+    assert not store.path.exists()
+
+
+def test_csv_candle_store_load_without_file_is_empty(tmp_path: Path) -> None:
+    assert CSVCandleStore(tmp_path / "missing.csv").load().tolist() == []
+
+
+def test_csv_candle_store_recovers_torn_last_line_on_load(tmp_path: Path) -> None:
+    store = CSVCandleStore(tmp_path / "BTC-EUR-1d.csv")
+    store.path.write_text(
+        "Timestamp,Open,High,Low,Close,Volume\n1,1.0,2.0,0.5,1.5,10.0\n2,1.5,2.5,1.0,2"
+    )
+
+    candle_data = store.load()
+
+    assert candle_data.tolist() == [(1, 1.0, 2.0, 0.5, 1.5, 10.0)]
+    assert store.path.read_text().endswith("1,1.0,2.0,0.5,1.5,10.0\n")
+
+
+def test_csv_candle_store_scan_reads_typed_columns(tmp_path: Path) -> None:
+    store = CSVCandleStore(tmp_path / "BTC-EUR-1d.csv")
+    store.append(
+        CandleBuffer.from_candles(
+            [(1, 1.0, 2.0, 0.5, 1.5, 10.0), (2, 1.5, 2.5, 1.0, 2.0, 20.0)]
+        )
+    )
+
+    df = store.scan().collect()
+
+    assert df.schema[TIMESTAMP] == pl.Int64
+    assert df.schema[CLOSE] == pl.Float64
+    assert df[CLOSE].to_list() == [1.5, 2.0]
+
+
+def test_csv_candle_store_last_timestamp_reads_only_the_tail(tmp_path: Path) -> None:
+    store = CSVCandleStore(tmp_path / "BTC-EUR-1d.csv")
+    store.append(
+        CandleBuffer.from_candles(
+            [(i, 1.0, 2.0, 0.5, 1.5, 10.0) for i in range(1, 1001)]
+        )
+    )
+
+    # A chunk far smaller than the file still finds the last row, reading
+    # backwards across chunk boundaries as needed
+    assert store.last_timestamp(chunk_size=7) == 1000
+    assert store.last_timestamp() == 1000
+
+
+def test_csv_candle_store_last_timestamp_without_rows_is_none(tmp_path: Path) -> None:
+    store = CSVCandleStore(tmp_path / "BTC-EUR-1d.csv")
+
+    assert store.last_timestamp() is None
+
+    store.path.write_text("Timestamp,Open,High,Low,Close,Volume\n")
+
+    assert store.last_timestamp() is None
+
+
+def test_csv_candle_store_last_timestamp_skips_torn_last_line(tmp_path: Path) -> None:
+    store = CSVCandleStore(tmp_path / "BTC-EUR-1d.csv")
+    store.path.write_text(
+        "Timestamp,Open,High,Low,Close,Volume\n1,1.0,2.0,0.5,1.5,10.0\n2,1.5,2.5,1.0,2"
+    )
+
+    assert store.last_timestamp() == 1
+
+
+def test_csv_candle_store_insert_merges_candles_in_timestamp_order(
+    tmp_path: Path,
+) -> None:
+    store = CSVCandleStore(tmp_path / "BTC-EUR-1d.csv")
+    store.append(
+        CandleBuffer.from_candles(
+            [(1, 1.0, 1.0, 1.0, 1.0, 1.0), (4, 4.0, 4.0, 4.0, 4.0, 4.0)]
+        )
+    )
+
+    store.insert(
+        CandleBuffer.from_candles(
+            [
+                (3, 3.0, 3.0, 3.0, 3.0, 3.0),
+                (2, 2.0, 2.0, 2.0, 2.0, 2.0),
+                # Already cached; kept as is
+                (4, 9.0, 9.0, 9.0, 9.0, 9.0),
+            ]
+        )
+    )
+
+    assert store.path.read_text().splitlines() == [
+        "Timestamp,Open,High,Low,Close,Volume",
+        "1,1.0,1.0,1.0,1.0,1.0",
+        "2,2.0,2.0,2.0,2.0,2.0",
+        "3,3.0,3.0,3.0,3.0,3.0",
+        "4,4.0,4.0,4.0,4.0,4.0",
+    ]
+    assert not store.path.with_suffix(".csv.tmp").exists()
+
+
+def test_csv_candle_store_insert_into_empty_store_appends(tmp_path: Path) -> None:
+    store = CSVCandleStore(tmp_path / "BTC-EUR-1d.csv")
+
+    store.insert(
+        CandleBuffer.from_candles(
+            [(2, 2.0, 2.0, 2.0, 2.0, 2.0), (1, 1.0, 1.0, 1.0, 1.0, 1.0)]
+        )
+    )
+
+    assert [candle[0] for candle in store.load()] == [1, 2]
@@ -0,0 +1,80 @@
+from pathlib import Path
+from typing import List
+
+import polars as pl
+import pytest
+
+from fart.constants import MAGNITUDE, TIMESTAMP
+from fart.features.calculate_magnitude import calculate_magnitude
+from fart.store.candle_buffer import CandleBuffer
+from fart.store.feature_cache import FeatureCache
+from fart.store.get_candle_store import STORE_FORMATS, get_candle_store
+from fart.store.scan_candle_data import scan_candle_data
+
+DAY = 86_400_000
+
+
+def _candles(start: int, stop: int) -> CandleBuffer:
+    return CandleBuffer.from_candles(
+        (1_600_000_000_000 + i * DAY, 1.0, 1.0, 1.0, 100.0 + i % 7, 1.0)
+        for i in range(start, stop)
+    )
+
+
+class CountingPipeline:
+    """`Magnitude` pipeline recording how many candles each run is given."""
+
+    def __init__(self) -> None:
+        self.num_candles: List[int] = []
+
+    def __call__(self, candles: pl.LazyFrame) -> pl.LazyFrame:
+        self.num_candles.append(candles.select(pl.len()).collect().item())
+        return calculate_magnitude(candles).select(TIMESTAMP, MAGNITUDE).drop_nulls()
+
+
+@pytest.mark.parametrize("store_format", STORE_FORMATS)
+def test_feature_cache_recomputes_only_appended_candles(
+    tmp_path: Path, store_format: str
+) -> None:
+    store = get_candle_store(tmp_path, "BTC-EUR", "1d", store_format)
+    store.append(_candles(0, 100))
+    cache = FeatureCache(tmp_path / "features")
+    pipeline = CountingPipeline()
+
+    first = cache.get(store.path, pipeline, config={"target": MAGNITUDE}, lookback=1)
+    repeat = cache.get(store.path, pipeline, config={"target": MAGNITUDE}, lookback=1)
+
+    assert pipeline.num_candles == [100]
+    assert repeat.equals(first)
+
+    store.append(_candles(100, 130))
+    extended = cache.get(store.path, pipeline, config={"target": MAGNITUDE}, lookback=1)
+
+    # The last cached candle is the context of the first appended one
+    assert pipeline.num_candles == [100, 31]
+    assert extended.equals(pipeline(scan_candle_data(store.path)).collect())
+    assert len(list((tmp_path / "features").glob("*.arrow"))) == 1
+
+
+def test_feature_cache_keys_on_config_and_evicts_least_recently_used(
+    tmp_path: Path,
+) -> None:
+    store = get_candle_store(tmp_path, "BTC-EUR", "1d")
+    store.append(_candles(0, 100))
+    pipeline = CountingPipeline()
+
+    cache = FeatureCache(tmp_path / "features")
+    cache.get(store.path, pipeline, config={"version": 1})
+    cache.get(store.path, pipeline, config={"version": 2})
+    size = max(p.stat().st_size for p in (tmp_path / "features").glob("*.arrow"))
+    assert pipeline.num_candles == [100, 100]
+
+    # Room for two entries: using 1 again makes 2 the least recently used
+    cache = FeatureCache(tmp_path / "features", max_bytes=2 * size)
+    cache.get(store.path, pipeline, config={"version": 1})
+    cache.get(store.path, pipeline, config={"version": 3})
+    cache.get(store.path, pipeline, config={"version": 1})
+    cache.get(store.path, pipeline, config={"version": 2})
+
+    assert pipeline.num_candles == [100, 100, 100, 100]
+    assert len(list((tmp_path / "features").glob("*.arrow"))) == 2
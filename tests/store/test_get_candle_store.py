@@ -0,0 +1,26 @@
+from pathlib import Path
+
+import pytest
+
+from fart.store.csv_candle_store import CSVCandleStore
+from fart.store.get_candle_store import get_candle_store
+from fart.store.parquet_candle_store import ParquetCandleStore
+
+
+def test_get_candle_store_csv(tmp_path: Path) -> None:
+    store = get_candle_store(tmp_path, "BTC-EUR", "1d", "csv")
+
+    assert isinstance(store, CSVCandleStore)
+    assert store.path == tmp_path / "BTC-EUR-1d.csv"
+
+
+def test_get_candle_store_parquet(tmp_path: Path) -> None:
+    store = get_candle_store(tmp_path, "BTC-EUR", "1d", "parquet")
+
+    assert isinstance(store, ParquetCandleStore)
+    assert store.path == tmp_path / "BTC-EUR-1d"
+
+
+def test_get_candle_store_invalid_format_raises(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="feather"):
+        get_candle_store(tmp_path, "BTC-EUR", "1d", "feather")
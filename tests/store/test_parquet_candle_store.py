@@ -0,0 +1,158 @@
+from pathlib import Path
+
+import pytest
+
+from fart.constants import CLOSE, TIMESTAMP
+from fart.store import parquet_candle_store
+from fart.store.candle_buffer import CandleBuffer
+from fart.store.candle_store import CANDLE_SCHEMA
+from fart.store.parquet_candle_store import MAX_PART_ROWS, ParquetCandleStore
+
+# 2019-12-31T00:00:00Z and 2020-01-01T00:00:00Z
+END_OF_2019 = 1_577_750_400_000
+START_OF_2020 = 1_577_836_800_000
+
+
+def test_parquet_candle_store_partitions_appends_by_year(tmp_path: Path) -> None:
+    store = ParquetCandleStore(tmp_path / "BTC-EUR-1d")
+
+    store.append(
+        CandleBuffer.from_candles(
+            [
+                (END_OF_2019, 1.0, 2.0, 0.5, 1.5, 10.0),
+                (START_OF_2020, 1.5, 2.5, 1.0, 2.0, 20.0),
+            ]
+        )
+    )
+
+    assert sorted(
+        str(path.relative_to(store.path)) for path in store.path.rglob("*.parquet")
+    ) == [
+        f"year=2019/{END_OF_2019}.parquet",
+        f"year=2020/{START_OF_2020}.parquet",
+    ]
+
+
+def test_parquet_candle_store_appends_new_parts_without_touching_old_ones(
+    tmp_path: Path,
+) -> None:
+    store = ParquetCandleStore(tmp_path / "BTC-EUR-1d")
+    store.append(CandleBuffer.from_candles([(END_OF_2019, 1.0, 2.0, 0.5, 1.5, 10.0)]))
+    first_part = store.path / "year=2019" / f"{END_OF_2019}.parquet"
+    first_part_bytes = first_part.read_bytes()
+
+    store.append(CandleBuffer.from_candles([(START_OF_2020, 1.5, 2.5, 1.0, 2.0, 20.0)]))
+
+    assert first_part.read_bytes() == first_part_bytes
+    assert store.load().tolist() == [
+        (END_OF_2019, 1.0, 2.0, 0.5, 1.5, 10.0),
+        (START_OF_2020, 1.5, 2.5, 1.0, 2.0, 20.0),
+    ]
+
+
+def test_parquet_candle_store_merges_small_appends_into_the_last_part(
+    tmp_path: Path,
+) -> None:
+    store = ParquetCandleStore(tmp_path / "BTC-EUR-1m")
+    candles = [
+        (START_OF_2020 + i * 60_000, 1.0, 2.0, 0.5, 1.5, 10.0)
+        for i in range(MAX_PART_ROWS + 50)
+    ]
+
+    # A tail of single closed candles, after a bulk catch-up
+    store.append(CandleBuffer.from_candles(candles[: MAX_PART_ROWS - 25]))
+    for candle in candles[MAX_PART_ROWS - 25 :]:
+        store.append(CandleBuffer.from_candles([candle]))
+
+    # A new part only once the last one is full
+    assert sorted(path.name for path in store.path.rglob("*.parquet")) == [
+        f"{START_OF_2020}.parquet",
+        f"{candles[MAX_PART_ROWS][0]}.parquet",
+    ]
+    assert store.load().tolist() == candles
+
+
+def test_parquet_candle_store_scan_reads_typed_columns(tmp_path: Path) -> None:
+    store = ParquetCandleStore(tmp_path / "BTC-EUR-1d")
+    # The Bitvavo API returns prices and volumes as strings
+    store.append(
+        CandleBuffer.from_candles([(END_OF_2019, "1.0", "2.0", "0.5", "1.5", "10.0")])
+    )
+
+    df = store.scan().collect()
+
+    assert df.schema == CANDLE_SCHEMA
+    assert df[TIMESTAMP].to_list() == [END_OF_2019]
+    assert df[CLOSE].to_list() == [1.5]
+
+
+def test_parquet_candle_store_load_without_parts_is_empty(tmp_path: Path) -> None:
+    assert ParquetCandleStore(tmp_path / "BTC-EUR-1d").load().tolist() == []
+
+
+def test_parquet_candle_store_last_timestamp_from_footer_statistics(
+    tmp_path: Path,
+) -> None:
+    store = ParquetCandleStore(tmp_path / "BTC-EUR-1d")
+    store.append(CandleBuffer.from_candles([(END_OF_2019, 1.0, 2.0, 0.5, 1.5, 10.0)]))
+    store.append(
+        CandleBuffer.from_candles(
+            [
+                (START_OF_2020, 1.5, 2.5, 1.0, 2.0, 20.0),
+                (START_OF_2020 + 86_400_000, 2.0, 3.0, 1.5, 2.5, 30.0),
+            ]
+        )
+    )
+
+    assert store.last_timestamp() == START_OF_2020 + 86_400_000
+
+
+def test_parquet_candle_store_last_timestamp_without_parts_is_none(
+    tmp_path: Path,
+) -> None:
+    assert ParquetCandleStore(tmp_path / "BTC-EUR-1d").last_timestamp() is None
+
+
+def test_parquet_candle_store_insert_rewrites_only_the_enclosing_part(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # One part per append
+    monkeypatch.setattr(parquet_candle_store, "MAX_PART_ROWS", 1)
+    day = 86_400_000
+    store = ParquetCandleStore(tmp_path / "BTC-EUR-1d")
+    store.append(CandleBuffer.from_candles([(START_OF_2020, 1.0, 1.0, 1.0, 1.0, 1.0)]))
+    store.append(
+        CandleBuffer.from_candles([(START_OF_2020 + 3 * day, 4.0, 4.0, 4.0, 4.0, 4.0)])
+    )
+    last_part = store.path / "year=2020" / f"{START_OF_2020 + 3 * day}.parquet"
+    last_part_bytes = last_part.read_bytes()
+
+    store.insert(
+        CandleBuffer.from_candles(
+            [
+                (START_OF_2020 + 2 * day, 3.0, 3.0, 3.0, 3.0, 3.0),
+                (START_OF_2020 + day, 2.0, 2.0, 2.0, 2.0, 2.0),
+                # Already cached; kept as is
+                (START_OF_2020, 9.0, 9.0, 9.0, 9.0, 9.0),
+            ]
+        )
+    )
+
+    assert last_part.read_bytes() == last_part_bytes
+    assert len(store._part_files()) == 2  # pyright: ignore[reportPrivateUsage] -- Asserting on the part layout
+    assert [candle[0] for candle in store.load()] == [
+        START_OF_2020 + i * day for i in range(4)
+    ]
+    assert store.load()[0][4] == 1.0
+
+
+def test_parquet_candle_store_insert_before_first_part_adds_a_part(
+    tmp_path: Path,
+) -> None:
+    store = ParquetCandleStore(tmp_path / "BTC-EUR-1d")
+    store.append(CandleBuffer.from_candles([(START_OF_2020, 1.5, 2.5, 1.0, 2.0, 20.0)]))
+
+    store.insert(CandleBuffer.from_candles([(END_OF_2019, 1.0, 2.0, 0.5, 1.5, 10.0)]))
+
+    assert [candle[0] for candle in store.load()] == [END_OF_2019, START_OF_2020]
+    assert store.last_timestamp() == START_OF_2020
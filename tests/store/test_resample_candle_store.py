@@ -0,0 +1,50 @@
+from pathlib import Path
+
+from fart.store.candle_buffer import CandleBuffer
+from fart.store.csv_candle_store import CSVCandleStore
+from fart.store.parquet_candle_store import ParquetCandleStore
+from fart.store.resample_candle_store import resample_candle_store
+
+# 2024-01-01T00:00:00Z
+START = 1_704_067_200_000
+MINUTE = 60_000
+HOUR = 3_600_000
+
+
+def _minute_candles(start_minute: int, end_minute: int) -> list:
+    return [
+        (START + i * MINUTE, float(i), float(i) + 1, float(i) - 1, float(i), 1.0)
+        for i in range(start_minute, end_minute)
+    ]
+
+
+def test_resample_candle_store_appends_only_new_closed_windows(
+    tmp_path: Path,
+) -> None:
+    source = ParquetCandleStore(tmp_path / "BTC-EUR-1m")
+    target = CSVCandleStore(tmp_path / "BTC-EUR-1h.csv")
+    source.append(CandleBuffer.from_candles(_minute_candles(0, 90)))
+
+    first_run = resample_candle_store(source, target, "1m", "1h")
+    target_after_first_run = target.path.read_text()
+    source.append(CandleBuffer.from_candles(_minute_candles(90, 180)))
+    second_run = resample_candle_store(source, target, "1m", "1h")
+
+    assert first_run == 1
+    assert second_run == 2
+    assert target.path.read_text().startswith(target_after_first_run)
+    assert [candle[0] for candle in target.load()] == [
+        START,
+        START + HOUR,
+        START + 2 * HOUR,
+    ]
+    # The second window is built from candles spanning both source appends
+    assert target.load()[1] == (START + HOUR, 60.0, 120.0, 59.0, 119.0, 60.0)
+
+
+def test_resample_candle_store_without_source_data_is_noop(tmp_path: Path) -> None:
+    source = ParquetCandleStore(tmp_path / "BTC-EUR-1m")
+    target = CSVCandleStore(tmp_path / "BTC-EUR-1h.csv")
+
+    assert resample_candle_store(source, target, "1m", "1h") == 0
+    assert not target.path.exists()
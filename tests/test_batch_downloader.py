@@ -0,0 +1,91 @@
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from fart.batch_downloader import BatchDownloader
+
+
+def _make_batch_downloader(
+    tmp_path: Path,
+    mock_bitvavo: MagicMock,
+    markets: list[str],
+    intervals: list[str],
+    known_markets: list[str] | None = None,
+) -> BatchDownloader:
+    mock_bitvavo.return_value.markets.return_value = [
+        {"market": m}
+        for m in (
+            known_markets
+            if known_markets is not None
+            else ["BTC-EUR", "ETH-EUR", "BTC-USDC"]
+        )
+    ]
+    return BatchDownloader(
+        api_key="test-api-key",
+        api_secret="test-api-secret",
+        assets_dir=tmp_path,
+        markets=markets,
+        intervals=intervals,
+    )
+
+
+@patch("fart.downloader.Bitvavo")
+@patch("fart.batch_downloader.Bitvavo")
+def test_batch_downloader_expands_market_globs_across_intervals(
+    mock_bitvavo: MagicMock, mock_downloader_bitvavo: MagicMock, tmp_path: Path
+) -> None:
+    batch_downloader = _make_batch_downloader(
+        tmp_path, mock_bitvavo, markets=["*-EUR"], intervals=["1m", "1d"]
+    )
+
+    assert batch_downloader.series == [
+        ("BTC-EUR", "1m"),
+        ("BTC-EUR", "1d"),
+        ("ETH-EUR", "1m"),
+        ("ETH-EUR", "1d"),
+    ]
+
+
+@patch("fart.downloader.Bitvavo")
+@patch("fart.batch_downloader.Bitvavo")
+def test_batch_downloader_deduplicates_overlapping_patterns(
+    mock_bitvavo: MagicMock, mock_downloader_bitvavo: MagicMock, tmp_path: Path
+) -> None:
+    batch_downloader = _make_batch_downloader(
+        tmp_path, mock_bitvavo, markets=["BTC-EUR", "BTC-*"], intervals=["1d"]
+    )
+
+    assert batch_downloader.series == [("BTC-EUR", "1d"), ("BTC-USDC", "1d")]
+
+
+@patch("fart.downloader.Bitvavo")
+@patch("fart.batch_downloader.Bitvavo")
+def test_batch_downloader_unmatched_market_raises(
+    mock_bitvavo: MagicMock, mock_downloader_bitvavo: MagicMock, tmp_path: Path
+) -> None:
+    with pytest.raises(ValueError, match="XRP-EUR"):
+        _make_batch_downloader(
+            tmp_path, mock_bitvavo, markets=["XRP-EUR"], intervals=["1d"]
+        )
+
+
+@patch("fart.downloader.Bitvavo")
+@patch("fart.batch_downloader.Bitvavo")
+def test_batch_downloader_shares_one_client_and_market_lookup(
+    mock_bitvavo: MagicMock, mock_downloader_bitvavo: MagicMock, tmp_path: Path
+) -> None:
+    batch_downloader = _make_batch_downloader(
+        tmp_path, mock_bitvavo, markets=["*-EUR"], intervals=["1d", "1W"]
+    )
+    mock_bitvavo.return_value.candles.return_value = []
+
+    results = batch_downloader.download()
+
+    assert [(market, interval) for market, interval, _, _ in results] == (
+        batch_downloader.series
+    )
+    mock_bitvavo.assert_called_once()
+    mock_bitvavo.return_value.markets.assert_called_once()
+    mock_downloader_bitvavo.assert_not_called()
+    assert mock_bitvavo.return_value.candles.call_count > 0
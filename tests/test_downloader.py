@@ -1,10 +1,16 @@
+import random
+import threading
+import time
+from datetime import datetime
 from pathlib import Path
+from typing import Any, Callable
 from unittest.mock import MagicMock, patch
 
 import pytest
 from loguru import logger
 
 from fart.downloader import Downloader
+from fart.store.candle_buffer import CandleBuffer
 
 
 def _make_downloader(
@@ -36,6 +42,23 @@ def test_downloader_stores_configuration_and_computes_filepath(
     assert tmp_path.exists()
 
 
+@patch("fart.downloader.Bitvavo")
+def test_downloader_parquet_store_format_uses_store_directory(
+    mock_bitvavo: MagicMock, tmp_path: Path
+) -> None:
+    mock_bitvavo.return_value.markets.return_value = [{"market": "BTC-EUR"}]
+    downloader = Downloader(
+        api_key="test-api-key",
+        api_secret="test-api-secret",
+        assets_dir=tmp_path,
+        interval="1d",
+        market="BTC-EUR",
+        store_format="parquet",
+    )
+
+    assert downloader._filepath == tmp_path / "BTC-EUR-1d"
+
+
 @patch("fart.downloader.Bitvavo")
 def test_downloader_passes_api_credentials_to_client(
     mock_bitvavo: MagicMock, tmp_path: Path
@@ -83,8 +106,7 @@ def test_downloader_resumes_one_interval_past_last_cached_candle(
         api_secret="test-api-secret",
     )
 
-    last_candle = (last_candle_timestamp, 1.0, 1.0, 1.0, 1.0, 1.0)
-    start_timestamp = downloader._determine_start_timestamp([last_candle])
+    start_timestamp = downloader._determine_start_timestamp(last_candle_timestamp)
 
     assert start_timestamp == expected_start_timestamp
 
@@ -95,7 +117,7 @@ def test_downloader_resumes_from_launch_timestamp_without_cached_data(
 ) -> None:
     downloader = _make_downloader(tmp_path, mock_bitvavo, market="BTC-EUR")
 
-    assert downloader._determine_start_timestamp([]) == 1552089600000
+    assert downloader._determine_start_timestamp(None) == 1552089600000
 
 
 @patch("fart.downloader.Bitvavo")
@@ -114,3 +136,279 @@ def test_downloader_logs_configuration_without_leaking_secrets(
     assert "BTC-EUR" in logged
     assert "test-api-key" not in logged
     assert "test-api-secret" not in logged
+
+
+@patch("fart.downloader.Bitvavo")
+def test_downloader_download_resumes_from_store_tail_and_appends(
+    mock_bitvavo: MagicMock, tmp_path: Path
+) -> None:
+    downloader = _make_downloader(tmp_path, mock_bitvavo)
+    last_timestamp = int(datetime.now().timestamp() * 1000) - 3 * 86_400_000
+    downloader._filepath.write_text(
+        f"Timestamp,Open,High,Low,Close,Volume\n{last_timestamp},1.0,2.0,0.5,1.5,10.0\n"
+    )
+    new_candle = [last_timestamp + 86_400_000, "1.5", "2.5", "1.0", "2.0", "20.0"]
+    mock_bitvavo.return_value.candles.return_value = [new_candle]
+
+    with patch.object(
+        downloader._store, "load", side_effect=AssertionError("loaded in full")
+    ):
+        downloader.download()
+
+    first_call = mock_bitvavo.return_value.candles.call_args_list[0]
+    assert first_call.kwargs["start"] == datetime.fromtimestamp(
+        (last_timestamp + 86_400_000) / 1000
+    )
+    assert downloader._filepath.read_text().splitlines()[1:] == [
+        f"{last_timestamp},1.0,2.0,0.5,1.5,10.0",
+        f"{last_timestamp + 86_400_000},1.5,2.5,1.0,2.0,20.0",
+    ]
+
+
+@patch("fart.downloader.Bitvavo")
+def test_downloader_concurrent_fetch_persists_windows_in_order(
+    mock_bitvavo: MagicMock, tmp_path: Path
+) -> None:
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+    rng = random.Random(0)
+
+    def fake_candles(
+        market: str, interval: str, start: datetime, end: datetime
+    ) -> list[list[object]]:
+        # Later windows tend to finish first, so completions arrive out of
+        # order and have to be reassembled before they're persisted
+        nonlocal in_flight, max_in_flight
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        time.sleep(rng.uniform(0.001, 0.01))
+        with lock:
+            in_flight -= 1
+        timestamp = int(start.timestamp() * 1000)
+        # Bitvavo returns candles newest first
+        return [
+            [timestamp + 1, "1", "1", "1", "1", "1"],
+            [timestamp, "1", "1", "1", "1", "1"],
+        ]
+
+    mock_bitvavo.return_value.markets.return_value = [{"market": "BTC-EUR"}]
+    mock_bitvavo.return_value.candles.side_effect = fake_candles
+    downloader = Downloader(
+        api_key="test-api-key",
+        api_secret="test-api-secret",
+        assets_dir=tmp_path,
+        interval="1m",
+        market="BTC-EUR",
+        max_workers=4,
+    )
+    # Resume ~20 windows of 1440 one-minute candles before now
+    now = int(datetime.now().timestamp() * 1000)
+    downloader._filepath.write_text(
+        f"Timestamp,Open,High,Low,Close,Volume\n{now - 20 * 1440 * 60_000},1,1,1,1,1\n"
+    )
+
+    downloader.download()
+
+    timestamps = [
+        int(line.split(",")[0])
+        for line in downloader._filepath.read_text().splitlines()[1:]
+    ]
+    assert max_in_flight > 1
+    assert len(timestamps) > 20 * 2
+    assert timestamps == sorted(timestamps)
+
+
+@patch("fart.downloader.Bitvavo")
+def test_downloader_raises_on_candles_error_response(
+    mock_bitvavo: MagicMock, tmp_path: Path
+) -> None:
+    downloader = _make_downloader(tmp_path, mock_bitvavo)
+    mock_bitvavo.return_value.candles.return_value = {
+        "errorCode": 105,
+        "error": "Your account has been temporarily banned.",
+    }
+
+    with pytest.raises(RuntimeError, match="banned"):
+        downloader.download()
+
+
+@patch("fart.downloader.Bitvavo")
+def test_downloader_repair_fetches_and_merges_only_the_gaps(
+    mock_bitvavo: MagicMock, tmp_path: Path
+) -> None:
+    day = 86_400_000
+    first = 1_577_836_800_000  # 2020-01-01T00:00:00Z
+    downloader = _make_downloader(tmp_path, mock_bitvavo)
+    downloader._filepath.write_text(
+        "Timestamp,Open,High,Low,Close,Volume\n"
+        + "".join(f"{first + i * day},1.0,1.0,1.0,1.0,1.0\n" for i in (0, 1, 4, 5))
+    )
+    # The exchange has no candle for day 3, and the inclusive `end` bound
+    # returns the cached candle after the gap again
+    mock_bitvavo.return_value.candles.return_value = [
+        [first + 4 * day, "9", "9", "9", "9", "9"],
+        [first + 2 * day, "2", "2", "2", "2", "2"],
+    ]
+
+    assert downloader.repair() == 1
+
+    mock_bitvavo.return_value.candles.assert_called_once_with(
+        "BTC-EUR",
+        "1d",
+        start=datetime.fromtimestamp((first + 2 * day) / 1000),
+        end=datetime.fromtimestamp((first + 4 * day) / 1000),
+    )
+    assert downloader._filepath.read_text().splitlines()[1:] == [
+        f"{first},1.0,1.0,1.0,1.0,1.0",
+        f"{first + day},1.0,1.0,1.0,1.0,1.0",
+        f"{first + 2 * day},2.0,2.0,2.0,2.0,2.0",
+        f"{first + 4 * day},1.0,1.0,1.0,1.0,1.0",
+        f"{first + 5 * day},1.0,1.0,1.0,1.0,1.0",
+    ]
+
+
+@patch("fart.downloader.Bitvavo")
+def test_downloader_repair_fetches_nearby_gaps_in_one_request(
+    mock_bitvavo: MagicMock, tmp_path: Path
+) -> None:
+    day = 86_400_000
+    first = 1_577_836_800_000  # 2020-01-01T00:00:00Z
+    downloader = _make_downloader(tmp_path, mock_bitvavo)
+    downloader._filepath.write_text(
+        "Timestamp,Open,High,Low,Close,Volume\n"
+        + "".join(f"{first + i * day},1.0,1.0,1.0,1.0,1.0\n" for i in (0, 2, 3, 4, 6))
+    )
+    # Both gaps, and the cached candles between them
+    mock_bitvavo.return_value.candles.return_value = [
+        [first + i * day, "9", "9", "9", "9", "9"] for i in (6, 5, 4, 3, 2, 1)
+    ]
+
+    assert downloader.repair() == 2
+
+    mock_bitvavo.return_value.candles.assert_called_once_with(
+        "BTC-EUR",
+        "1d",
+        start=datetime.fromtimestamp((first + day) / 1000),
+        end=datetime.fromtimestamp((first + 6 * day) / 1000),
+    )
+    assert [
+        line.split(",")[1] for line in downloader._filepath.read_text().splitlines()[1:]
+    ] == ["1.0", "9.0", "1.0", "1.0", "1.0", "9.0", "1.0"]
+
+
+@patch("fart.downloader.Bitvavo")
+def test_downloader_repair_without_cached_data_is_a_no_op(
+    mock_bitvavo: MagicMock, tmp_path: Path
+) -> None:
+    downloader = _make_downloader(tmp_path, mock_bitvavo)
+
+    assert downloader.repair() == 0
+    mock_bitvavo.return_value.candles.assert_not_called()
+
+
+@patch("fart.downloader.Bitvavo")
+def test_downloader_tail_appends_closed_candles_and_catches_up_gaps(
+    mock_bitvavo: MagicMock, tmp_path: Path
+) -> None:
+    day = 86_400_000
+    first = 1_577_836_800_000  # 2020-01-01T00:00:00Z
+    downloader = _make_downloader(tmp_path, mock_bitvavo)
+    downloader._filepath.write_text(
+        f"Timestamp,Open,High,Low,Close,Volume\n{first},1.0,1.0,1.0,1.0,1.0\n"
+    )
+    stop = threading.Event()
+    updates = [
+        [first + day, "2", "2", "2", "2", "1"],
+        [first + day, "2", "3", "2", "3", "2"],
+        # Opens the next candle, closing the previous one
+        [first + 2 * day, "3", "3", "3", "3", "1"],
+        # Stale update, delivered late
+        [first + day, "9", "9", "9", "9", "9"],
+        # Updates for day 2 and 3 were missed, e.g. during a reconnect
+        [first + 4 * day, "5", "5", "5", "5", "1"],
+    ]
+
+    def subscribe(
+        market: str, interval: str, callback: Callable[[dict[str, Any]], None]
+    ) -> None:
+        for candle in updates:
+            callback(
+                {
+                    "event": "candle",
+                    "market": market,
+                    "interval": interval,
+                    "candle": [candle],
+                }
+            )
+        stop.set()
+
+    socket = mock_bitvavo.return_value.newWebsocket.return_value
+    socket.subscriptionCandles.side_effect = subscribe
+    mock_bitvavo.return_value.candles.return_value = [
+        [first + 4 * day, "5", "5", "5", "5", "1"],
+        [first + 3 * day, "4", "4", "4", "4", "4"],
+        [first + 2 * day, "3", "3", "3", "3", "3"],
+    ]
+
+    assert downloader.tail(stop) == 3
+
+    mock_bitvavo.return_value.candles.assert_called_once_with(
+        "BTC-EUR",
+        "1d",
+        start=datetime.fromtimestamp((first + 2 * day) / 1000),
+        end=datetime.fromtimestamp((first + 4 * day) / 1000),
+    )
+    socket.closeSocket.assert_called_once()
+    assert downloader._filepath.read_text().splitlines()[1:] == [
+        f"{first},1.0,1.0,1.0,1.0,1.0",
+        f"{first + day},2.0,3.0,2.0,3.0,2.0",
+        f"{first + 2 * day},3.0,3.0,3.0,3.0,3.0",
+        f"{first + 3 * day},4.0,4.0,4.0,4.0,4.0",
+    ]
+
+
+@patch("fart.downloader.Bitvavo")
+def test_downloader_tail_into_parquet_store_does_not_write_a_part_per_candle(
+    mock_bitvavo: MagicMock, tmp_path: Path
+) -> None:
+    day = 86_400_000
+    first = 1_577_836_800_000  # 2020-01-01T00:00:00Z
+    num_candles = 50
+    mock_bitvavo.return_value.markets.return_value = [{"market": "BTC-EUR"}]
+    downloader = Downloader(
+        api_key="test-api-key",
+        api_secret="test-api-secret",
+        assets_dir=tmp_path,
+        interval="1d",
+        market="BTC-EUR",
+        store_format="parquet",
+    )
+    downloader._store.append(
+        CandleBuffer.from_candles([(first, 1.0, 1.0, 1.0, 1.0, 1.0)])
+    )
+    stop = threading.Event()
+
+    def subscribe(
+        market: str, interval: str, callback: Callable[[dict[str, Any]], None]
+    ) -> None:
+        # Each candle opening closes the previous one
+        for i in range(1, num_candles + 2):
+            callback(
+                {
+                    "event": "candle",
+                    "market": market,
+                    "interval": interval,
+                    "candle": [[first + i * day, "2", "2", "2", "2", "1"]],
+                }
+            )
+        stop.set()
+
+    socket = mock_bitvavo.return_value.newWebsocket.return_value
+    socket.subscriptionCandles.side_effect = subscribe
+
+    assert downloader.tail(stop) == num_candles
+
+    assert len(list(downloader._filepath.rglob("*.parquet"))) == 1
+    assert len(downloader._store.load()) == num_candles + 1
@@ -0,0 +1,57 @@
+import pytest
+
+from fart.token_bucket import TokenBucket
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_token_bucket_bursts_up_to_capacity_without_waiting() -> None:
+    clock = FakeClock()
+    bucket = TokenBucket(capacity=10, refill_period=10, clock=clock, sleep=clock.sleep)
+
+    for _ in range(10):
+        bucket.acquire()
+
+    assert clock.sleeps == []
+    assert bucket.tokens == pytest.approx(0)
+
+
+def test_token_bucket_waits_for_refill_once_exhausted() -> None:
+    clock = FakeClock()
+    bucket = TokenBucket(capacity=10, refill_period=10, clock=clock, sleep=clock.sleep)
+
+    for _ in range(10):
+        bucket.acquire()
+    bucket.acquire(weight=2)
+
+    # Refills at one token per second, so two tokens take two seconds
+    assert sum(clock.sleeps) == pytest.approx(2)
+    assert bucket.tokens == pytest.approx(0)
+
+
+def test_token_bucket_refill_is_capped_at_capacity() -> None:
+    clock = FakeClock()
+    bucket = TokenBucket(capacity=10, refill_period=10, clock=clock, sleep=clock.sleep)
+
+    bucket.acquire(weight=5)
+    clock.now += 1000
+
+    assert bucket.tokens == pytest.approx(10)
+
+
+def test_token_bucket_weight_above_capacity_raises() -> None:
+    bucket = TokenBucket(capacity=10)
+
+    with pytest.raises(ValueError):
+        bucket.acquire(weight=11)
@@ -0,0 +1,13 @@
+from pathlib import Path
+
+from fart.utils import get_data_dirpath
+
+
+def test_get_data_dirpath() -> None:
+    dirpath = get_data_dirpath(
+        data_dir=Path("/tmp/fart-test-data"),
+        market="BTC-EUR",
+        interval="1d",
+    )
+
+    assert dirpath == Path("/tmp/fart-test-data/BTC-EUR-1d")
@@ -0,0 +1,36 @@
+import pytest
+
+from fart.utils import interval_to_duration, interval_to_milliseconds
+
+
+@pytest.mark.parametrize(
+    "interval,expected_milliseconds",
+    [
+        ("1m", 60_000),
+        ("15m", 15 * 60_000),
+        ("4h", 4 * 3_600_000),
+        ("1d", 86_400_000),
+        ("1W", 604_800_000),
+        ("1M", 30 * 86_400_000),
+    ],
+)
+def test_interval_to_milliseconds(interval: str, expected_milliseconds: int) -> None:
+    assert interval_to_milliseconds(interval) == expected_milliseconds
+
+
+def test_interval_to_milliseconds_invalid_interval_raises() -> None:
+    with pytest.raises(ValueError):
+        interval_to_milliseconds("1y")
+
+
+@pytest.mark.parametrize(
+    "interval,expected_duration",
+    [("5m", "5m"), ("1h", "1h"), ("1d", "1d"), ("1W", "1w"), ("1M", "1mo")],
+)
+def test_interval_to_duration(interval: str, expected_duration: str) -> None:
+    assert interval_to_duration(interval) == expected_duration
+
+
+def test_interval_to_duration_invalid_interval_raises() -> None:
+    with pytest.raises(ValueError):
+        interval_to_duration("1y")
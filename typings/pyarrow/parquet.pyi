@@ -0,0 +1,32 @@
+from os import PathLike
+from typing import Any
+
+class Statistics:
+    @property
+    def has_min_max(self) -> bool: ...
+    @property
+    def max(self) -> Any: ...
+
+class ColumnChunkMetaData:
+    @property
+    def statistics(self) -> Statistics | None: ...
+
+class RowGroupMetaData:
+    @property
+    def num_rows(self) -> int: ...
+    def column(self, i: int) -> ColumnChunkMetaData: ...
+
+class ParquetSchema:
+    @property
+    def names(self) -> list[str]: ...
+
+class FileMetaData:
+    @property
+    def num_rows(self) -> int: ...
+    @property
+    def num_row_groups(self) -> int: ...
+    @property
+    def schema(self) -> ParquetSchema: ...
+    def row_group(self, i: int) -> RowGroupMetaData: ...
+
+def read_metadata(where: str | PathLike[str], **kwargs: Any) -> FileMetaData: ...